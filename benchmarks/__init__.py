@@ -0,0 +1,2 @@
+#!/usr/bin/python3
+""" DIYHA benchmarks, run from the repository root with python3 -m benchmarks.<name> """
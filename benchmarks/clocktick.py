@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+""" Measure how far LedClock ticks land from the wall clock second
+
+    python3 -m benchmarks.clocktick [--seconds N] [--limit SECONDS] [--unaligned]
+
+    Runs a LedClock on a simulated display and records time.time() at each tick.
+    Reports how long after the start of its second each tick ran (mean, 99th
+    percentile and worst), seconds ticked twice or missed, how often the digits
+    were rendered and the I2C bytes per tick. Exits 1 when the worst offset is
+    over the limit. With --unaligned the clock ticks every second from wherever
+    it started, as it did before ticks were aligned, for comparison.
+"""
+
+import sys
+import math
+import time
+import argparse
+
+from pkg_classes.framescheduler import FrameScheduler
+from pkg_classes.ledclock import LedClock, UPDATE_RATE_SECONDS
+from pkg_classes.simulatedbackpack import SimulatedSevenSegment, I2CTransactionRecorder
+
+SECONDS = 10
+
+LIMIT_SECONDS = 0.020
+
+def record_ticks(clock):
+    """ wrap clock.update to record the wall clock time of each tick """
+    ticks = []
+    update = clock.update
+
+    def tick():
+        """ update the clock after noting the time """
+        ticks.append(time.time())
+        update()
+
+    clock.update = tick
+    return ticks
+
+def percentile(values, fraction):
+    """ return the value below which a fraction of the sorted values fall """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(math.ceil(fraction * len(ordered))) - 1)]
+
+def main():
+    """ run the clock for a while and report the tick offsets in milliseconds """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=int, default=SECONDS)
+    parser.add_argument('--limit', type=float, default=LIMIT_SECONDS)
+    parser.add_argument('--unaligned', action='store_true')
+    args = parser.parse_args()
+    recorder = I2CTransactionRecorder(keep_log=False)
+    clock = LedClock(SimulatedSevenSegment(0x71, recorder))
+    if args.unaligned:
+        clock.scheduler = FrameScheduler(UPDATE_RATE_SECONDS)
+    ticks = record_ticks(clock)
+    clock.run()
+    time.sleep(args.seconds + 0.5)
+    if not ticks:
+        print('no ticks')
+        return 1
+    offsets = [tick - math.floor(tick) for tick in ticks]
+    seconds = [math.floor(tick) for tick in ticks]
+    twice = len(seconds) - len(set(seconds))
+    missed = seconds[-1] - seconds[0] + 1 - len(set(seconds))
+    worst = max(offsets)
+    print('ticks {:d}  twice {:d}  missed {:d}  renders {:d}  bytes/tick {:.1f}'.format(
+        len(ticks), twice, missed, clock.clock.renders,
+        recorder.bytes_written(0x71) / len(ticks)))
+    print('offset mean {:.3f} ms  p99 {:.3f} ms  max {:.3f} ms, limit {:.3f} ms'.format(
+        1000 * sum(offsets) / len(offsets), 1000 * percentile(offsets, 0.99),
+        1000 * worst, 1000 * args.limit))
+    if worst > args.limit or twice or missed:
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
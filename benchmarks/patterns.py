@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+""" Render and bus benchmark for every LED pattern and clock display
+
+    python3 -m benchmarks.patterns [--frames N] [--only NAME ...]
+                                   [--output FILE] [--baseline FILE] [--tolerance PCT]
+
+    Each pattern runs through the same display() entry point and framebuffer flush
+    that Led8x8Controller uses, and each clock display through the call LedClock
+    makes, on the simulated backpacks with no frame waits. A timing pass reports
+    frames per second and CPU microseconds per frame. A tracemalloc pass reports
+    the peak bytes allocated inside a frame and the net memory blocks left behind
+    per frame. The I2C recorder gives bytes and transactions written per frame.
+
+    Results are printed as JSON and optionally saved. With --baseline the run is
+    compared metric by metric against a saved run and exits 1 when a timing
+    regresses by more than the tolerance or a counted metric by more than 1%.
+"""
+
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+from pkg_classes.led8x8controller import Led8x8Controller
+from pkg_classes.ledclock import LedClock
+from pkg_classes.simulatedbackpack import I2CTransactionRecorder
+from pkg_classes.simulatedbackpack import SimulatedMatrix8x8, SimulatedSevenSegment
+
+FRAMES = 500
+
+# timings are the fastest of this many runs
+REPEATS = 5
+
+# timings vary from run to run, the counted metrics should not
+TOLERANCE_PERCENT = 25.0
+
+COUNTED_TOLERANCE_PERCENT = 1.0
+
+TIMED_METRICS = ("frames_per_second", "cpu_us_per_frame")
+
+# larger values are better for these metrics, smaller for the rest
+HIGHER_IS_BETTER = ("frames_per_second",)
+
+MOTION_TOPICS = ("diy/main/living/motion", "diy/upper/study/motion",
+                 "diy/main/hallway/motion", "diy/perimeter/front/motion")
+
+class Bench:
+    """ One display path: a frame function on a recorded bus """
+
+    def __init__(self, name, frame, recorder, stimulus=None):
+        """ frame renders and writes one frame, stimulus(n) runs before frame n """
+        self.name = name
+        self.frame = frame
+        self.recorder = recorder
+        self.stimulus = stimulus
+
+    def run(self, frames):
+        """ run the frames untimed by anything but the frame itself """
+        for count in range(frames):
+            if self.stimulus is not None:
+                self.stimulus(count)
+            self.frame()
+
+    def measure(self, frames, repeats=REPEATS):
+        """ return the metrics for this display path, timing the best of repeats """
+        self.run(frames // 10)
+        # totals only, so the log does not show up as frame allocations
+        self.recorder.keep_log = False
+        self.recorder.clear()
+        wall = None
+        cpu = None
+        for _ in range(repeats):
+            start_wall = time.perf_counter()
+            start_cpu = time.process_time()
+            self.run(frames)
+            elapsed = time.perf_counter() - start_wall
+            if wall is None or elapsed < wall:
+                wall = elapsed
+                cpu = time.process_time() - start_cpu
+        bytes_written = self.recorder.bytes_written() / repeats
+        transactions = self.recorder.count() / repeats
+        peak = 0
+        tracemalloc.start()
+        blocks = sys.getallocatedblocks()
+        for count in range(frames):
+            if self.stimulus is not None:
+                self.stimulus(count)
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            self.frame()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+        blocks = sys.getallocatedblocks() - blocks
+        tracemalloc.stop()
+        self.recorder.keep_log = True
+        return {
+            "frames_per_second": frames / wall if wall else 0.0,
+            "cpu_us_per_frame": 1e6 * cpu / frames,
+            "peak_bytes_per_frame": peak,
+            "blocks_per_frame": blocks / frames,
+            "bytes_per_frame": bytes_written / frames,
+            "transactions_per_frame": transactions / frames
+        }
+
+def matrix_bench(name, controller, pattern, stimulus=None):
+    """ benchmark a pattern exactly as Led8x8Controller renders and flushes it """
+    framebuffer = controller.framebuffer
+
+    def frame():
+        """ one controller frame without the deadline wait """
+        pattern.display()
+        framebuffer.flush()
+
+    pattern.reset()
+    return Bench(name, frame, controller.matrix8x8.recorder, stimulus)
+
+def build_benches():
+    """ create every pattern and clock display on simulated hardware """
+    matrix = SimulatedMatrix8x8(0x70, I2CTransactionRecorder())
+    controller = Led8x8Controller(matrix)
+
+    def motion_stimulus(count):
+        """ a new room reports motion every 20 frames """
+        if count % 20 == 0:
+            controller.update_motion(MOTION_TOPICS[(count // 20) % len(MOTION_TOPICS)])
+
+    benches = [
+        matrix_bench("idle", controller, controller.idle),
+        matrix_bench("flash", controller, controller.fire),
+        matrix_bench("fibonacci", controller, controller.fib),
+        matrix_bench("motion", controller, controller.motion, motion_stimulus),
+        matrix_bench("wopr", controller, controller.wopr),
+        matrix_bench("life", controller, controller.life),
+        matrix_bench("prime", controller, controller.prime)
+    ]
+    seven_segment = SimulatedSevenSegment(0x71, I2CTransactionRecorder())
+    clock = LedClock(seven_segment)
+    for name, display in (("clock_time", clock.clock), ("clock_who", clock.who),
+                          ("clock_countdown", clock.count)):
+        benches.append(Bench(name, display.display, seven_segment.recorder))
+    return benches
+
+def compare(results, baseline, tolerance, timed=TIMED_METRICS):
+    """ print the change of every metric and return the regressions, timed
+        metrics may vary by the tolerance and counted ones by 1%
+    """
+    regressions = []
+    for name, metrics in sorted(results.items()):
+        for metric, value in sorted(metrics.items()):
+            before = baseline.get(name, {}).get(metric)
+            if before is None:
+                continue
+            if before:
+                change = 100.0 * (value - before) / before
+            else:
+                change = 0.0 if value == before else 100.0
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            limit = tolerance if metric in timed else COUNTED_TOLERANCE_PERCENT
+            flag = ''
+            if worse > limit:
+                flag = '  REGRESSION'
+                regressions.append((name, metric))
+            print('{:16s} {:24s} {:12.2f} -> {:12.2f} {:+8.1f}%{}'.format(
+                name, metric, before, value, change, flag))
+    return regressions
+
+def main():
+    """ run the benchmarks, save and compare the results """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=FRAMES)
+    parser.add_argument('--only', nargs='*', default=None)
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE_PERCENT)
+    args = parser.parse_args()
+    results = {}
+    for bench in build_benches():
+        if args.only and bench.name not in args.only:
+            continue
+        results[bench.name] = bench.measure(args.frames)
+    print(json.dumps(results, indent=2, sort_keys=True))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline), args.tolerance)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
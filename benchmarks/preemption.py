@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+""" Measure the command to first frame latency of FIRE and PANIC on Led8x8Controller
+
+    python3 -m benchmarks.preemption [--trials N] [--limit SECONDS] [--asyncio]
+
+    Each trial waits a random part of the slowest frame period, switches to fire or
+    panic from this thread, the way the MQTT thread does, and measures how long the
+    display thread takes to flush the first alarm frame. Exits 1 when the worst
+    case is over the limit. With --asyncio the display runs as a task on an
+    AsyncRuntime event loop instead of on its own thread.
+"""
+
+import sys
+import time
+import random
+import argparse
+
+from pkg_classes.asyncruntime import AsyncRuntime
+from pkg_classes.led8x8controller import Led8x8Controller
+from pkg_classes.led8x8controller import IDLE_STATE, DEMO_STATE, SECURITY_STATE
+from pkg_classes.led8x8controller import FIRE_MODE, PANIC_MODE, FIBONACCI_MODE
+from pkg_classes.led8x8controller import WOPR_MODE, LIFE_MODE
+from pkg_classes.simulatedbackpack import SimulatedMatrix8x8
+
+LIMIT_SECONDS = 0.050
+
+# the longest frame period of any pattern, Led8x8Idle
+LONGEST_PERIOD = 2.0
+
+BACKGROUNDS = (
+    ("idle", IDLE_STATE, FIBONACCI_MODE),
+    ("motion", SECURITY_STATE, FIBONACCI_MODE),
+    ("fibonacci", DEMO_STATE, FIBONACCI_MODE),
+    ("wopr", DEMO_STATE, WOPR_MODE),
+    ("life", DEMO_STATE, LIFE_MODE)
+)
+
+def wait_for_frame(scheduler, count, timeout=5.0):
+    """ wait until the scheduler has measured more than count latencies """
+    give_up = time.monotonic() + timeout
+    while scheduler.measured <= count:
+        if time.monotonic() > give_up:
+            raise RuntimeError('display thread did not show the alarm frame')
+        time.sleep(0.001)
+    return scheduler.latencies[-1]
+
+def measure(controller, state, mode, trials):
+    """ return the fire and panic latencies over a background pattern """
+    scheduler = controller.scheduler
+    latencies = []
+    controller.set_state(state)
+    controller.set_mode(mode, True)
+    for trial in range(trials):
+        time.sleep(random.uniform(0.0, LONGEST_PERIOD))
+        count = scheduler.measured
+        if trial % 2:
+            controller.set_mode(PANIC_MODE)
+        else:
+            controller.set_mode(FIRE_MODE)
+        latencies.append(wait_for_frame(scheduler, count))
+        count = scheduler.measured
+        controller.restore_mode()
+        wait_for_frame(scheduler, count)
+    return latencies
+
+def main():
+    """ run every background and report the latencies in milliseconds """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trials', type=int, default=10)
+    parser.add_argument('--limit', type=float, default=LIMIT_SECONDS)
+    parser.add_argument('--asyncio', action='store_true')
+    args = parser.parse_args()
+    controller = Led8x8Controller(SimulatedMatrix8x8())
+    controller.reset()
+    if args.asyncio:
+        runtime = AsyncRuntime()
+        runtime.add_controller(controller)
+        runtime.run_in_thread()
+    else:
+        controller.run()
+    worst = 0.0
+    for name, state, mode in BACKGROUNDS:
+        latencies = measure(controller, state, mode, args.trials)
+        worst = max(worst, max(latencies))
+        print('{:10s} mean {:7.3f} ms  max {:7.3f} ms'.format(
+            name, 1000 * sum(latencies) / len(latencies), 1000 * max(latencies)))
+    print('worst case {:.3f} ms, limit {:.3f} ms'.format(1000 * worst, 1000 * args.limit))
+    return 0 if worst < args.limit else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
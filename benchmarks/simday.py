@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+""" Run a simulated day of the LED matrix, clock and interval timer on VirtualTime
+
+    python3 -m benchmarks.simday [--hours N] [--limit SECONDS] [--latitude L --longitude L]
+
+    A Led8x8Controller, a LedClock and an IntervalTimer run on the simulated
+    backpacks through a SimulatedRuntime starting at midnight. A script of MQTT
+    style commands switches states and modes, reports motion, sounds fire and
+    panic alarms and runs countdown timers through the day, while the playlist
+    rotates and the lights turn on and off on their own. Reports the wall clock
+    seconds the day took, the frames and I2C bytes of each device, alarm
+    latencies and the light transitions. Exits 1 when the day took longer than
+    the limit or the lights did not switch as scheduled.
+"""
+
+import sys
+import time
+import datetime
+import argparse
+
+from pkg_classes.intervaltimer import IntervalTimer
+from pkg_classes.led8x8controller import Led8x8Controller
+from pkg_classes.led8x8controller import SECURITY_STATE, FIRE_MODE, PANIC_MODE, LIFE_MODE
+from pkg_classes.ledclock import LedClock, TIME_MODE, WHO_MODE, COUNT_MODE
+from pkg_classes.simulatedbackpack import I2CTransactionRecorder
+from pkg_classes.simulatedbackpack import SimulatedMatrix8x8, SimulatedSevenSegment
+from pkg_classes.simulatedruntime import SimulatedRuntime
+from pkg_classes.timesource import VirtualTime
+
+HOURS = 24
+
+LIMIT_SECONDS = 60.0
+
+START = datetime.datetime(2026, 10, 18)
+
+MOTION_TOPICS = ("diy/main/living/motion", "diy/upper/study/motion",
+                 "diy/main/hallway/motion", "diy/perimeter/front/motion")
+
+HOUR = 3600
+
+def script(runtime, controller, clock):
+    """ queue the day's commands, at seconds after midnight """
+    def at(seconds, callback, *args):
+        """ call at a time of the simulated day """
+        runtime.call_later(seconds, callback, *args)
+
+    # a night of motion on the security display
+    at(1 * HOUR, controller.set_state, SECURITY_STATE)
+    for minute in range(0, 120, 7):
+        topic = MOTION_TOPICS[minute % len(MOTION_TOPICS)]
+        at(2 * HOUR + 60 * minute, controller.update_motion, topic)
+    at(4 * HOUR + 1800, controller.set_mode, FIRE_MODE)
+    at(4 * HOUR + 1830, controller.restore_mode)
+    # the morning kitchen timers
+    at(7 * HOUR, clock.set_mode, COUNT_MODE)
+    at(7 * HOUR, clock.count.timers.start, 'tea', 240)
+    at(7 * HOUR + 60, clock.count.timers.start, 'eggs', 420)
+    at(7 * HOUR + 120, clock.count.timers.pause, 'eggs')
+    at(7 * HOUR + 180, clock.count.timers.resume, 'eggs')
+    at(8 * HOUR, clock.set_mode, WHO_MODE)
+    at(8 * HOUR + 30, clock.set_mode, TIME_MODE)
+    # the demo playlist all day, an override and alarms
+    at(12 * HOUR, controller.set_mode, LIFE_MODE, True)
+    at(12 * HOUR + 600, controller.set_mode, PANIC_MODE)
+    at(12 * HOUR + 630, controller.restore_mode)
+    at(13 * HOUR, controller.restore_mode)
+    at(18 * HOUR, controller.set_mode, FIRE_MODE)
+    at(18 * HOUR + 45, controller.restore_mode)
+
+def record_lights(timer):
+    """ wrap timer.control_lights to record the local time of each switch """
+    switches = []
+    control_lights = timer.control_lights
+
+    def record(switch):
+        """ note the switch and pass it on """
+        switches.append((timer.time_source.now(), switch))
+        control_lights(switch)
+
+    timer.control_lights = record
+    return switches
+
+def main():
+    """ run the day and report what happened """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hours', type=float, default=HOURS)
+    parser.add_argument('--limit', type=float, default=LIMIT_SECONDS)
+    parser.add_argument('--latitude', type=float)
+    parser.add_argument('--longitude', type=float)
+    args = parser.parse_args()
+    time_source = VirtualTime(START)
+    runtime = SimulatedRuntime(time_source)
+    recorder = I2CTransactionRecorder(keep_log=False)
+    controller = Led8x8Controller(SimulatedMatrix8x8(0x70, recorder), time_source=time_source)
+    controller.reset()
+    clock = LedClock(SimulatedSevenSegment(0x71, recorder), time_source=time_source)
+    timer = IntervalTimer(clock, controller, latitude=args.latitude,
+                          longitude=args.longitude, time_source=time_source)
+    switches = record_lights(timer)
+    runtime.add_controller(controller)
+    runtime.add_clock(clock)
+    runtime.add_interval_timer(timer)
+    script(runtime, controller, clock)
+    started = time.perf_counter()
+    steps = runtime.run_for(args.hours * HOUR)
+    wall = time.perf_counter() - started
+    matrix = controller.scheduler.statistics()
+    print('{:.1f} simulated hours in {:.3f} s, {:d} steps'.format(args.hours, wall, steps))
+    print('matrix  frames {:d}  preemptions {:d}  max latency {:.3f} ms  bytes {:d}'.format(
+        matrix["frames"], matrix["preemptions"], 1000 * matrix["max_latency"],
+        recorder.bytes_written(0x70)))
+    print('clock   frames {:d}  skipped {:d}  renders {:d}  timers {:d}  bytes {:d}'.format(
+        clock.scheduler.frames, clock.scheduler.skipped, clock.clock.renders,
+        clock.count.timers.expirations, recorder.bytes_written(0x71)))
+    for when, switch in switches:
+        print('lights  {:s} {:s}'.format(when.strftime('%H:%M:%S'), switch))
+    # the lights start the day off, then turn on and off once each
+    expected = ['Turn On', 'Turn Off'] if args.hours >= HOURS else None
+    if wall > args.limit:
+        return 1
+    if expected is not None and [switch for _, switch in switches] != expected:
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
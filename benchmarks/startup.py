@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+""" Import time and time to first frame of the LED controller and clock
+
+    python3 -m benchmarks.startup [--repeats N] [--output FILE] [--baseline FILE]
+                                  [--tolerance PCT]
+
+    Every measurement runs in a fresh interpreter. One run under -X importtime
+    reports the cumulative import time of the module and how many modules it
+    pulls in. Another imports the module, builds the device on a simulated
+    backpack and renders and writes the first frame, reporting the milliseconds
+    to the import, to the device and to the first frame. Timings are the fastest
+    of the repeats.
+
+    Results are printed as JSON and optionally saved. With --baseline the run is
+    compared metric by metric against a saved run and exits 1 when a metric
+    grows by more than the tolerance.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+from benchmarks.patterns import compare
+
+REPEATS = 5
+
+TOLERANCE_PERCENT = 25.0
+
+# the module count is compared at the counted metric tolerance
+TIMED_METRICS = ("import_ms", "first_import_ms", "constructed_ms", "first_frame_ms")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONTROLLER_FIRST_FRAME = """
+from pkg_classes.simulatedbackpack import SimulatedMatrix8x8
+controller = Led8x8Controller(SimulatedMatrix8x8())
+built = time.perf_counter()
+controller.reset()
+pattern, priority = controller.select_pattern()
+pattern.display()
+controller.finish_frame(priority)
+"""
+
+CLOCK_FIRST_FRAME = """
+from pkg_classes.simulatedbackpack import SimulatedSevenSegment
+clock = LedClock(SimulatedSevenSegment(0x71))
+built = time.perf_counter()
+clock.update()
+"""
+
+# name: (module, class, code that builds the device and shows the first frame)
+TARGETS = {
+    "controller": ("pkg_classes.led8x8controller", "Led8x8Controller",
+                   CONTROLLER_FIRST_FRAME),
+    "clock": ("pkg_classes.ledclock", "LedClock", CLOCK_FIRST_FRAME)
+}
+
+FIRST_FRAME = """
+import time
+start = time.perf_counter()
+from {module} import {name}
+imported = time.perf_counter()
+{code}
+shown = time.perf_counter()
+print(1000 * (imported - start), 1000 * (built - start), 1000 * (shown - start))
+"""
+
+def python(*args):
+    """ run the interpreter in the repository, returns its stdout and stderr """
+    result = subprocess.run([sys.executable] + list(args), cwd=ROOT, check=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    return result.stdout, result.stderr
+
+def import_report(code):
+    """ return {module: cumulative microseconds} from -X importtime """
+    _, report = python('-X', 'importtime', '-c', code)
+    modules = {}
+    for line in report.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = [field.strip() for field in line[len('import time:'):].split('|')]
+        if len(fields) == 3 and fields[1].isdigit():
+            modules[fields[2]] = int(fields[1])
+    return modules
+
+def import_time(module):
+    """ return the cumulative import milliseconds of a module and the number of
+        modules imported with it beyond those of interpreter startup
+    """
+    startup = import_report('pass')
+    modules = import_report('import ' + module)
+    return modules[module] / 1000.0, len(set(modules) - set(startup))
+
+def first_frame(module, name, code):
+    """ return the milliseconds to import, build and show the first frame """
+    output, _ = python('-c', FIRST_FRAME.format(module=module, name=name, code=code))
+    return [float(value) for value in output.split()]
+
+def measure(module, name, code, repeats):
+    """ return the fastest startup metrics of repeated fresh interpreters """
+    best = {}
+    for _ in range(repeats):
+        imported, modules = import_time(module)
+        import_ms, built_ms, shown_ms = first_frame(module, name, code)
+        for metric, value in (("import_ms", imported), ("modules_imported", modules),
+                              ("first_import_ms", import_ms), ("constructed_ms", built_ms),
+                              ("first_frame_ms", shown_ms)):
+            if metric not in best or value < best[metric]:
+                best[metric] = value
+    return best
+
+def main():
+    """ run the startup benchmarks, save and compare the results """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE_PERCENT)
+    args = parser.parse_args()
+    results = {}
+    for target, (module, name, code) in TARGETS.items():
+        results[target] = measure(module, name, code, args.repeats)
+    print(json.dumps(results, indent=2, sort_keys=True))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline), args.tolerance,
+                                  TIMED_METRICS)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+""" Drive every LED controller, clock, motion sensor and interval timer from
+    one asyncio event loop instead of a thread per device.
+
+    location = MqttLocationTopic(latitude=40.7, longitude=-74.0)
+    runtime = AsyncRuntime()
+    controller = runtime.add_controller(Led8x8Controller(matrix))
+    clock = runtime.add_clock(LedClock(location=location))
+    runtime.add_motion(MotionController(pin), on_motion)
+    runtime.add_interval_timer(IntervalTimer(clock, controller, location=location))
+    runtime.run_in_thread()    # or runtime.run_forever() on the main thread
+
+    Commands from other threads, such as MQTT callbacks calling set_mode, wake the
+    display tasks through the loop, so the thread based entry points and callers
+    keep working unchanged.
+"""
+
+import asyncio
+import logging
+from threading import Thread
+
+LOGGER = logging.getLogger(__name__)
+
+class AsyncRuntime:
+    """ One event loop running devices as tasks and timed events as loop.call_at """
+
+    def __init__(self, loop=None):
+        """ use a loop passed in or create a new one """
+        if loop is None:
+            loop = asyncio.new_event_loop()
+        self.loop = loop
+        self.tasks = []
+        self.thread = None
+
+    def add_task(self, coroutine):
+        """ run a coroutine as a task, callable from any thread """
+        if self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.start_task(coroutine), self.loop)
+        else:
+            self.tasks.append(self.loop.create_task(coroutine))
+
+    async def start_task(self, coroutine):
+        """ create a task on the running loop """
+        self.tasks.append(asyncio.get_running_loop().create_task(coroutine))
+
+    def add_controller(self, controller):
+        """ run a Led8x8Controller display """
+        self.add_task(controller.display_task())
+        return controller
+
+    def add_clock(self, clock):
+        """ run a LedClock display """
+        self.add_task(clock.time_update_task())
+        return clock
+
+    def add_motion(self, motion, callback):
+        """ call callback with each MotionController reading, 1 or 0, on the loop """
+        self.add_task(self.motion_task(motion, callback))
+        return motion
+
+    @staticmethod
+    async def motion_task(motion, callback):
+        """ await motion events and pass them on """
+        while True:
+            reading = await motion.wait_for_motion_async()
+            try:
+                callback(reading)
+            #pylint: disable=broad-except
+            except Exception:
+                LOGGER.error("Exception occurred", exc_info=True)
+
+    def add_interval_timer(self, timer):
+        """ run IntervalTimer timed events on loop.call_at """
+        self.loop.call_soon_threadsafe(timer.schedule, self.loop)
+        return timer
+
+    def run_forever(self,):
+        """ run the loop on this thread until stop() """
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            for task in self.tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*self.tasks, return_exceptions=True))
+            self.loop.close()
+
+    def run_in_thread(self,):
+        """ run the loop on a daemon thread, e.g. beside an MQTT client loop """
+        self.thread = Thread(target=self.run_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self.thread
+
+    def stop(self,):
+        """ stop the loop, callable from any thread """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+if __name__ == '__main__':
+    exit()
@@ -0,0 +1,235 @@
+#!/usr/bin/python3
+""" Named countdown timers on time.monotonic deadlines
+
+    Timers can be paused, resumed and extended while others run. A daemon thread
+    sleeps on a condition until the nearest deadline, or until a timer changes,
+    and calls the expiry callbacks from there, so nothing polls:
+
+        timers = CountdownEngine(on_expire=alarm)
+        timers.start('tea', 240)
+        timers.start('pasta', 600, callback=drain)
+        timers.pause('pasta')
+        timers.extend('tea', 30)
+        timer = timers.nearest()
+"""
+
+import heapq
+import logging
+import threading
+
+from .timesource import SYSTEM_TIME
+
+LOGGER = logging.getLogger(__name__)
+
+class CountdownTimer:
+    """ A named countdown, running toward a deadline or paused with time left """
+
+    #pylint: disable=too-many-arguments
+    def __init__(self, name, seconds, callback=None, repeat=False, time_source=SYSTEM_TIME):
+        """ callback(name) is called on expiry; a repeating timer starts over
+            from its deadline
+        """
+        self.time_source = time_source
+        self.name = name
+        self.duration = seconds
+        self.callback = callback
+        self.repeat = repeat
+        # time.monotonic() of expiry while running, None while paused or expired
+        self.deadline = None
+        self.left = seconds
+        # bumped when the deadline moves so older heap entries can be ignored
+        self.generation = 0
+        self.expired = threading.Event()
+
+    def running(self,):
+        """ is the timer counting down? """
+        return self.deadline is not None
+
+    def remaining(self, now=None):
+        """ return the seconds left, 0.0 once expired """
+        if self.deadline is None:
+            return self.left
+        if now is None:
+            now = self.time_source.monotonic()
+        return max(0.0, self.deadline - now)
+
+class CountdownEngine:
+    """ Countdown timers by name with a heap of their deadlines """
+
+    def __init__(self, on_expire=None, time_source=SYSTEM_TIME):
+        """ on_expire(name) is called after the callback of any timer """
+        self.time_source = time_source
+        self.on_expire = on_expire
+        self.timers = {}
+        self.heap = []
+        self.sequence = 0
+        self.expirations = 0
+        self.condition = threading.Condition()
+        self.thread = None
+        # False when the owner calls expire_due() instead, e.g. a SimulatedRuntime
+        self.threaded = True
+        self.stopping = False
+
+    def __contains__(self, name):
+        return name in self.timers
+
+    def start(self, name, seconds, callback=None, repeat=False):
+        """ start or restart a timer, returns the CountdownTimer """
+        timer = CountdownTimer(name, seconds, callback, repeat, self.time_source)
+        with self.condition:
+            old = self.timers.get(name)
+            if old is not None:
+                old.generation += 1
+            self.timers[name] = timer
+            self.arm(timer, self.time_source.monotonic() + seconds)
+        return timer
+
+    def pause(self, name):
+        """ stop a running timer keeping the time it has left """
+        with self.condition:
+            timer = self.timers[name]
+            if timer.running():
+                timer.left = timer.remaining()
+                timer.deadline = None
+                timer.generation += 1
+
+    def resume(self, name):
+        """ continue a paused timer """
+        with self.condition:
+            timer = self.timers[name]
+            if not timer.running():
+                self.arm(timer, self.time_source.monotonic() + timer.left)
+
+    def extend(self, name, seconds):
+        """ add seconds to a timer, running or paused """
+        with self.condition:
+            timer = self.timers[name]
+            if timer.running():
+                self.arm(timer, timer.deadline + seconds)
+            else:
+                timer.left += seconds
+
+    def cancel(self, name):
+        """ forget a timer without calling its callback """
+        with self.condition:
+            timer = self.timers.pop(name, None)
+            if timer is not None:
+                timer.deadline = None
+                timer.generation += 1
+
+    def remaining(self, name):
+        """ return the seconds left on a timer """
+        return self.timers[name].remaining()
+
+    def nearest(self, exclude=None):
+        """ return the running timer nearest expiry, else the paused timer with
+            the least time left, None when there are no timers; the timer named
+            exclude is passed over
+        """
+        with self.condition:
+            if exclude is not None:
+                timers = [timer for name, timer in self.timers.items() if name != exclude]
+                running = [timer for timer in timers if timer.running()]
+                if running:
+                    return min(running, key=lambda timer: timer.deadline)
+                if timers:
+                    return min(timers, key=lambda timer: timer.left)
+                return None
+            while self.heap and not self.current(self.heap[0]):
+                heapq.heappop(self.heap)
+            if self.heap:
+                return self.heap[0][3]
+            if self.timers:
+                return min(self.timers.values(), key=lambda timer: timer.left)
+            return None
+
+    def arm(self, timer, deadline):
+        """ set a deadline and wake the thread to sleep until the new nearest one """
+        timer.deadline = deadline
+        timer.generation += 1
+        self.sequence += 1
+        heapq.heappush(self.heap, (deadline, self.sequence, timer.generation, timer))
+        if self.threaded and self.thread is None:
+            self.thread = threading.Thread(target=self.expiry_thread, name='CountdownEngine')
+            self.thread.daemon = True
+            self.thread.start()
+        self.condition.notify()
+
+    def current(self, entry):
+        """ is a heap entry still the deadline of a live timer? """
+        _, _, generation, timer = entry
+        return generation == timer.generation and self.timers.get(timer.name) is timer
+
+    def expire(self, now):
+        """ pop the timers due by now, re-arming repeating ones """
+        expired = []
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            if not self.current(entry):
+                continue
+            timer = entry[3]
+            if timer.repeat and timer.duration > 0:
+                deadline = timer.deadline + timer.duration
+                if deadline <= now:
+                    # far behind, e.g. after a suspend, start from now
+                    deadline = now + timer.duration
+                self.arm(timer, deadline)
+            else:
+                del self.timers[timer.name]
+                timer.deadline = None
+                timer.left = 0.0
+            timer.expired.set()
+            self.expirations += 1
+            expired.append(timer)
+        return expired
+
+    def expiry_thread(self,):
+        """ sleep until the nearest deadline and call the expiry callbacks """
+        while True:
+            with self.condition:
+                if self.stopping:
+                    return
+                expired = self.expire(self.time_source.monotonic())
+                if not expired:
+                    timeout = None
+                    if self.heap:
+                        timeout = self.heap[0][0] - self.time_source.monotonic()
+                    self.condition.wait(timeout)
+                    continue
+            for timer in expired:
+                self.notify(timer)
+
+    def next_deadline(self,):
+        """ return the nearest deadline, possibly of a changed timer, None if none """
+        with self.condition:
+            return self.heap[0][0] if self.heap else None
+
+    def expire_due(self,):
+        """ expire the timers due now and call their callbacks, for owners that
+            drive the engine without its thread; returns the number expired
+        """
+        with self.condition:
+            expired = self.expire(self.time_source.monotonic())
+        for timer in expired:
+            self.notify(timer)
+        return len(expired)
+
+    def notify(self, timer):
+        """ call the callbacks of an expired timer """
+        for callback in (timer.callback, self.on_expire):
+            if callback is None:
+                continue
+            try:
+                callback(timer.name)
+            #pylint: disable=broad-except
+            except Exception:
+                LOGGER.error("Exception occurred", exc_info=True)
+
+    def stop(self,):
+        """ stop the expiry thread """
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+
+if __name__ == '__main__':
+    exit()
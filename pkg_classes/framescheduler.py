@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+""" Drift free frame pacing on time.monotonic deadlines for the LED display
+    threads and asyncio tasks
+"""
+
+import math
+import threading
+from collections import deque
+
+from .timesource import SYSTEM_TIME
+
+# recent command to first frame latencies kept for statistics
+LATENCY_SAMPLES = 100
+
+# aligned frames wake this long after the wall clock boundary, so a wait that
+# ends a little early still shows the new second
+ALIGN_OFFSET = 0.002
+
+class FrameScheduler:
+    """ Wait for frame deadlines that advance by a fixed period, so render and
+        I2C time do not stretch the frame period.
+    """
+
+    def __init__(self, period=1.0, catch_up=0, align=False, time_source=SYSTEM_TIME):
+        """ period is the default frame period in seconds; up to catch_up whole
+            missed frames are rendered back to back, more than that are skipped.
+            With align the deadlines fall on whole multiples of the period of
+            time.time(), every second for a clock, and missed frames are skipped.
+        """
+        self.time_source = time_source
+        self.period = period
+        self.catch_up = catch_up
+        self.align = align
+        self.deadline = None
+        # time.time() of the wall clock boundary of the last aligned deadline
+        self.boundary = None
+        self.wakeup = threading.Event()
+        # set once a task waits with wait_async
+        self.loop = None
+        self.async_wakeup = None
+        self.preempted = False
+        self.command_time = None
+        self.preempt_time = None
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        # every latency recorded, the deque stops growing once full
+        self.measured = 0
+        self.max_latency = 0.0
+        self.frames = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.max_late = 0.0
+        self.preemptions = 0
+
+    def reset(self,):
+        """ start a new deadline sequence from now, e.g. after an error """
+        self.deadline = None
+
+    def interrupt(self, command=True):
+        """ cut the current wait short, typically called from another thread when
+            a command must be shown at once; a wakeup that is not a command, such
+            as new data for the pattern shown, is left out of the latencies
+        """
+        if command:
+            self.command_time = self.time_source.monotonic()
+        self.wakeup.set()
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.async_wakeup.set)
+
+    def wait(self, period=None):
+        """ sleep until the next deadline, one period after the last one; returns
+            True when interrupted so the caller can pick its pattern again, the
+            wait after an interrupt returns False at once
+        """
+        delay = self.begin_wait(period)
+        if delay is None:
+            return True
+        if delay > 0.0:
+            self.time_source.wait(self.wakeup, delay)
+        return self.wait_over()
+
+    def begin_wait(self, period=None):
+        """ start a wait: returns the seconds to sleep, or None when an interrupt
+            is pending and the wait is over already
+        """
+        if self.wakeup.is_set():
+            self.preempt()
+            return None
+        return self.advance(period)
+
+    def wait_over(self,):
+        """ end a wait begun with begin_wait, slept by wait(), wait_async() or
+            e.g. a SimulatedRuntime; returns True when interrupted
+        """
+        if self.wakeup.is_set():
+            return self.preempt()
+        self.frames += 1
+        return False
+
+    async def wait_async(self, period=None):
+        """ wait() for a task on an asyncio event loop """
+        delay = self.begin_wait(period)
+        if delay is None:
+            return True
+        if delay > 0.0:
+            await self.sleep_async(delay)
+        return self.wait_over()
+
+    async def sleep_async(self, delay):
+        """ sleep on the running loop, returns True when interrupted """
+        #pylint: disable=import-outside-toplevel
+        import asyncio
+        if self.async_wakeup is None:
+            self.async_wakeup = asyncio.Event()
+            self.loop = asyncio.get_running_loop()
+        self.async_wakeup.clear()
+        # an interrupt from before the loop was known only set the thread event
+        if self.wakeup.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self.async_wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        return self.wakeup.is_set()
+
+    def advance(self, period=None):
+        """ move to the next deadline and return the seconds left until it """
+        if period is None:
+            period = self.period
+        now = self.time_source.monotonic()
+        if self.preempted:
+            # the frame after an interrupt starts a new deadline sequence now
+            self.preempted = False
+            self.deadline = now
+            return 0.0
+        if self.align:
+            return self.align_deadline(now, period)
+        if self.deadline is None:
+            self.deadline = now
+        self.deadline += period
+        late = now - self.deadline
+        if late > 0.0:
+            # render at once to catch up, skipping whole frames when too far behind
+            self.overruns += 1
+            if late > self.max_late:
+                self.max_late = late
+            missed = int(late // period)
+            if missed > self.catch_up:
+                self.skipped += missed
+                self.deadline += missed * period
+        return -late
+
+    def align_deadline(self, now, period):
+        """ set the deadline just after the next wall clock multiple of period
+            not waited for yet and return the seconds left until it; the period
+            may change from one frame to the next
+        """
+        wall = self.time_source.time()
+        boundary = (math.floor((wall - ALIGN_OFFSET) / period) + 1) * period
+        if self.boundary is not None:
+            if boundary <= self.boundary + ALIGN_OFFSET:
+                # the last wait ended a little before its boundary
+                boundary = (math.floor(self.boundary / period + 0.5) + 1) * period
+            else:
+                missed = int(round((boundary - self.boundary) / period)) - 1
+                if missed > 0:
+                    self.overruns += 1
+                    self.skipped += missed
+        self.boundary = boundary
+        delay = boundary + ALIGN_OFFSET - wall
+        self.deadline = now + delay
+        return delay
+
+    def preempt(self,):
+        """ consume an interrupt and return True """
+        self.wakeup.clear()
+        self.preempted = True
+        if self.command_time is not None:
+            self.preempt_time = self.command_time
+            self.command_time = None
+            self.preemptions += 1
+        return True
+
+    def frame_shown(self,):
+        """ called once a frame is out; the first frame after an interrupt
+            records the command to first frame latency
+        """
+        if self.preempt_time is None:
+            return
+        latency = self.time_source.monotonic() - self.preempt_time
+        self.preempt_time = None
+        self.latencies.append(latency)
+        self.measured += 1
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def statistics(self,):
+        """ return the frame, overrun, skipped frame, preemption and latency counts """
+        mean_latency = 0.0
+        if self.latencies:
+            mean_latency = sum(self.latencies) / len(self.latencies)
+        return {"frames": self.frames, "overruns": self.overruns,
+                "skipped": self.skipped, "max_late": self.max_late,
+                "preemptions": self.preemptions, "mean_latency": mean_latency,
+                "max_latency": self.max_latency}
+
+if __name__ == '__main__':
+    exit()
@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+""" Serialize I2C traffic from every LED backpack sharing one bus """
+
+import time
+import heapq
+import threading
+
+# lower values are served first
+ALARM_PRIORITY = 0
+NORMAL_PRIORITY = 1
+BACKGROUND_PRIORITY = 2
+
+class ArbitratedDevice:
+    """ Adafruit_GPIO.I2C.Device wrapper that takes the bus for every write """
+
+    def __init__(self, device, arbiter):
+        """ wrap the device a backpack driver writes through """
+        self.device = device
+        self.arbiter = arbiter
+        #pylint: disable=protected-access
+        self._address = device._address
+
+    def writeRaw8(self, value):
+        """ write a single byte with no register """
+        #pylint: disable=invalid-name
+        with self.arbiter.transaction(self._address):
+            self.device.writeRaw8(value)
+
+    def write8(self, register, value):
+        """ write one byte to a register """
+        #pylint: disable=invalid-name
+        with self.arbiter.transaction(self._address):
+            self.device.write8(register, value)
+
+    def writeList(self, register, data):
+        """ write a block of bytes starting at a register """
+        #pylint: disable=invalid-name
+        with self.arbiter.transaction(self._address):
+            self.device.writeList(register, data)
+
+    def __getattr__(self, name):
+        """ reads and anything else go straight to the device """
+        return getattr(self.device, name)
+
+class BusTransaction:
+    """ Context manager holding the bus for one device """
+
+    def __init__(self, arbiter, address, priority):
+        """ remember what to ask the arbiter for """
+        self.arbiter = arbiter
+        self.address = address
+        self.priority = priority
+
+    def __enter__(self,):
+        self.arbiter.acquire(self.address, self.priority)
+        return self
+
+    def __exit__(self, *args):
+        self.arbiter.release()
+
+class I2CBusArbiter:
+    """ Priority ordered, reentrant ownership of a shared I2C bus. A thread holds
+        the bus for a whole transaction, so the writes of one device frame go out
+        together, and waiting threads are served alarm traffic first, then the
+        device that just used the bus, then in arrival order.
+    """
+
+    def __init__(self,):
+        """ create an idle bus """
+        self.lock = threading.Lock()
+        self.owner = None
+        self.depth = 0
+        self.address = None
+        self.waiters = []
+        self.sequence = 0
+        self.transactions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_queue_depth = 0
+        self.device_transactions = {}
+
+    def attach(self, display):
+        """ route every write of an HT16K33 display through the arbiter """
+        #pylint: disable=protected-access
+        if not isinstance(display._device, ArbitratedDevice):
+            display._device = ArbitratedDevice(display._device, self)
+        return display
+
+    def transaction(self, address, priority=NORMAL_PRIORITY):
+        """ return a context manager that holds the bus for a device """
+        return BusTransaction(self, address, priority)
+
+    def acquire(self, address, priority=NORMAL_PRIORITY):
+        """ wait for the bus; nested calls from the owning thread pass through """
+        me = threading.get_ident()
+        start = time.monotonic()
+        with self.lock:
+            if self.owner == me:
+                self.depth += 1
+                return
+            if self.owner is None and not self.waiters:
+                self.grant(me, address)
+                return
+            self.contended += 1
+            ready = threading.Event()
+            self.sequence += 1
+            heapq.heappush(self.waiters, [priority, self.sequence, address, me, ready])
+            if len(self.waiters) > self.max_queue_depth:
+                self.max_queue_depth = len(self.waiters)
+        ready.wait()
+        waited = time.monotonic() - start
+        with self.lock:
+            self.total_wait += waited
+            if waited > self.max_wait:
+                self.max_wait = waited
+
+    def grant(self, owner, address):
+        """ hand the bus to a thread, called with the lock held """
+        self.owner = owner
+        self.depth = 1
+        self.address = address
+        self.transactions += 1
+        self.device_transactions[address] = self.device_transactions.get(address, 0) + 1
+
+    def release(self,):
+        """ give up the bus, passing it to the next waiter """
+        with self.lock:
+            self.depth -= 1
+            if self.depth > 0:
+                return
+            self.owner = None
+            if not self.waiters:
+                return
+            # batch the same device among waiters of the best priority
+            chosen = self.waiters[0]
+            batched = [waiter for waiter in self.waiters
+                       if waiter[0] == chosen[0] and waiter[2] == self.address]
+            if batched:
+                chosen = min(batched)
+            self.waiters.remove(chosen)
+            heapq.heapify(self.waiters)
+            self.grant(chosen[3], chosen[2])
+            chosen[4].set()
+
+    def queue_depth(self,):
+        """ return the number of threads waiting for the bus """
+        with self.lock:
+            return len(self.waiters)
+
+    def statistics(self,):
+        """ return the contention counters """
+        with self.lock:
+            mean_wait = self.total_wait / self.contended if self.contended else 0.0
+            return {"transactions": self.transactions, "contended": self.contended,
+                    "mean_wait": mean_wait, "max_wait": self.max_wait,
+                    "queue_depth": len(self.waiters),
+                    "max_queue_depth": self.max_queue_depth,
+                    "devices": dict(self.device_transactions)}
+
+if __name__ == '__main__':
+    exit()
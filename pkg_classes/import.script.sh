@@ -8,6 +8,9 @@ sudo pip3 install psutil
 sudo pip3 install pylint
 sudo apt -y install screen
 
+echo "Install numpy for the optional large Game of Life world"
+sudo pip3 install numpy
+
 echo "Install Adafruit stuff"
 git clone https://github.com/adafruit/Adafruit_Python_GPIO.git
 cd Adafruit_Python_GPIO
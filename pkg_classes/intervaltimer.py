@@ -23,10 +23,13 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-import time
 import datetime
 import logging
-import logging.config
+import threading
+
+from .logconfig import CLOCK_LOGGING_INI, configure_logging
+from .suntimes import sun_times
+from .timesource import SYSTEM_TIME
 
 # state machine modes
 
@@ -34,56 +37,237 @@ IDLE_STATE = 0
 DEMO_STATE = 1
 SECURITY_STATE = 2
 
-# Start logging and enable imported classes to log appropriately.
+SUNRISE = 'sunrise'
+SUNSET = 'sunset'
+
+# sleep at most this long so wall clock changes are noticed
+MAXIMUM_SLEEP_SECONDS = 3600.0
+
+# days looked at for the last and next occurrence of an event
+SEARCH_DAYS = 3
 
-logging.config.fileConfig(fname='/home/an/clocks/logging.ini',
-                          disable_existing_loggers=False)
 LOGGER = logging.getLogger(__name__)
-LOGGER.info('Application started')
+
+class TimedEvent:
+    """ A device method called every day at a time of day, sunrise or sunset """
+
+    def __init__(self, when, device, method, args, offset=0):
+        """ when is a datetime.time, "HH:MM", SUNRISE or SUNSET, offset minutes
+            move it earlier or later
+        """
+        if isinstance(when, str) and when not in (SUNRISE, SUNSET):
+            hour, _, minute = when.partition(':')
+            when = datetime.time(int(hour), int(minute or 0))
+        self.when = when
+        self.device = device
+        self.method = method
+        self.args = args
+        self.offset = datetime.timedelta(minutes=offset)
+
+    def key(self,):
+        """ events with the same key replace each other's effect """
+        return self.device, self.method
+
+    def occurrence(self, day, sun):
+        """ return the local datetime of the event on a date, None when a sun
+            event does not happen that day; sun(day) returns (sunrise, sunset)
+        """
+        if self.when == SUNRISE:
+            at = sun(day)[0]
+        elif self.when == SUNSET:
+            at = sun(day)[1]
+        else:
+            at = datetime.datetime.combine(day, self.when)
+        if at is None:
+            return None
+        return at + self.offset
 
 class IntervalTimer:
     """ Interval timer event handler to brighten or dim LED devices. """
 
-    def __init__(self, clock, matrix, day = 6, night = 21):
-        """ Initialize day, night, and LED devices. """
+    #pylint: disable=too-many-arguments
+    def __init__(self, clock, matrix, day = 6, night = 21, latitude=None, longitude=None,
+                 time_source=SYSTEM_TIME, location=None):
+        """ Initialize day, night, and LED devices. Day starts at sunrise and
+            night at sunset instead when given a latitude and longitude, or an
+            MqttLocationTopic location configured with them.
+        """
+        self.time_source = time_source
+        if location is not None and (latitude is None or longitude is None):
+            latitude, longitude = location.get_coordinates()
         self.bright_lights = 12
         self.dim_lights = 0
         self.day = day
         self.night = night # 24 hour clock
-        # two LED devices from Adafruit
+        self.latitude = latitude
+        self.longitude = longitude
+        self.sun_cache = {}
+        # two LED devices from Adafruit and any others registered by name
         self.clock = clock
         self.matrix = matrix
-        # Turn on lights to bright
+        self.devices = {"lights": self}
+        self.events = []
+        # the (time, event) whose effect each (device, method) shows
+        self.applied = {}
         self.lights_are_on = False
-        self.control_lights("Turn On")
+        # the next check when scheduled on an asyncio event loop or the thread
+        self.timer_handle = None
+        self.loop = None
+        self.thread = None
+        self.wakeup = threading.Event()
+        if latitude is not None and longitude is not None:
+            self.add_event(SUNRISE, "lights", "control_lights", "Turn On")
+            self.add_event(SUNSET, "lights", "control_lights", "Turn Off")
+        else:
+            self.add_event(datetime.time(day), "lights", "control_lights", "Turn On")
+            self.add_event(datetime.time(night), "lights", "control_lights", "Turn Off")
+        self.check_for_timed_events()
+
+    def register(self, name, device):
+        """ add a device that events can call by name """
+        self.devices[name] = device
+
+    def add_event(self, when, device, method, *args, offset=0):
+        """ call device.method(*args) every day at when, "HH:MM", a
+            datetime.time, SUNRISE or SUNSET, offset by minutes
+        """
+        if when in (SUNRISE, SUNSET) and (self.latitude is None or self.longitude is None):
+            raise ValueError('IntervalTimer {} events need a latitude and longitude.'.format(when))
+        self.events.append(TimedEvent(when, device, method, args, offset))
+        self.wakeup.set()
+        # an event loop re-arms its call_at for the new next transition
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.schedule, loop)
+
+    def add_events(self, events):
+        """ add (when, device, method, *args) tuples, e.g. from a config file """
+        for event in events:
+            self.add_event(*event)
 
     def control_lights(self, switch):
         """ Dim lights at night or turn up during the day. """
         if switch == "Turn On":
-            self.clock.set_brightness(self.bright_lights)
-            self.matrix.set_state(DEMO_STATE)
+            if self.clock is not None:
+                self.clock.set_brightness(self.bright_lights)
+            if self.matrix is not None:
+                self.matrix.set_state(DEMO_STATE)
             self.lights_are_on = True
         else:
-            self.clock.set_brightness(self.dim_lights)
-            self.matrix.set_state(IDLE_STATE)
+            if self.clock is not None:
+                self.clock.set_brightness(self.dim_lights)
+            if self.matrix is not None:
+                self.matrix.set_state(IDLE_STATE)
             self.lights_are_on = False
+        LOGGER.info('IntervalTimer: %s', switch)
 
-    def check_for_timed_events(self,):
-        """ Dim the LED devices at night. """
-        now = datetime.datetime.now().time()
-        if now.hour <= self.day:
-            if self.lights_are_on:
-                self.control_lights("Turn Off")
-                msg = "Day: Turn On: "+str(now.hour)
-                LOGGER.info(msg)
-        elif now.hour >= self.night:
-            if self.lights_are_on:
-                self.control_lights("Turn Off")
-                msg = "Night: Turn Off: "+str(now.hour)
-                LOGGER.info(msg)
-        else:
-            if not self.lights_are_on:
-                self.control_lights("Turn On")
-                msg = "Normal: Turn ON: "+str(now.hour)
-                LOGGER.info(msg)
+    def sun(self, day):
+        """ return the (sunrise, sunset) of a date, remembering a few days """
+        times = self.sun_cache.get(day)
+        if times is None:
+            if len(self.sun_cache) > 2 * SEARCH_DAYS:
+                self.sun_cache.clear()
+            times = sun_times(day, self.latitude, self.longitude)
+            self.sun_cache[day] = times
+        return times
+
+    def in_effect(self, now):
+        """ return the (time, event) of the latest event at or before now for each
+            (device, method)
+        """
+        latest = {}
+        for event in self.events:
+            for back in range(SEARCH_DAYS):
+                at = event.occurrence(now.date() - datetime.timedelta(days=back), self.sun)
+                if at is not None and at <= now:
+                    break
+            else:
+                continue
+            key = event.key()
+            if key not in latest or at >= latest[key][0]:
+                latest[key] = (at, event)
+        return latest
+
+    def next_transition(self, now=None):
+        """ return the local datetime of the next event after now, None if none """
+        if now is None:
+            now = self.time_source.now()
+        upcoming = []
+        for event in self.events:
+            for ahead in range(SEARCH_DAYS):
+                at = event.occurrence(now.date() + datetime.timedelta(days=ahead), self.sun)
+                if at is not None and at > now:
+                    upcoming.append(at)
+                    break
+        return min(upcoming) if upcoming else None
+
+    def check_for_timed_events(self, now=None):
+        """ Call the events that took effect since the last check, e.g. dim the
+            LED devices at night; returns the number called.
+        """
+        if now is None:
+            now = self.time_source.now()
+        called = 0
+        for key, (at, event) in self.in_effect(now).items():
+            # an event repeats daily, so it is applied once per occurrence
+            if self.applied.get(key) == (at, event):
+                continue
+            self.applied[key] = (at, event)
+            device = self.devices.get(event.device)
+            if device is None:
+                LOGGER.info('IntervalTimer: %s is not registered', event.device)
+                continue
+            try:
+                getattr(device, event.method)(*event.args)
+                called += 1
+            #pylint: disable=broad-except
+            except Exception:
+                LOGGER.error("Exception occurred", exc_info=True)
+        return called
+
+    def seconds_to_next(self, now=None):
+        """ return the seconds until the next event, at most MAXIMUM_SLEEP_SECONDS """
+        if now is None:
+            now = self.time_source.now()
+        at = self.next_transition(now)
+        if at is None:
+            return MAXIMUM_SLEEP_SECONDS
+        return min(max(0.0, (at - now).total_seconds()), MAXIMUM_SLEEP_SECONDS)
+
+    def run_due_events(self,):
+        """ the body of the timer loop: call the events due and return the
+            seconds to sleep, a wakeup from add_event cuts the sleep short
+        """
+        self.wakeup.clear()
+        self.check_for_timed_events()
+        return self.seconds_to_next()
+
+    def timer_thread(self,):
+        """ sleep until each event is due, or an event is added, and call it """
+        while True:
+            self.time_source.wait(self.wakeup, self.run_due_events())
+
+    def schedule(self, loop):
+        """ Check now and again at the next event with loop.call_at. """
+        if self.loop is None:
+            self.start_logging()
+        self.loop = loop
+        try:
+            self.check_for_timed_events()
+        finally:
+            if self.timer_handle is not None:
+                self.timer_handle.cancel()
+            delay = self.seconds_to_next()
+            self.timer_handle = loop.call_at(loop.time() + delay, self.schedule, loop)
+
+    @staticmethod
+    def start_logging():
+        """ use the clock logging.ini unless the application configured logging """
+        configure_logging(CLOCK_LOGGING_INI)
 
+    def run(self,):
+        """ start the timer thread, see AsyncRuntime for the event loop instead """
+        self.start_logging()
+        self.thread = threading.Thread(target=self.timer_thread)
+        self.thread.daemon = True
+        self.thread.start()
@@ -25,17 +25,18 @@
 # SOFTWARE.
 
 import sys
-import time
-from threading import Thread
+from threading import Thread, RLock
+from collections import namedtuple
 import logging
-import logging.config
 
-from .led8x8idle import Led8x8Idle
-from .led8x8flash import Led8x8Flash
-from .led8x8fibonacci import Led8x8Fibonacci
-from .led8x8motion import Led8x8Motion
-from .led8x8wopr import Led8x8Wopr
-from .led8x8life import Led8x8Life
+from .framescheduler import FrameScheduler
+from .i2cbusarbiter import ALARM_PRIORITY, NORMAL_PRIORITY
+from .logconfig import CONTROLLER_LOGGING_INI, configure_logging
+from .led8x8framebuffer import Led8x8Framebuffer
+from .patternregistry import PatternRegistry
+from .roommap import DEFAULT_ROOMS
+from .timerwheel import TimerWheel
+from .timesource import SYSTEM_TIME
 
 # Color values as convenient globals.
 OFF = 0
@@ -43,6 +44,9 @@ GREEN = 1
 RED = 2
 YELLOW = 3
 
+# the patterns' own brightness, set once instead of by every constructor
+BRIGHTNESS = 5
+
 # state machine modes
 IDLE_STATE = 0
 DEMO_STATE = 1
@@ -54,142 +58,418 @@ PANIC_MODE = 1
 FIBONACCI_MODE = 2
 WOPR_MODE = 3
 LIFE_MODE = 4
+PRIME_MODE = 5
+
+MODES = (FIRE_MODE, PANIC_MODE, FIBONACCI_MODE, WOPR_MODE, LIFE_MODE, PRIME_MODE)
+
+STATES = (IDLE_STATE, DEMO_STATE, SECURITY_STATE)
+
+# built in patterns, name: (class imported on first use, arguments, never released)
+PATTERNS = {
+    "idle": (".led8x8idle:Led8x8Idle", (), False),
+    "fire": (".led8x8flash:Led8x8Flash", (RED,), True),
+    "panic": (".led8x8flash:Led8x8Flash", (YELLOW,), True),
+    "fibonacci": (".led8x8fibonacci:Led8x8Fibonacci", (), False),
+    "wopr": (".led8x8wopr:Led8x8Wopr", (), False),
+    "life": (".led8x8life:Led8x8Life", (), False),
+    "prime": (".led8x8prime:Led8x8Prime", (), False)
+}
 
-logging.config.fileConfig(fname='/home/an/diyha-dev/logging.ini', disable_existing_loggers=False)
+# built in patterns that keep time, constructed with the controller's time_source
+TIMED_PATTERNS = ("life",)
+
+# demo modes and the patterns they show, playlists may also name a pattern
+DEMO_PATTERNS = {FIBONACCI_MODE: "fibonacci", WOPR_MODE: "wopr", LIFE_MODE: "life",
+                 PRIME_MODE: "prime"}
 
-# Get the logger specified in the file
 LOGGER = logging.getLogger(__name__)
 
-LOGGER.info('Application started')
+# mode controller events
+MODE_EVENT = 0
+OVERRIDE_EVENT = 1
+RESTORE_EVENT = 2
+ROTATE_EVENT = 3
+
+# (event, an alarm mode is showing) -> ModeController action, None ignores it
+TRANSITIONS = {
+    (MODE_EVENT, False): "enter",
+    (MODE_EVENT, True): None,
+    (OVERRIDE_EVENT, False): "override",
+    (OVERRIDE_EVENT, True): "override",
+    (RESTORE_EVENT, False): "restore",
+    (RESTORE_EVENT, True): "restore",
+    (ROTATE_EVENT, False): "rotate",
+    (ROTATE_EVENT, True): "rearm"
+}
+
+PlaylistEntry = namedtuple('PlaylistEntry', 'mode duration brightness')
+
+# demo patterns in turn for duration seconds, brightness None leaves it alone
+DEFAULT_PLAYLIST = (
+    PlaylistEntry(FIBONACCI_MODE, 60.0, None),
+    PlaylistEntry(WOPR_MODE, 60.0, None),
+    PlaylistEntry(LIFE_MODE, 60.0, None)
+)
 
 class ModeController:
-    """ control changing modes. note Fire and Panic are externally controlled. """
+    """ control changing modes. note Fire and Panic are externally controlled.
+        Commands and rotation timers are events looked up in TRANSITIONS, and a
+        TimerWheel fires the rotation through the playlist. The rotation only
+        runs in the demo state and is held with its time left in the others.
+    """
 
-    def __init__(self,):
-        """ create mode control variables """
+    def __init__(self, playlist=DEFAULT_PLAYLIST, listener=None, time_source=SYSTEM_TIME):
+        """ create mode control variables; listener(entry) is called when a
+            playlist entry starts
+        """
         self.machine_state = DEMO_STATE
-        self.current_mode = FIBONACCI_MODE
-        self.last_mode = LIFE_MODE
-        self.start_time = time.time()
+        self.playlist = tuple(PlaylistEntry(*entry) for entry in playlist)
+        self.listener = listener
+        self.position = 0
+        self.current_mode = self.playlist[0].mode
+        self.last_mode = self.playlist[-1].mode
+        self.wheel = TimerWheel(time_source=time_source)
+        self.rotation = None
+        # seconds left of a rotation held outside the demo state
+        self.held = None
+        # commands arrive on MQTT threads while the display thread rotates
+        self.lock = RLock()
+        # bumped on every change so the display can cache its pattern
+        self.version = 0
+        self.arm()
+
+    def arm(self, duration=None):
+        """ start the rotation timer for the current mode, or hold it until the
+            demo state when in another state
+        """
+        if self.rotation is not None:
+            self.rotation.cancel()
+            self.rotation = None
+        if duration is None:
+            duration = self.playlist[self.position].duration
+        if self.machine_state != DEMO_STATE:
+            self.held = duration
+            return
+        self.held = None
+        self.rotation = self.wheel.schedule(duration, self.dispatch, ROTATE_EVENT)
+
+    def dispatch(self, event, mode=None):
+        """ apply an event, returns False when it is ignored """
+        with self.lock:
+            action = TRANSITIONS[(event, self.current_mode in (FIRE_MODE, PANIC_MODE))]
+            if action is None:
+                return False
+            getattr(self, action)(mode)
+            self.version += 1
+            return True
+
+    def enter(self, mode):
+        """ show a mode, picking up the playlist from it when it is in there """
+        self.last_mode = self.current_mode
+        self.current_mode = mode
+        for position, entry in enumerate(self.playlist):
+            if entry.mode == mode:
+                self.position = position
+                self.started(entry)
+                break
+        self.arm()
+
+    def override(self, mode):
+        """ replace any mode; restoring after a non alarm override keeps it """
+        self.enter(mode)
+        if mode not in (FIRE_MODE, PANIC_MODE):
+            self.last_mode = mode
+
+    def restore(self, _mode=None):
+        """ go back to the mode before the last change """
+        self.current_mode = self.last_mode
+        self.arm()
+
+    def rotate(self, _mode=None):
+        """ move on to the next playlist entry """
+        self.position = (self.position + 1) % len(self.playlist)
+        entry = self.playlist[self.position]
+        self.last_mode = self.current_mode
+        self.current_mode = entry.mode
+        self.started(entry)
+        self.arm()
+
+    def rearm(self, _mode=None):
+        """ an alarm is showing, try rotating again later """
+        self.arm()
+
+    def started(self, entry):
+        """ tell the listener a playlist entry has started """
+        if self.listener is not None:
+            self.listener(entry)
 
     def set_state(self, state):
         """ set the display mode """
-        self.machine_state = state
+        with self.lock:
+            left = self.held
+            if self.rotation is not None:
+                left = self.wheel.remaining(self.rotation)
+            self.machine_state = state
+            # leaving demo holds the rotation, coming back resumes it
+            self.arm(left)
+            self.version += 1
 
     def get_state(self,):
         """ get the display mode """
         return self.machine_state
 
-    def set_mode(self, mode):
-        """ set the display mode """
-        self.last_mode = self.current_mode
-        self.current_mode = mode
-        self.start_time = time.time()
+    def set_mode(self, mode, override=False):
+        """ set the display mode, fire and panic only give way to an override """
+        return self.dispatch(OVERRIDE_EVENT if override else MODE_EVENT, mode)
 
     def restore_mode(self,):
         """ set or override the display mode """
-        self.current_mode = self.last_mode
-        self.start_time = time.time()
+        self.dispatch(RESTORE_EVENT)
 
     def get_mode(self,):
         """ get current the display mode """
         return self.current_mode
 
-    def evaluate(self,):
-        """ initialize and start the fibinnocci display """
-        now_time = time.time()
-        elapsed = now_time - self.start_time
-        if elapsed > 60:
-            self.last_mode = self.current_mode
-            self.current_mode = self.current_mode + 1
-            self.start_time = now_time
-            if self.current_mode > LIFE_MODE:
-                self.current_mode = FIBONACCI_MODE
+    def selection(self,):
+        """ return the (state, mode) the display shows """
+        return self.machine_state, self.current_mode
+
+    def evaluate(self, now=None):
+        """ fire the rotation timer when it is due """
+        with self.lock:
+            self.wheel.advance(now)
+
 #pylint: disable=too-many-instance-attributes
 
 class Led8x8Controller:
     """ Idle or sleep pattern """
 
-    def __init__(self, matrix8x8,):
-        """ create initial conditions and saving display and I2C lock """
+    #pylint: disable=too-many-arguments
+    def __init__(self, matrix8x8, arbiter=None, rooms=DEFAULT_ROOMS,
+                 playlist=DEFAULT_PLAYLIST, time_source=SYSTEM_TIME):
+        """ create initial conditions and save the display and the I2CBusArbiter
+            shared with the other devices on the bus, if any; rooms is the motion
+            display RoomMap or room map file and playlist the demo PlaylistEntry list
+        """
+        self.time_source = time_source
         self.matrix8x8 = matrix8x8
         self.matrix8x8.clear()
-        self.mode_controller = ModeController()
-        self.idle = Led8x8Idle(self.matrix8x8)
-        self.fire = Led8x8Flash(self.matrix8x8, RED)
-        self.panic = Led8x8Flash(self.matrix8x8, YELLOW)
-        self.fib = Led8x8Fibonacci(self.matrix8x8)
-        self.motion = Led8x8Motion(self.matrix8x8)
-        self.wopr = Led8x8Wopr(self.matrix8x8)
-        self.life = Led8x8Life(self.matrix8x8)
+        self.arbiter = arbiter
+        if arbiter is not None:
+            arbiter.attach(self.matrix8x8)
+        self.matrix8x8.set_brightness(BRIGHTNESS)
+        self.framebuffer = Led8x8Framebuffer(self.matrix8x8, arbiter)
+        self.mode_controller = ModeController(playlist, self.playlist_entry, time_source)
+        self.brightness = None
+        self.playlist_entry(self.mode_controller.playlist[self.mode_controller.position])
+        self.patterns = PatternRegistry(self.matrix8x8, self.framebuffer,
+                                        time_source=time_source)
+        for name, (target, args, keep) in PATTERNS.items():
+            if name in TIMED_PATTERNS:
+                self.patterns.register(name, target, *args, keep=keep,
+                                       time_source=time_source)
+            else:
+                self.patterns.register(name, target, *args, keep=keep)
+        # motion keeps the room occupancy while other patterns are shown
+        self.patterns.register("motion", ".led8x8motion:Led8x8Motion", rooms=rooms,
+                               keep=True, time_source=time_source)
+        # plugins are looked for the first time a mode is not a known pattern
+        self.discovered = False
+        self.dispatch = self.dispatch_table()
+        self.version = None
+        self.selected = (None, NORMAL_PRIORITY)
+        self.selected_name = None
+        # the pattern and bus priority of the frame being waited for
+        self.pending = (None, None)
+        self.scheduler = FrameScheduler(time_source=time_source)
         self.error_count = 0
 
+    idle = property(lambda self: self.patterns.get("idle"))
+    fire = property(lambda self: self.patterns.get("fire"))
+    panic = property(lambda self: self.patterns.get("panic"))
+    fib = property(lambda self: self.patterns.get("fibonacci"))
+    motion = property(lambda self: self.patterns.get("motion"))
+    wopr = property(lambda self: self.patterns.get("wopr"))
+    life = property(lambda self: self.patterns.get("life"))
+    prime = property(lambda self: self.patterns.get("prime"))
+
     def reset(self,):
         """ initialize to starting state and set brightness """
         self.mode_controller.set_state(DEMO_STATE)
         self.mode_controller.set_mode(FIBONACCI_MODE)
 
+    def dispatch_table(self,):
+        """ return the pattern name and bus priority for every (state, mode),
+            modes include the registered pattern names
+        """
+        demo = dict(DEMO_PATTERNS)
+        for name in self.patterns.names():
+            demo.setdefault(name, name)
+        table = {}
+        for state in STATES:
+            for mode in MODES + tuple(demo):
+                if mode == FIRE_MODE:
+                    table[(state, mode)] = ("fire", ALARM_PRIORITY)
+                elif mode == PANIC_MODE:
+                    table[(state, mode)] = ("panic", ALARM_PRIORITY)
+                elif state == SECURITY_STATE:
+                    table[(state, mode)] = ("motion", NORMAL_PRIORITY)
+                elif state == IDLE_STATE:
+                    table[(state, mode)] = ("idle", NORMAL_PRIORITY)
+                else:
+                    table[(state, mode)] = (demo[mode], NORMAL_PRIORITY)
+        return table
+
+    def playlist_entry(self, entry):
+        """ apply the brightness of a playlist entry as it starts """
+        self.brightness = entry.brightness
+        if entry.brightness is not None:
+            self.matrix8x8.set_brightness(entry.brightness)
+
+    def lookup(self, selection):
+        """ return the pattern name and priority for a (state, mode), finding the
+            plugin patterns when the mode is not known yet
+        """
+        found = self.dispatch.get(selection)
+        if found is None and not self.discovered:
+            self.discovered = True
+            self.patterns.discover()
+            self.dispatch = self.dispatch_table()
+            found = self.dispatch.get(selection)
+        if found is None:
+            return None, NORMAL_PRIORITY
+        return found
+
+    def select_pattern(self,):
+        """ return the pattern for the current mode and state, or None, and the
+            bus priority of its frames, looked up again only after a change
+        """
+        self.mode_controller.evaluate()
+        if self.mode_controller.version != self.version:
+            self.version = self.mode_controller.version
+            name, priority = self.lookup(self.mode_controller.selection())
+            self.selected = (None, priority)
+            if name is not None:
+                if self.selected_name is not None:
+                    self.patterns.touch(self.selected_name)
+                self.patterns.release_idle(keep=(name,))
+                constructed = self.patterns.constructed
+                self.selected = (self.patterns.get(name), priority)
+                # patterns set their own brightness when constructed
+                if self.patterns.constructed != constructed and self.brightness is not None:
+                    self.matrix8x8.set_brightness(self.brightness)
+            self.selected_name = name
+        return self.selected
+
+    def frame(self, interrupted=False):
+        """ the body of the display loop: render the frame waited for unless the
+            wait was interrupted, write it and pick the pattern of the next frame;
+            returns the seconds to wait for it, None for the default period
+        """
+        pattern, priority = self.pending
+        shown = not interrupted and pattern is not None
+        if shown:
+            pattern.display()
+        if priority is not None:
+            self.finish_frame(priority, shown)
+        self.pending = self.select_pattern()
+        pattern = self.pending[0]
+        return None if pattern is None else pattern.frame_period
+
+    def finish_frame(self, priority, shown=True):
+        """ write the frame, alarm frames go ahead of other devices waiting for
+            the bus, and skip the I2C write when the pattern produced the same frame;
+            only a rendered frame ends the command to first frame latency
+        """
+        self.framebuffer.flush(priority)
+        if shown:
+            self.scheduler.frame_shown()
+
+    def recover(self, ex):
+        """ log a display exception and restart the matrix and the deadline
+            sequence, returns False after too many exceptions
+        """
+        LOGGER.error('Led8x8Controller: thread exception: %s %d', ex, self.error_count)
+        self.error_count += 1
+        if self.error_count >= 10:
+            return False
+        self.matrix8x8.begin()
+        self.framebuffer.invalidate()
+        self.scheduler.reset()
+        self.pending = (None, None)
+        return True
+
     def display_thread(self,):
         """ display the series as a 64 bit image with alternating colored pixels """
+        interrupted = False
         while True:
             try:
-                mode = self.mode_controller.get_mode()
-                if mode == FIRE_MODE:
-                    self.fire.display()
-                elif mode == PANIC_MODE:
-                    self.panic.display()
-                else:
-                    state = self.mode_controller.get_state()
-                    if state == SECURITY_STATE:
-                        self.motion.display()
-                    elif state == IDLE_STATE:
-                        self.idle.display()
-                    else: #demo
-                        if mode == FIBONACCI_MODE:
-                            self.fib.display()
-                        elif mode == WOPR_MODE:
-                            self.wopr.display()
-                        elif mode == LIFE_MODE:
-                            self.life.display()
-                        self.mode_controller.evaluate()
+                interrupted = self.scheduler.wait(self.frame(interrupted))
             #pylint: disable=broad-except
             except Exception as ex:
-                LOGGER.info('Led8x8Controller: thread exception: %s %s', str(ex),
-                            str(self.error_count))
-                self.error_count += 1
-                if self.error_count < 10:
-                    time.sleep(1.0)
-                    self.matrix8x8.begin()
-                else:
+                if not self.recover(ex):
+                    break
+                self.time_source.sleep(1.0)
+
+    async def display_task(self,):
+        """ display_thread as a task on an asyncio event loop """
+        #pylint: disable=import-outside-toplevel
+        import asyncio
+        self.start_logging()
+        interrupted = False
+        while True:
+            try:
+                interrupted = await self.scheduler.wait_async(self.frame(interrupted))
+            #pylint: disable=broad-except
+            except Exception as ex:
+                if not self.recover(ex):
                     break
+                await asyncio.sleep(1.0)
 
     def set_mode(self, mode, override=False):
-        """ set display mode """
-        if override:
-            self.mode_controller.set_mode(mode)
-        current_mode = self.mode_controller.get_mode()
-        if current_mode in (FIRE_MODE, PANIC_MODE):
+        """ set display mode, fire and panic preempt the frame being waited on """
+        if not self.mode_controller.set_mode(mode, override):
             return
-        self.mode_controller.set_mode(mode)
+        if mode == FIRE_MODE:
+            self.fire.reset()
+        elif mode == PANIC_MODE:
+            self.panic.reset()
+        self.scheduler.interrupt()
 
     def restore_mode(self,):
         """ return to last mode; usually after idle, fire or panic """
         self.mode_controller.restore_mode()
+        self.scheduler.interrupt()
 
     def set_state(self, state):
         """ set the machine state """
         self.mode_controller.set_state(state)
+        self.scheduler.interrupt()
 
     def get_state(self,):
         """ get the current machine state """
         return self.mode_controller.get_state()
 
     def update_motion(self, topic):
-        """ update the countdown timer for the topic (room)"""
-        self.motion.motion_detected(topic)
+        """ update the occupancy of the topic (room), waking the motion display
+            which sleeps until the next room changes color, when it is on screen
+        """
+        if not self.motion.motion_detected(topic):
+            return
+        if self.selected_name == "motion":
+            self.scheduler.interrupt(command=False)
+
+    @staticmethod
+    def start_logging():
+        """ use the device logging.ini unless the application configured logging """
+        configure_logging(CONTROLLER_LOGGING_INI)
+        LOGGER.info('Application started')
 
     def run(self):
-        """ start the display thread and make it a daemon """
+        """ start the display thread and make it a daemon, see AsyncRuntime for
+            running the display as a task instead
+        """
+        self.start_logging()
         display = Thread(target=self.display_thread)
         display.daemon = True
         display.start()
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """ Display the fibonacci series as a 64 bit pattern on an Adafruit 8x8 LED backpack """
 
-import time
+from .led8x8framebuffer import PatternFramebuffer
 
 BRIGHTNESS = 5
 
@@ -9,48 +9,72 @@ UPDATE_RATE_SECONDS = 0.2
 
 LARGEST_64_BIT_FIBONACCI = 7540113804746346429
 
-class Led8x8Fibonacci:
+def fibonacci_terms():
+    """ return the terms shown, 2, 3, 5 ... up to the largest 64 bit fibonacci """
+    terms = []
+    fib1 = 1
+    fib2 = 2
+    while fib2 <= LARGEST_64_BIT_FIBONACCI:
+        terms.append(fib2)
+        fib1, fib2 = fib2, fib1 + fib2
+    return terms
+
+def render_term(term, iterations):
+    """ return the 16 byte frame for a term with the pixel colors starting after
+        iterations, which counts 1, 2, 3 once per pixel
+    """
+    frame = bytearray(16)
+    for ypixel in range(0, 8):
+        for xpixel in range(0, 8):
+            iterations += 1
+            if iterations >= 4:
+                iterations = 1
+            if (term >> (8 * xpixel)) & (1 << ypixel):
+                if iterations & 1:
+                    frame[2 * ypixel] |= 1 << xpixel
+                if iterations & 2:
+                    frame[2 * ypixel + 1] |= 1 << xpixel
+    return bytes(frame)
+
+class Led8x8Fibonacci(PatternFramebuffer):
     """ fibinocci pattern from 1 to largest 64 bit representation  """
 
-    def __init__(self, matrix8x8):
+    # frames[term index][iterations % 3], compiled on the first display
+    frames = None
+
+    def __init__(self, matrix8x8, framebuffer=None):
         """ create initial conditions and saving display and I2C lock """
         self.matrix = matrix8x8
+        self.use_framebuffer(matrix8x8, framebuffer)
+        self.frame_period = UPDATE_RATE_SECONDS
         # self.matrix.begin()
         self.iterations = 0
-        self.fib1 = 1
-        self.fib2 = 1
-        self.fib3 = 2
+        self.term = 0
+
+    @classmethod
+    def compile_frames(cls,):
+        """ render every term in each of the three color phases once """
+        if cls.frames is None:
+            cls.frames = [tuple(render_term(term, phase) for phase in range(3))
+                          for term in fibonacci_terms()]
+        return cls.frames
 
     def reset(self,):
         """ initialize to starting state and set brightness """
         self.iterations = 0
-        self.fib1 = 1
-        self.fib2 = 1
-        self.fib3 = 2
+        self.term = 0
         self.matrix.set_brightness(BRIGHTNESS)
 
     def display(self,):
         """ display the series as a 64 bit image with alternating colored pixels """
-        time.sleep(UPDATE_RATE_SECONDS)
-        for ypixel in range(0, 8):
-            for xpixel in range(0, 8):
-                self.iterations += 1
-                if self.iterations >= 4:
-                    self.iterations = 1
-                reg = self.fib3 >> (8 * xpixel)
-                bit = reg & (1 << ypixel)
-                if bit == 0:
-                    self.matrix.set_pixel(xpixel, ypixel, 0)
-                else:
-                    self.matrix.set_pixel(xpixel, ypixel, self.iterations)
-        self.matrix.write_display()
-        self.fib1 = self.fib2
-        self.fib2 = self.fib3
-        self.fib3 = self.fib1 + self.fib2
-        if self.fib3 > LARGEST_64_BIT_FIBONACCI:
-            self.fib1 = 1
-            self.fib2 = 1
-            self.fib3 = 2
+        frames = self.compile_frames()
+        self.framebuffer.set_frame(frames[self.term][self.iterations % 3])
+        # 64 pixels advance the 1, 2, 3 color cycle by one
+        self.iterations = (self.iterations + 63) % 3 + 1
+        self.term += 1
+        if self.term >= len(frames):
+            self.term = 0
+        self.finish()
 
 if __name__ == '__main__':
     exit()
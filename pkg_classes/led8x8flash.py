@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """ Display full screen flash color pattern on an Adafruit 8x8 LED backpack """
 
-import time
+from .led8x8framebuffer import PatternFramebuffer
 
 BRIGHTNESS = 5
 
@@ -10,12 +10,14 @@ UPDATE_RATE_SECONDS = 0.2
 PING = 0
 PONG = 1
 
-class Led8x8Flash:
+class Led8x8Flash(PatternFramebuffer):
     """ flash pattern based on color and time interval  """
 
-    def __init__(self, matrix8x8, color):
+    def __init__(self, matrix8x8, color, framebuffer=None):
         """ create initial conditions and saving display and I2C lock """
         self.matrix = matrix8x8
+        self.use_framebuffer(matrix8x8, framebuffer)
+        self.frame_period = UPDATE_RATE_SECONDS
         self.alternate = PING
         if color < 0:
             self.color = 0
@@ -27,8 +29,8 @@ class Led8x8Flash:
             self.color = color
 
     def reset(self,):
-        """ initialize to starting state and set brightness """
-        self.alternate = PING
+        """ initialize to starting state so the next frame is lit """
+        self.alternate = PONG
 
     def set_color(self, color):
         """ initialize to starting state and set brightness """
@@ -43,18 +45,15 @@ class Led8x8Flash:
 
     def display(self,):
         """ display the series as a 64 bit image with alternating colored pixels """
-        time.sleep(UPDATE_RATE_SECONDS)
         if self.alternate == PING:
             self.alternate = PONG
         else:
             self.alternate = PING
-        for xpixel in range(0, 8):
-            for ypixel in range(0, 8):
-                if self.alternate == PING:
-                    self.matrix.set_pixel(xpixel, ypixel, self.color)
-                else:
-                    self.matrix.set_pixel(xpixel, ypixel, 0)
-        self.matrix.write_display()
+        if self.alternate == PING:
+            self.framebuffer.fill(self.color)
+        else:
+            self.framebuffer.clear()
+        self.finish()
 
 if __name__ == '__main__':
     exit()
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+""" Shared bicolor frame buffer for patterns on an Adafruit 8x8 LED backpack """
+
+from .i2cbusarbiter import NORMAL_PRIORITY
+from .ledbackpackwriter import LedBackpackWriter
+
+# Color values as convenient globals.
+OFF = 0
+GREEN = 1
+RED = 2
+YELLOW = 3
+
+# HT16K33 display RAM: a green byte then a red byte for each of the 8 rows
+FRAME_BYTES = 16
+
+BLANK_FRAME = bytes(FRAME_BYTES)
+
+# a full frame of each color, indexed by color value
+FILLED_FRAMES = (
+    bytes([0x00, 0x00] * 8),
+    bytes([0xFF, 0x00] * 8),
+    bytes([0x00, 0xFF] * 8),
+    bytes([0xFF, 0xFF] * 8)
+)
+
+class Led8x8Framebuffer:
+    """ Patterns render into this buffer and the controller flushes it to the
+        matrix, writing only the rows that changed since the last frame.
+    """
+
+    def __init__(self, matrix8x8, arbiter=None):
+        """ create an empty frame for the matrix, flushed through a shared
+            I2CBusArbiter when given one
+        """
+        self.matrix = matrix8x8
+        self.writer = LedBackpackWriter(matrix8x8, arbiter)
+        self.buffer = bytearray(FRAME_BYTES)
+        self.frames_written = 0
+        self.frames_skipped = 0
+
+    def clear(self,):
+        """ turn every pixel off """
+        self.buffer[:] = BLANK_FRAME
+
+    def fill(self, color):
+        """ turn every pixel on with the same color """
+        self.buffer[:] = FILLED_FRAMES[color & YELLOW]
+
+    def set_pixel(self, xpixel, ypixel, color):
+        """ set one pixel using the same coordinates as Matrix8x8.set_pixel """
+        if xpixel < 0 or xpixel > 7 or ypixel < 0 or ypixel > 7:
+            return
+        bit = 1 << xpixel
+        index = ypixel * 2
+        if color & GREEN:
+            self.buffer[index] |= bit
+        else:
+            self.buffer[index] &= ~bit & 0xFF
+        if color & RED:
+            self.buffer[index + 1] |= bit
+        else:
+            self.buffer[index + 1] &= ~bit & 0xFF
+
+    def set_row(self, ypixel, green, red):
+        """ set a whole row from green and red bit masks, bit x is pixel x """
+        index = ypixel * 2
+        self.buffer[index] = green
+        self.buffer[index + 1] = red
+
+    def set_frame(self, frame):
+        """ copy a complete 16 byte frame into the buffer """
+        self.buffer[:] = frame
+
+    def set_image(self, image):
+        """ render an 8x8 PIL image using the Matrix8x8.set_image color rules """
+        imwidth, imheight = image.size
+        if imwidth != 8 or imheight != 8:
+            raise ValueError('Image must be an 8x8 pixels in size.')
+        pix = image.convert('RGB').load()
+        for xpixel in range(8):
+            for ypixel in range(8):
+                color = pix[(xpixel, ypixel)]
+                if color == (255, 0, 0):
+                    self.set_pixel(xpixel, ypixel, RED)
+                elif color == (0, 255, 0):
+                    self.set_pixel(xpixel, ypixel, GREEN)
+                elif color == (255, 255, 0):
+                    self.set_pixel(xpixel, ypixel, YELLOW)
+                else:
+                    self.set_pixel(xpixel, ypixel, OFF)
+
+    def get_image(self,):
+        """ return the frame as an 8x8 RGB PIL image, Pillow is only needed here
+            and in set_image
+        """
+        #pylint: disable=import-outside-toplevel
+        from PIL import Image
+        image = Image.new('RGB', (8, 8))
+        pix = image.load()
+        for ypixel in range(8):
+            green = self.buffer[ypixel * 2]
+            red = self.buffer[ypixel * 2 + 1]
+            for xpixel in range(8):
+                pix[xpixel, ypixel] = (255 if red >> xpixel & 1 else 0,
+                                       255 if green >> xpixel & 1 else 0, 0)
+        return image
+
+    def invalidate(self,):
+        """ force the next flush to write, e.g. after the matrix was reset """
+        self.writer.invalidate()
+
+    def flush(self, priority=NORMAL_PRIORITY):
+        """ write the rows that changed since the last frame written, if any """
+        if self.writer.write(self.buffer, priority) == 0:
+            self.frames_skipped += 1
+            return False
+        self.frames_written += 1
+        return True
+
+class PatternFramebuffer:
+    """ Mixin for patterns that draw into a Led8x8Framebuffer. The controller
+        shares one framebuffer between its patterns and flushes it after each
+        frame; a pattern used on its own draws into a private one and writes it
+        itself when the frame is finished.
+    """
+
+    def use_framebuffer(self, matrix8x8, framebuffer=None):
+        """ draw into the shared framebuffer, or a private one for the matrix """
+        self.owns_framebuffer = framebuffer is None
+        if framebuffer is None:
+            framebuffer = Led8x8Framebuffer(matrix8x8)
+        self.framebuffer = framebuffer
+
+    def finish(self,):
+        """ end a frame, writing a private framebuffer to the matrix """
+        if self.owns_framebuffer:
+            self.framebuffer.flush()
+
+if __name__ == '__main__':
+    exit()
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """ Display full screen flash color pattern on an Adafruit 8x8 LED backpack """
 
-import time
+from .led8x8framebuffer import PatternFramebuffer
 
 BRIGHTNESS = 5
 
@@ -9,12 +9,14 @@ UPDATE_RATE_SECONDS = 2.0
 
 GREEN = 1
 
-class Led8x8Idle:
+class Led8x8Idle(PatternFramebuffer):
     """ Idle or sleep pattern """
 
-    def __init__(self, matrix8x8):
+    def __init__(self, matrix8x8, framebuffer=None):
         """ create initial conditions and saving display and I2C lock """
         self.matrix = matrix8x8
+        self.use_framebuffer(matrix8x8, framebuffer)
+        self.frame_period = UPDATE_RATE_SECONDS
         # self.matrix.begin()
         self.matrix.set_brightness(BRIGHTNESS)
         self.lastx = 0
@@ -27,16 +29,15 @@ class Led8x8Idle:
 
     def display(self,):
         """ display the series as a 64 bit image with alternating colored pixels """
-        time.sleep(UPDATE_RATE_SECONDS)
-        self.matrix.clear()
-        self.matrix.set_pixel(self.lastx, self.lasty, GREEN)
+        self.framebuffer.clear()
+        self.framebuffer.set_pixel(self.lastx, self.lasty, GREEN)
         self.lasty += 1
         if self.lasty > 7:
             self.lasty = 0
             self.lastx += 1
             if self.lastx > 7:
                 self.lastx = 0
-        self.matrix.write_display()
+        self.finish()
 
 if __name__ == '__main__':
     exit()
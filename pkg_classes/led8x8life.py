@@ -1,7 +1,12 @@
 #!/usr/bin/python3
 """ Display the Game of Life pattern on an Adafruit 8x8 LED backpack """
 
-import time
+import random
+from collections import deque
+
+from .led8x8framebuffer import PatternFramebuffer
+from .lifepatterns import LIFE_PATTERNS, SEED_ORDER, WORLD_SEEDS, decode_rle, pattern_cells
+from .timesource import SYSTEM_TIME
 
 BRIGHTNESS = 5
 
@@ -9,170 +14,208 @@ UPDATE_RATE_SECONDS = 0.3
 
 PATTERN_RATE = 10
 
+EMPTY_HOLD_SECONDS = 1.0
+
+WORLD_PATTERN_RATE = 300
+
+# one library pattern is scattered for every 1024 cells of a large world
+
+WORLD_AREA_PER_SEED = 1024
+
 BLACK = 0
 GREEN = 1
 YELLOW = 3
 RED = 2
 
-class Led8x8Life:
-    """ Game of Life pattern based on john Conway """
+# 64 bit board: bit (8 * y + x) is the cell at pixel (x, y), one byte per row
 
-    def __init__(self, matrix8x8):
-        """ create initial conditions and saving display and I2C lock """
-        self.matrix = matrix8x8
-        self.matrix.set_brightness(BRIGHTNESS)
-        self.current_gen = [[0 for x in range(8)] for y in range(8)]
-        self.next_gen = [[0 for x in range(8)] for y in range(8)]
-        self.pattern = 0
-        self.pattern_switch_time = time.time()
-        self.dispatch = {
-            0: self.glider,
-            1: self.oscilator1,
-            2: self.oscilator1,
-            3: self.oscilator2,
-            4: self.oscilator3,
-            5: self.toad
-        }
-
-    def glider(self,):
-        """ initialize to starting state and set brightness """
-        self.next_gen[0] = [0, 0, 1, 0, 0, 0, 0, 0]
-        self.next_gen[1] = [0, 0, 0, 1, 0, 0, 0, 0]
-        self.next_gen[2] = [0, 1, 1, 1, 0, 0, 0, 0]
-        self.next_gen[3] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[4] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[5] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[6] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[7] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.copy()
+BOARD_MASK = 0xFFFFFFFFFFFFFFFF
 
-    def oscilator1(self,):
-        """ initialize to starting state and set brightness """
-        self.next_gen[0] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[1] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[2] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[3] = [0, 1, 1, 1, 1, 1, 0, 0]
-        self.next_gen[4] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[5] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[6] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[7] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.copy()
+LEFT_COLUMN = 0x0101010101010101
 
-    def oscilator2(self,):
-        """ initialize to starting state and set brightness """
-        self.next_gen[0] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[1] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[2] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[3] = [0, 1, 1, 1, 1, 1, 1, 0]
-        self.next_gen[4] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[5] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[6] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[7] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.copy()
+RIGHT_COLUMN = 0x8080808080808080
 
-    def oscilator3(self,):
-        """ initialize to starting state and set brightness """
-        self.next_gen[0] = [0, 0, 0, 0, 0, 1, 1, 1]
-        self.next_gen[1] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[2] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[3] = [0, 0, 0, 1, 1, 0, 0, 0]
-        self.next_gen[4] = [0, 0, 0, 1, 0, 0, 0, 0]
-        self.next_gen[5] = [0, 0, 0, 0, 0, 0, 1, 0]
-        self.next_gen[6] = [0, 0, 0, 0, 0, 1, 1, 0]
-        self.next_gen[7] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.copy()
+# a board repeating one of the last few generations is stuck and respawns
 
-    def toad(self,):
-        """ initialize to starting state and set brightness """
-        self.next_gen[0] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[1] = [0, 0, 0, 1, 0, 0, 0, 0]
-        self.next_gen[2] = [0, 1, 0, 0, 1, 0, 0, 0]
-        self.next_gen[3] = [0, 1, 0, 0, 1, 0, 0, 0]
-        self.next_gen[4] = [0, 0, 1, 0, 0, 0, 0, 0]
-        self.next_gen[5] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.next_gen[6] = [0, 0, 0, 0, 1, 1, 1, 0]
-        self.next_gen[7] = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.copy()
+RECENT_BOARDS = 4
+
+class Led8x8Life(PatternFramebuffer):
+    """ Game of Life pattern based on john Conway """
+
+    def __init__(self, matrix8x8, framebuffer=None, world_size=None, follow=True,
+                 time_source=SYSTEM_TIME):
+        """ create initial conditions and saving display and I2C lock, a world_size
+            from 64 to 1024 simulates a larger world seen through an 8x8 viewport
+        """
+        self.time_source = time_source
+        self.matrix = matrix8x8
+        self.use_framebuffer(matrix8x8, framebuffer)
+        self.frame_period = UPDATE_RATE_SECONDS
+        self.matrix.set_brightness(BRIGHTNESS)
+        self.board = 0
+        self.age0 = 0
+        self.age1 = 0
+        self.age2 = 0
+        self.history = deque(maxlen=RECENT_BOARDS)
+        self.recent = set()
+        self.pattern = 0
+        self.pattern_switch_time = self.time_source.time()
+        self.universe = None
+        self.follow = follow
+        self.view_x = 0
+        self.view_y = 0
+        if world_size is not None:
+            # numpy is only required for the large world
+            #pylint: disable=import-outside-toplevel
+            from .lifeuniverse import LifeUniverse
+            self.universe = LifeUniverse(world_size)
+
+    def load(self, cells):
+        """ start a new 8x8 board from a list of live (x, y) cells """
+        board = 0
+        for xpixel, ypixel in cells:
+            board |= 1 << (8 * (ypixel % 8) + (xpixel % 8))
+        self.board = board
+        self.age0 = board
+        self.age1 = 0
+        self.age2 = 0
+        self.history.clear()
+        self.recent.clear()
+
+    def populate(self,):
+        """ scatter seed patterns from the library across the large world """
+        self.universe.clear()
+        for _ in range(max(1, self.universe.width * self.universe.height // WORLD_AREA_PER_SEED)):
+            name = random.choice(WORLD_SEEDS)
+            self.universe.place(decode_rle(LIFE_PATTERNS[name][0]),
+                                random.randrange(self.universe.width),
+                                random.randrange(self.universe.height))
 
     def spawn(self,):
         """ initialize to starting state and set brightness """
-        self.dispatch[self.pattern]()
-        self.pattern_switch_time = time.time()
+        if self.universe is not None:
+            self.populate()
+        else:
+            self.load(pattern_cells(SEED_ORDER[self.pattern]))
+        self.pattern_switch_time = self.time_source.time()
         self.pattern += 1
-        if self.pattern > 5:
+        if self.pattern >= len(SEED_ORDER):
             self.pattern = 0
 
     def reset(self,):
         """ initialize to starting state and set brightness """
         self.spawn()
 
+    def pan(self,):
+        """ move the viewport toward the busiest region or one pixel along a diagonal """
+        if not self.follow:
+            self.view_x = (self.view_x + 1) % self.universe.width
+            self.view_y = (self.view_y + 1) % self.universe.height
+            return
+        target_x, target_y = self.universe.busiest()
+        self.view_x = self.toward(self.view_x, target_x - 4, self.universe.width)
+        self.view_y = self.toward(self.view_y, target_y - 4, self.universe.height)
+
     @classmethod
-    def mod(cls, test):
-        """ ensure that the returned coordinate is between 0 and 7 """
-        safe = (test + 8) % 8
-        return safe
+    def toward(cls, position, target, size):
+        """ pan a quarter of the shorter way around the torus, at least one pixel """
+        distance = (target - position) % size
+        if distance > size // 2:
+            distance -= size
+        if distance == 0:
+            return position
+        step = distance // 4 if distance > 0 else -(-distance // 4)
+        if step == 0:
+            step = 1 if distance > 0 else -1
+        return (position + step) % size
 
     def draw(self,):
-        """ display a section of WOPR based on starting and ending rows """
-        for xpixel in range(8):
-            for ypixel in range(8):
-                color = BLACK
-                if self.next_gen[xpixel][ypixel] >= 5:
-                    color = RED
-                elif self.next_gen[xpixel][ypixel] == 1:
-                    color = GREEN
-                elif self.next_gen[xpixel][ypixel] != 0:
-                    color = YELLOW
-                self.matrix.set_pixel(xpixel, ypixel, color)
-        self.matrix.write_display()
+        """ color cells by age: new cells green, then yellow, then red from age 5 """
+        if self.universe is not None:
+            self.framebuffer.set_frame(self.universe.viewport(self.view_x, self.view_y))
+            return
+        board = self.board
+        newborn = self.age0 & ~self.age1 & ~self.age2
+        oldest = self.age2 & self.age0
+        green = board & ~oldest
+        red = board & ~newborn
+        for ypixel in range(8):
+            shift = 8 * ypixel
+            self.framebuffer.set_row(ypixel, (green >> shift) & 0xFF, (red >> shift) & 0xFF)
 
     def age(self,):
-        """ ensure that the returned coordinate is between 0 and 7 """
-        for i in range(8):
-            for j in range(8):
-                alive = 0
-                alive += self.current_gen[self.mod(i+1)][self.mod(j)] != 0
-                alive += self.current_gen[self.mod(i)][self.mod(j+1)] != 0
-                alive += self.current_gen[self.mod(i-1)][self.mod(j)] != 0
-                alive += self.current_gen[self.mod(i)][self.mod(j-1)] != 0
-                alive += self.current_gen[self.mod(i+1)][self.mod(j+1)] != 0
-                alive += self.current_gen[self.mod(i-1)][self.mod(j-1)] != 0
-                alive += self.current_gen[self.mod(i+1)][self.mod(j-1)] != 0
-                alive += self.current_gen[self.mod(i-1)][self.mod(j+1)] != 0
-                if self.current_gen[i][j] != 0:
-                    if (alive < 2) or (alive > 3):
-                        self.next_gen[i][j] = 0
-                    else:
-                        self.next_gen[i][j] = self.current_gen[i][j] + 1
-                else:
-                    if alive == 3:
-                        self.next_gen[i][j] = 1
+        """ compute the next torus generation with bit sliced neighbour counts """
+        if self.universe is not None:
+            self.universe.step()
+            self.pan()
+            return
+        board = self.board
+        # wrap x within each row byte, then wrap y by rotating whole rows
+        west = ((board & ~RIGHT_COLUMN) << 1) | ((board & RIGHT_COLUMN) >> 7)
+        east = ((board & ~LEFT_COLUMN) >> 1) | ((board & LEFT_COLUMN) << 7)
+        count0 = 0
+        count1 = 0
+        crowded = 0
+        for row in (board, west, east):
+            north = ((row << 8) | (row >> 56)) & BOARD_MASK
+            south = ((row >> 8) | (row << 56)) & BOARD_MASK
+            if row is board:
+                neighbours = (north, south)
+            else:
+                neighbours = (row, north, south)
+            for cells in neighbours:
+                carry = count0 & cells
+                count0 ^= cells
+                crowded |= count1 & carry
+                count1 ^= carry
+        # two neighbours keep a live cell, three keep it or give birth
+        after = count1 & ~crowded & (count0 | board)
+        survivors = after & board
+        born = after & ~board
+        # age planes count 1 to 5 and stop at 5, the age where a cell turns red
+        carry = survivors & ~(self.age2 & self.age0)
+        age0 = self.age0 ^ carry
+        carry &= self.age0
+        age1 = self.age1 ^ carry
+        carry &= self.age1
+        age2 = self.age2 ^ carry
+        self.age0 = (age0 & survivors) | born
+        self.age1 = age1 & survivors
+        self.age2 = age2 & survivors
+        self.board = after
 
     def copy(self,):
-        """ ensure that the returned coordinate is between 0 and 7 """
-        early_spawn = True
-        for i in range(8):
-            for j in range(8):
-                self.current_gen[i][j] = self.next_gen[i][j]
-                if early_spawn:
-                    if self.current_gen[i][j] != 0:
-                        early_spawn = False
-        if early_spawn:
-            self.matrix.clear()
-            self.matrix.write_display()
+        """ respawn when the board is empty or repeats a recent generation """
+        if self.universe is not None:
+            if self.universe.is_quiet():
+                self.spawn()
+        elif self.board == 0:
+            # hold a blank frame a little longer before the next seed
+            self.framebuffer.clear()
+            self.frame_period = UPDATE_RATE_SECONDS + EMPTY_HOLD_SECONDS
+            self.spawn()
+        elif self.board in self.recent:
             self.spawn()
-            time.sleep(1)
+        else:
+            if len(self.history) == RECENT_BOARDS:
+                self.recent.discard(self.history[0])
+            self.history.append(self.board)
+            self.recent.add(self.board)
 
     def display(self,):
         """ display the series as a 64 bit image with alternating colored pixels """
-        time.sleep(UPDATE_RATE_SECONDS)
+        self.frame_period = UPDATE_RATE_SECONDS
         self.draw()
         self.age()
         self.copy()
-        now_time = time.time()
+        now_time = self.time_source.time()
         elapsed = now_time - self.pattern_switch_time
-        if elapsed > PATTERN_RATE:
+        if self.universe is not None:
+            if elapsed > WORLD_PATTERN_RATE:
+                self.spawn()
+        elif elapsed > PATTERN_RATE:
             self.spawn()
+        self.finish()
 
 if __name__ == '__main__':
     exit()
@@ -1,100 +1,141 @@
 #!/usr/bin/python3
-""" Display full screen flash color pattern on an Adafruit 8x8 LED backpack """
+""" Display room occupancy on an Adafruit 8x8 LED backpack """
 
-import time
+import heapq
 
-from PIL import Image
-from PIL import ImageDraw
+from .led8x8framebuffer import PatternFramebuffer
+from .roommap import DEFAULT_ROOMS, FRAME_BYTES, RoomMap
+from .timesource import SYSTEM_TIME
 
 BRIGHTNESS = 5
 
 UPDATE_RATE_SECONDS = 1.0
 
+# the longest sleep with nothing about to change, commands and motion wake it
+IDLE_PERIOD_SECONDS = 60.0
+
+# seconds of occupancy after motion, shown red, then yellow, then green
+OCCUPIED_SECONDS = 60.0
+RED_SECONDS = 50.0
+YELLOW_SECONDS = 30.0
+
+# occupancy shown after a reset
+RESET_SECONDS = 10.0
+
 BLACK = 0
 GREEN = 1
 YELLOW = 3
 RED = 2
 
-class Led8x8Motion:
-    """ Display motion in various rooms of the house """
+class Led8x8Motion(PatternFramebuffer):
+    """ Display motion in various rooms of the house. Occupancy is kept as
+        expiry times and a heap holds the next color band change of each room,
+        so a frame only redraws when a room changes band and frame_period is
+        the time until the next change.
+    """
 
-    def __init__(self, matrix8x8):
-        """ create initial conditions and saving display and I2C lock """
+    def __init__(self, matrix8x8, framebuffer=None, rooms=DEFAULT_ROOMS,
+                 time_source=SYSTEM_TIME):
+        """ create initial conditions and save the display; rooms is a RoomMap or
+            the path of a room map file
+        """
+        self.time_source = time_source
         self.matrix = matrix8x8
+        self.use_framebuffer(matrix8x8, framebuffer)
+        self.frame_period = UPDATE_RATE_SECONDS
         # self.matrix.begin()
         self.matrix.set_brightness(BRIGHTNESS)
-        self.matrix_image = Image.new('RGB', (8, 8))
-        self.matrix_draw = ImageDraw.Draw(self.matrix_image)
-        self.dispatch = {}
+        if not isinstance(rooms, RoomMap):
+            rooms = RoomMap(rooms)
+        self.rooms = rooms
+        # areas with motion since the last frame, each counted once per frame
+        self.pending = set()
+        # (deadline, sequence, generation, area) of the next band changes
+        self.deadlines = []
+        self.sequence = 0
+        self.changed = True
         self.motions = 0
+        # the last frame as an integer and as frame bytes
+        self.frame = 0
+        self.frame_bytes = bytes(FRAME_BYTES)
         self.reset()
 
-    def draw_two(self, color, row, column):
-        """ display a small room or area """
-        # print("draw_two color=",color)
-        self.matrix_draw.line((row, column, row, column+1), fill=color)
-
-    def draw_four(self, color, row, column):
-        """ draw a medium or large area """
-        # print("draw_four color=",color)
-        self.matrix_draw.line((row, column, row, column+1), fill=color)
-        self.matrix_draw.line((row+1, column, row+1, column+1), fill=color)
-
     def reset(self,):
         """ initialize to starting state and set brightness """
-        self.motions = 8
-        self.dispatch = {
-            "diy/perimeter/front/motion":
-                {"method": self.draw_two, "row" : 0, "column" : 3, "seconds" : 10},
-            "diy/main/hallway/motion":
-                {"method": self.draw_two, "row" : 2, "column" : 3, "seconds" : 10},
-            "diy/main/dining/motion":
-                {"method": self.draw_four, "row" : 3, "column" : 0, "seconds" : 10},
-            "diy/main/garage/motion":
-                {"method": self.draw_four, "row" : 0, "column" : 6, "seconds" : 10},
-            "diy/main/living/motion":
-                {"method": self.draw_four, "row" : 3, "column" : 6, "seconds" : 10},
-            "diy/upper/guest/motion":
-                {"method": self.draw_four, "row" : 6, "column" : 0, "seconds" : 10},
-            "diy/upper/study/motion":
-                {"method": self.draw_four, "row" : 6, "column" : 6, "seconds" : 10},
-            "diy/upper/stairs/motion":
-                {"method": self.draw_two, "row" : 5, "column" : 3, "seconds" : 10}
-            }
-
-    def display(self,):
-        ''' display the series as a 64 bit image with alternating colored pixels '''
-        time.sleep(UPDATE_RATE_SECONDS)
-        self.matrix_draw.rectangle((0, 0, 7, 7), outline=(0, 0, 0), fill=(0, 0, 0))
+        self.pending.clear()
+        del self.deadlines[:]
         self.motions = 0
-        for key in self.dispatch:
-            self.dispatch[key]["seconds"] = self.dispatch[key]["seconds"] - 1
-            if self.dispatch[key]["seconds"] > 50:
-                self.motions += 1
-                self.dispatch[key]["method"]((255, 0, 0),
-                                             self.dispatch[key]["row"],
-                                             self.dispatch[key]["column"])
-            elif self.dispatch[key]["seconds"] > 30:
-                self.motions += 1
-                self.dispatch[key]["method"]((255, 255, 0),
-                                             self.dispatch[key]["row"],
-                                             self.dispatch[key]["column"])
-            elif self.dispatch[key]["seconds"] > 0:
+        self.changed = True
+        now = self.time_source.monotonic()
+        for area in self.rooms.areas.values():
+            area.expires = now + RESET_SECONDS
+            area.band = BLACK
+            self.pending.add(area)
+
+    @staticmethod
+    def band(remaining):
+        """ return the color for the seconds of occupancy remaining and when,
+            in seconds remaining, it changes
+        """
+        if remaining > RED_SECONDS:
+            return RED, RED_SECONDS
+        if remaining > YELLOW_SECONDS:
+            return YELLOW, YELLOW_SECONDS
+        if remaining > 0.0:
+            return GREEN, 0.0
+        return BLACK, None
+
+    def update(self, area, now):
+        """ set the band of an area and schedule its next change """
+        color, boundary = self.band(area.expires - now)
+        if color != area.band:
+            if area.band == BLACK:
                 self.motions += 1
-                self.dispatch[key]["method"]((0, 255, 0),
-                                             self.dispatch[key]["row"],
-                                             self.dispatch[key]["column"])
-            else:
-                self.dispatch[key]["seconds"] = 0
-        self.matrix.set_image(self.matrix_image)
-        self.matrix.write_display()
+            elif color == BLACK:
+                self.motions -= 1
+            area.band = color
+            self.changed = True
+        if boundary is not None:
+            self.sequence += 1
+            heapq.heappush(self.deadlines, (area.expires - boundary, self.sequence,
+                                            area.generation, area))
+
+    def display(self,):
+        ''' redraw the rooms when one changed band, then sleep until the next change '''
+        now = self.time_source.monotonic()
+        while self.pending:
+            area = self.pending.pop()
+            area.generation += 1
+            self.update(area, now)
+        deadlines = self.deadlines
+        while deadlines and deadlines[0][0] <= now:
+            _, _, generation, area = heapq.heappop(deadlines)
+            if generation == area.generation:
+                self.update(area, now)
+        if self.changed:
+            self.changed = False
+            frame = 0
+            for area in self.rooms.areas.values():
+                if area.band:
+                    frame |= area.masks[area.band]
+            if frame != self.frame:
+                self.frame = frame
+                self.frame_bytes = frame.to_bytes(FRAME_BYTES, 'little')
+        # the framebuffer is shared, so the frame is copied in every time
+        self.framebuffer.set_frame(self.frame_bytes)
+        self.frame_period = IDLE_PERIOD_SECONDS
+        if deadlines:
+            self.frame_period = min(IDLE_PERIOD_SECONDS, max(0.0, deadlines[0][0] - now))
+        self.finish()
 
     def motion_detected(self, topic):
-        ''' set timer to countdown occupancy '''
-        for key in self.dispatch:
-            if key == topic:
-                self.dispatch[key]["seconds"] = 60
-                # print("motion_detected topic=",topic)
+        ''' restart the occupancy of the topic's rooms, shown at the next frame '''
+        areas = self.rooms.lookup(topic)
+        expires = self.time_source.monotonic() + OCCUPIED_SECONDS
+        for area in areas:
+            area.expires = expires
+        self.pending.update(areas)
+        return bool(areas)
 
 if __name__ == '__main__':
     exit()
@@ -1,60 +1,134 @@
 #!/usr/bin/python3
-""" Test Bed for Diyhas System Status class """
+""" Display prime numbers as columns of bits on Adafruit 8x8 LED backpacks """
 
-import time
+from .led8x8framebuffer import PatternFramebuffer
 
 BRIGHTNESS = 10
 
 UPDATE_RATE_SECONDS = 0.2
 
-PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67,
-          71, 73, 79, 83, 89, 97, 101, 103, 107, 109, 113, 127, 131, 137, 139, 149,
-          151, 157, 163, 167, 173, 179, 181, 191, 193, 197, 199, 211, 223, 227, 229,
-          233, 239, 241, 251]
+# the primes are sieved in blocks of this many numbers as the display needs them
+SEGMENT_SIZE = 65536
 
-class Led8x8Prime:
-    """ Prime numbers less than 256 display on an 8x8 matrix """
+WIDTHS = (8, 16, 32)
 
-    def __init__(self, matrix8x8):
-        """ create the prime object """
+def sieve(limit):
+    """ return the primes below limit using the sieve of Eratosthenes """
+    if limit < 3:
+        return []
+    composite = bytearray(limit)
+    composite[0] = composite[1] = 1
+    for number in range(2, int(limit ** 0.5) + 1):
+        if not composite[number]:
+            composite[number * number::number] = b'\x01' * len(range(number * number,
+                                                                   limit, number))
+    return [number for number in range(limit) if not composite[number]]
+
+def sieve_segment(start, stop, base_primes):
+    """ return the primes from start to stop using base primes up to sqrt(stop) """
+    composite = bytearray(stop - start)
+    for prime in base_primes:
+        if prime * prime >= stop:
+            break
+        first = max(prime * prime, (start + prime - 1) // prime * prime)
+        composite[first - start::prime] = b'\x01' * len(range(first, stop, prime))
+    return [start + offset for offset, flag in enumerate(composite)
+            if not flag and start + offset > 1]
+
+def next_color(iterations, count):
+    """ advance the 1, 2, 3 pixel color cycle count times, 0 acts like 3 """
+    return (iterations + 2 + count) % 3 + 1
+
+class Led8x8Prime(PatternFramebuffer):
+    """ Prime numbers less than 2 ** width on one 8x8 matrix per 8 bits """
+
+    # 16 byte frames by (byte, row, iterations % 3), shared and compiled on demand
+    frames = {}
+
+    def __init__(self, matrix8x8, framebuffer=None, width=8, chain=()):
+        """ create the prime object, wider primes continue on the chained
+            framebuffers of the next matrices, one for every 8 bits beyond the
+            first; the pattern writes the chained framebuffers itself
+        """
+        if width not in WIDTHS:
+            raise ValueError('width must be one of {} was: {}'.format(WIDTHS, width))
+        if len(chain) != width // 8 - 1:
+            raise ValueError('{} bit primes need {} chained framebuffers'
+                             .format(width, width // 8 - 1))
         self.matrix = matrix8x8
+        self.use_framebuffer(matrix8x8, framebuffer)
+        self.frame_period = UPDATE_RATE_SECONDS
+        self.framebuffers = (self.framebuffer,) + tuple(chain)
+        self.width = width
+        self.limit = 1 << width
+        self.base_primes = sieve(min(self.limit, SEGMENT_SIZE))
+        self.primes = self.base_primes
+        self.segment = 0
         self.index = 0
         self.row = 0
         self.iterations = 0
 
     def reset(self,):
         """ initialize and start the prime number display """
+        self.primes = self.base_primes
+        self.segment = 0
         self.index = 0
         self.row = 0
         self.iterations = 0
         self.matrix.set_brightness(BRIGHTNESS)
 
-    def display(self,):
-        """ display primes up to the max for 8 bits """
-        time.sleep(UPDATE_RATE_SECONDS)
-        self.matrix.clear()
-        # cycle through the primes
+    def next_prime(self,):
+        """ step to the next prime, sieving the next segment when needed """
         self.index += 1
-        if self.index >= len(PRIMES):
+        while self.index >= len(self.primes):
+            self.segment += SEGMENT_SIZE
             self.index = 0
-            self.row = 0
-        number = PRIMES[self.index]
-        #display 8 bit prime per row
+            if self.segment >= self.limit:
+                # start over from the smallest primes
+                self.segment = 0
+                self.primes = self.base_primes
+                self.row = 0
+            else:
+                self.primes = sieve_segment(self.segment, self.segment + SEGMENT_SIZE,
+                                            self.base_primes)
+        return self.primes[self.index]
+
+    @classmethod
+    def frame(cls, byte, row, iterations):
+        """ return the frame showing a byte of a prime in one matrix column """
+        key = (byte, row, iterations % 3)
+        frame = cls.frames.get(key)
+        if frame is None:
+            buffer = bytearray(16)
+            for ypixel in range(0, 8):
+                iterations = next_color(iterations, 1)
+                if byte & (1 << ypixel):
+                    if iterations & 1:
+                        buffer[2 * ypixel] |= 1 << row
+                    if iterations & 2:
+                        buffer[2 * ypixel + 1] |= 1 << row
+            frame = bytes(buffer)
+            cls.frames[key] = frame
+        return frame
+
+    def display(self,):
+        """ display one prime per frame as a column of 8 bits on each matrix """
+        number = self.next_prime()
         row = self.row
         self.row += 1
         if self.row >= 8:
             self.row = 0
-        for xpixel in range(0, 8):
-            bit = number & (1 << xpixel)
-            if self.iterations == 3:
-                self.iterations = 1
-            else:
-                self.iterations += 1
-            if bit == 0:
-                self.matrix.set_pixel(row, xpixel, 0)
-            else:
-                self.matrix.set_pixel(row, xpixel, self.iterations)
-        self.matrix.write_display()
+        for framebuffer in self.framebuffers:
+            framebuffer.set_frame(self.frame(number & 0xFF, row, self.iterations))
+            number >>= 8
+            self.iterations = next_color(self.iterations, 8)
+        self.finish()
+
+    def finish(self,):
+        """ end a frame, the controller only writes the first matrix """
+        PatternFramebuffer.finish(self)
+        for framebuffer in self.framebuffers[1:]:
+            framebuffer.flush()
 
 if __name__ == '__main__':
     exit()
@@ -24,9 +24,10 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import time
 import random
 
+from .led8x8framebuffer import PatternFramebuffer
+
 BRIGHTNESS = 5
 
 UPDATE_RATE_SECONDS = 0.2
@@ -36,12 +37,14 @@ GREEN = 1
 YELLOW = 3
 RED = 2
 
-class Led8x8Wopr:
+class Led8x8Wopr(PatternFramebuffer):
     """ WOPR pattern based on the movie Wargames """
 
-    def __init__(self, matrix8x8):
+    def __init__(self, matrix8x8, framebuffer=None):
         """ create initial conditions and saving display and I2C lock """
         self.matrix = matrix8x8
+        self.use_framebuffer(matrix8x8, framebuffer)
+        self.frame_period = UPDATE_RATE_SECONDS
         self.matrix.set_brightness(BRIGHTNESS)
 
     def reset(self,):
@@ -50,26 +53,26 @@ class Led8x8Wopr:
 
     def output_row(self, start, finish, color):
         """ display a section of WOPR based on starting and ending rows """
+        # WOPR rows run along the matrix x axis, so they are bits of each buffer row
+        mask = (1 << finish) - (1 << start)
+        buffer = self.framebuffer.buffer
         for xpixel in range(8):
-            for ypixel in range(start, finish):
-                bit = random.randint(0, 1)
-                if bit == 0:
-                    self.matrix.set_pixel(ypixel, xpixel, BLACK)
-                    #self.matrix.set_pixel(xpixel, ypixel, BLACK)
-                else:
-                    self.matrix.set_pixel(ypixel, xpixel, color)
-                    #self.matrix.set_pixel(xpixel, ypixel, color)
+            bits = random.getrandbits(8) & mask
+            index = xpixel * 2
+            if color & GREEN:
+                buffer[index] |= bits
+            if color & RED:
+                buffer[index + 1] |= bits
 
     def display(self,):
         """ display the series as a 64 bit image with alternating colored pixels """
-        time.sleep(UPDATE_RATE_SECONDS)
-        self.matrix.clear()
+        self.framebuffer.clear()
         self.output_row(0, 1, RED)
         self.output_row(1, 2, YELLOW)
         self.output_row(2, 4, RED)
         self.output_row(4, 5, YELLOW)
         self.output_row(5, 8, RED)
-        self.matrix.write_display()
+        self.finish()
 
 if __name__ == '__main__':
     exit()
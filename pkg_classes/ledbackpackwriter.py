@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+""" Partial display RAM writes for Adafruit HT16K33 LED backpacks """
+
+from .i2cbusarbiter import NORMAL_PRIORITY
+
+# display RAM is written in rows of 2 bytes, green and red on the 8x8 matrix
+ROW_BYTES = 2
+
+ROWS = 8
+
+# each I2C write costs the device address and start register besides the data
+TRANSACTION_OVERHEAD_BYTES = 2
+
+FULL_WRITE_BYTES = TRANSACTION_OVERHEAD_BYTES + ROW_BYTES * ROWS
+
+class LedBackpackWriter:
+    """ Track the display RAM contents and write only the rows that changed,
+        merging nearby rows into one transaction and falling back to a single
+        full write when that costs less.
+    """
+
+    def __init__(self, display, arbiter=None):
+        """ wrap an HT16K33 based display such as Matrix8x8 or SevenSegment,
+            holding a shared I2CBusArbiter for the whole frame when given one
+        """
+        self.display = display
+        self.arbiter = arbiter
+        self.shadow = bytearray(ROW_BYTES * ROWS)
+        self.valid = False
+        self.transactions = 0
+        self.bytes_written = 0
+        self.full_writes = 0
+        self.partial_writes = 0
+
+    def invalidate(self,):
+        """ the display RAM is unknown, e.g. after begin(), write it all next time """
+        self.valid = False
+
+    def dirty_runs(self, frame):
+        """ return [start, stop) row ranges that differ from the display RAM,
+            joining runs whose gap costs no more than another transaction
+        """
+        runs = []
+        for row in range(ROWS):
+            index = row * ROW_BYTES
+            if frame[index:index + ROW_BYTES] == self.shadow[index:index + ROW_BYTES]:
+                continue
+            if runs and (row - runs[-1][1]) * ROW_BYTES <= TRANSACTION_OVERHEAD_BYTES:
+                runs[-1][1] = row + 1
+            else:
+                runs.append([row, row + 1])
+        return runs
+
+    def write(self, frame, priority=NORMAL_PRIORITY):
+        """ bring the display RAM up to date with a 16 byte frame, returns the
+            number of I2C transactions used
+        """
+        if self.valid:
+            runs = self.dirty_runs(frame)
+            if not runs:
+                return 0
+            cost = sum(TRANSACTION_OVERHEAD_BYTES + (stop - start) * ROW_BYTES
+                       for start, stop in runs)
+        if not self.valid or cost >= FULL_WRITE_BYTES:
+            runs = [[0, ROWS]]
+            self.full_writes += 1
+        else:
+            self.partial_writes += 1
+        if self.arbiter is None:
+            self.write_runs(frame, runs)
+        else:
+            #pylint: disable=protected-access
+            with self.arbiter.transaction(self.display._device._address, priority):
+                self.write_runs(frame, runs)
+        self.shadow[:] = frame
+        self.display.buffer[:] = frame
+        self.valid = True
+        return len(runs)
+
+    def write_runs(self, frame, runs):
+        """ write each run of rows as one block """
+        #pylint: disable=protected-access
+        device = self.display._device
+        for start, stop in runs:
+            first = start * ROW_BYTES
+            last = stop * ROW_BYTES
+            device.writeList(first, frame[first:last])
+            self.transactions += 1
+            self.bytes_written += TRANSACTION_OVERHEAD_BYTES + last - first
+
+if __name__ == '__main__':
+    exit()
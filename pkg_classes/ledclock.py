@@ -24,15 +24,21 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import math
 import time
-import datetime
 from threading import Thread
-import socket
 
 import logging
-import logging.config
 
-from .Adafruit_Python_LED_Backpack.Adafruit_LED_Backpack import SevenSegment
+from .countdowntimers import CountdownEngine
+from .framescheduler import FrameScheduler
+from .i2cbusarbiter import NORMAL_PRIORITY, BACKGROUND_PRIORITY
+from .ledbackpackwriter import LedBackpackWriter
+from .logconfig import CLOCK_LOGGING_INI, configure_logging
+from .networkidentity import NetworkIdentity
+from .segmentencoder import SEGMENT_FONT, DECIMAL_POINT, DIGIT_INDEX, COLON_INDEX, COLON
+from .segmentencoder import number_table, zero_table, clock_table
+from .timesource import SYSTEM_TIME
 
 TIME_MODE = 0
 WHO_MODE = 1
@@ -40,22 +46,44 @@ COUNT_MODE = 2
 
 MAXIMUM_COUNT = 9999
 
-logging.config.fileConfig(fname='/home/an/clocks/logging.ini',
-                          disable_existing_loggers=False)
+UPDATE_RATE_SECONDS = 1.0
+
+# countdowns under this many seconds show hundredths and update this often
+FAST_COUNT_SECONDS = 10.0
+FAST_UPDATE_SECONDS = 0.05
+
+# the free running countdown shown when no other timer is set
+DEFAULT_TIMER = 'countdown'
+
+# digits whose decimal points show PM and the alarm
+PM_DIGIT = 1
+ALARM_DIGIT = 3
+
+# time formats encoded from a SegmentTable: (table, hours on the clock face)
+TIME_FORMATS = {
+    "%l%M": (clock_table, 12),
+    "%I%M": (zero_table, 12),
+    "%k%M": (clock_table, 24),
+    "%H%M": (zero_table, 24)
+}
 
-# Get the logger specified in the file
 LOGGER = logging.getLogger(__name__)
-LOGGER.info('Application started')
 
 class TimeDisplay:
     """ display time """
 
-    def __init__(self, display):
+    def __init__(self, display, time_source=SYSTEM_TIME):
         """ initialize special feature and display format """
+        self.time_source = time_source
         self.seven_segment = display
         self.colon = False
         self.alarm = False
         self.time_format = "%l%M"
+        self.writer = LedBackpackWriter(display)
+        # display RAM of the digits and PM point for the (hour, minute, format) shown
+        self.digits = bytearray(16)
+        self.shown = None
+        self.renders = 0
 
     def set_format(self, hour_format):
         """ set the time display in 12 or 24 hour format """
@@ -65,49 +93,103 @@ class TimeDisplay:
         """ set alarm indictor pixel """
         self.alarm = alarm
 
+    def invalidate(self,):
+        """ another mode wrote the display, write all of it next time """
+        self.writer.invalidate()
+
+    def render(self, now):
+        """ encode the hour and minute digits and the PM point of a struct_time """
+        self.digits[:] = bytes(len(self.digits))
+        if self.time_format in TIME_FORMATS:
+            table, hours = TIME_FORMATS[self.time_format]
+            hour = now.tm_hour
+            if hours == 12:
+                hour = hour % 12 or 12
+            table().encode(100 * hour + now.tm_min, self.digits)
+        else:
+            digit_string = time.strftime(self.time_format, now)
+            for index, char in zip(DIGIT_INDEX, digit_string[-4:].rjust(4)):
+                self.digits[index] = SEGMENT_FONT.get(char, 0x00)
+        if now.tm_hour > 11:
+            self.digits[DIGIT_INDEX[PM_DIGIT]] |= DECIMAL_POINT
+        self.renders += 1
+
     def display(self,):
-        """ display time of day in 12 or 24 hour format """
-        digit_string = time.strftime(self.time_format)
+        """ display time of day in 12 or 24 hour format, rendering the digits
+            when the minute changes and writing only the bytes that changed,
+            usually just the colon
+        """
+        now = self.time_source.localtime()
+        shown = (now.tm_hour, now.tm_min, self.time_format)
         try:
-            self.seven_segment.clear()
-            self.seven_segment.print_number_str(digit_string)
-            self.seven_segment.set_colon(self.colon)
+            if shown != self.shown:
+                self.render(now)
+                self.shown = shown
+            frame = bytearray(self.digits)
+            self.colon = now.tm_sec % 2 == 0
             if self.colon:
-                self.colon = False
-            else:
-                self.colon = True
-            self.seven_segment.set_decimal(3, self.alarm)
-            now = datetime.datetime.now()
-            if now.hour > 11:
-                self.seven_segment.set_decimal(1, True)
-            else:
-                self.seven_segment.set_decimal(1, False)
-            self.seven_segment.write_display()
+                frame[COLON_INDEX] |= COLON
+            if self.alarm:
+                frame[DIGIT_INDEX[ALARM_DIGIT]] |= DECIMAL_POINT
+            self.writer.write(frame)
         except Exception as e:
             LOGGER.error("Exception occurred", exc_info=True)
 
 class WhoDisplay:
-    """ display IP address in who mode """
+    """ display IP addresses and host name in who mode """
 
-    def __init__(self, display):
-        """ prepare to show ip address on who message """
+    def __init__(self, display, identity):
+        """ prepare to show the addresses of a NetworkIdentity, which resolves
+            them in the background
+        """
         self.seven_segment = display
+        self.identity = identity
         self.iterations = 0
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.connect(("8.8.8.8", 80))
-        host_ip = sock.getsockname()[0]
-        sock.close()
-        self.ip_address = host_ip.split(".")
+        self.version = None
+        self.pages = []
+
+    @staticmethod
+    def who_pages(host_name, addresses):
+        """ return the 4 character pages of each address, an octet with a
+            decimal point between them, followed by the host name
+        """
+        pages = []
+        for address in addresses:
+            octets = address.split(".")
+            for index, octet in enumerate(octets):
+                point = '.' if index < len(octets) - 1 else ''
+                pages.append('{0:>4}'.format(octet) + point)
+        host_name = (host_name or '').lower()
+        for start in range(0, len(host_name), 4):
+            pages.append('{0:<4}'.format(host_name[start:start + 4]))
+        return pages
+
+    def next_page(self,):
+        """ return the page to show, starting over when the identity changes """
+        version, host_name, addresses = self.identity.snapshot()
+        if version != self.version:
+            self.version = version
+            self.pages = self.who_pages(host_name, addresses)
+            self.iterations = 0
+        if not self.pages:
+            return '----'
+        if self.iterations >= len(self.pages):
+            self.iterations = 0
+        page = self.pages[self.iterations]
+        self.iterations += 1
+        return page
 
     def display(self,):
-        """ display 3 digits of ip address """
+        """ display the next octet or part of the host name """
         try:
             self.seven_segment.clear()
             self.seven_segment.set_brightness(15)
-            self.seven_segment.print_number_str(self.ip_address[self.iterations])
-            self.iterations += 1
-            if self.iterations >= 4:
-                self.iterations = 0
+            page = self.next_page()
+            for pos, char in enumerate(page[:4]):
+                self.seven_segment.set_digit_raw(pos, SEGMENT_FONT.get(char, 0x00))
+            if page.endswith('.'):
+                self.seven_segment.set_digit_raw(3, SEGMENT_FONT.get(page[3], 0x00) |
+                                                 DECIMAL_POINT)
             self.seven_segment.write_display()
         except Exception as e:
             LOGGER.error("Exception occurred", exc_info=True)
@@ -115,61 +197,177 @@ class WhoDisplay:
 class CountdownDisplay:
     """ display countdown in countdown mode """
 
-    def __init__(self, display):
-        """ prepare to show counting down """
+    def __init__(self, display, timers=None):
+        """ prepare to show the timer of a CountdownEngine nearest expiry, the
+            free running countdown from MAXIMUM_COUNT seconds until others are set
+        """
         self.seven_segment = display
-        self.iterations = MAXIMUM_COUNT
+        self.timers = timers if timers is not None else CountdownEngine()
         self.max_count = MAXIMUM_COUNT
+        self.started = False
+        self.writer = LedBackpackWriter(display)
+        self.frame = bytearray(16)
+
+    def invalidate(self,):
+        """ another mode wrote the display, write all of it next time """
+        self.writer.invalidate()
+
+    def shown_timer(self,):
+        """ return the timer to show: the one nearest expiry, or the free running
+            countdown when no other timer is set
+        """
+        timer = self.timers.nearest(exclude=DEFAULT_TIMER)
+        if timer is None:
+            timer = self.timers.timers.get(DEFAULT_TIMER)
+        return timer
+
+    def frame_period(self,):
+        """ return the seconds to the next update, shorter near zero """
+        timer = self.shown_timer()
+        if timer is not None and timer.running() and timer.remaining() < FAST_COUNT_SECONDS:
+            return FAST_UPDATE_SECONDS
+        return UPDATE_RATE_SECONDS
+
+    def encode(self, timer):
+        """ put the time left on a timer in the frame: hundredths of a second
+            under 10 s, seconds up to 9999 and hours:minutes beyond, with the
+            last decimal point lit while paused
+        """
+        left = timer.remaining()
+        if left < FAST_COUNT_SECONDS:
+            zero_table().encode(int(left * 100), self.frame)
+            self.frame[DIGIT_INDEX[0]] = 0x00
+            self.frame[DIGIT_INDEX[1]] |= DECIMAL_POINT
+        elif left <= MAXIMUM_COUNT:
+            number_table().encode(int(math.ceil(left)), self.frame)
+        else:
+            hours, minutes = divmod(int(math.ceil(left / 60.0)), 60)
+            number_table().encode(min(100 * hours + minutes, 9959), self.frame)
+            self.frame[COLON_INDEX] |= COLON
+        if not timer.running():
+            self.frame[DIGIT_INDEX[3]] |= DECIMAL_POINT
 
     def display(self,):
-        """ display 3 digits of ip address """
-        self.iterations -= 1
-        digits = '{0:d}'.format(self.iterations)
+        """ display the timer nearest expiry, writing only the digits that changed """
+        if not self.started:
+            self.started = True
+            self.timers.start(DEFAULT_TIMER, self.max_count, repeat=True)
         try:
-            self.seven_segment.print_number_str(digits)
-            if self.iterations == 0:
-                self.iterations = self.max_count
-            self.seven_segment.write_display()
+            timer = self.shown_timer()
+            if timer is None:
+                self.frame[0:10:2] = bytes((SEGMENT_FONT['-'],) * 2 + (0x00,) +
+                                           (SEGMENT_FONT['-'],) * 2)
+            else:
+                self.encode(timer)
+            self.writer.write(self.frame)
         except Exception as e:
             LOGGER.error("Exception occurred", exc_info=True)
 
     def set_maximum(self, new_maximum):
-        """ set a new count down maximum less than 1000 """
+        """ restart the free running countdown from new_maximum seconds, at most
+            MAXIMUM_COUNT
+        """
         if new_maximum <= MAXIMUM_COUNT:
-            self.iterations = new_maximum
             self.max_count = new_maximum
+            self.started = True
+            self.timers.start(DEFAULT_TIMER, new_maximum, repeat=True)
 
 class LedClock:
     """ LED seven segment display object """
 
-    def __init__(self,):
-        """Create display instance on default I2C address (0x70) and bus number"""
-        self.display = SevenSegment.SevenSegment(address=0x71)
+    def __init__(self, display=None, arbiter=None, location=None, time_source=SYSTEM_TIME):
+        """Create display instance on I2C address 0x71 and the default bus number,
+           or use a display passed in such as a SimulatedSevenSegment. Writes go
+           through the I2CBusArbiter shared with the matrix when given one. Who
+           mode shows the host name of the MqttLocationTopic location if any.
+        """
+        self.time_source = time_source
+        if display is None:
+            #pylint: disable=import-outside-toplevel
+            from .Adafruit_Python_LED_Backpack.Adafruit_LED_Backpack import SevenSegment
+            display = SevenSegment.SevenSegment(address=0x71)
+        self.display = display
+        self.arbiter = arbiter
+        if arbiter is not None:
+            arbiter.attach(self.display)
         # Initialize the display. Must be called once before using the display.
         self.display.begin()
         self.brightness = 12
         self.display.set_brightness(self.brightness)
         self.display.set_blink(0)
         self.mode = TIME_MODE
-        self.clock = TimeDisplay(self.display)
-        self.who = WhoDisplay(self.display)
-        self.count = CountdownDisplay(self.display)
+        self.clock = TimeDisplay(self.display, time_source)
+        host_name = location.get_host_name() if location is not None else None
+        self.identity = NetworkIdentity(host_name)
+        self.who = WhoDisplay(self.display, self.identity)
+        self.count = CountdownDisplay(self.display,
+                                      CountdownEngine(self.timer_expired, time_source))
+        # tick on the second of the wall clock so minutes change on time
+        self.scheduler = FrameScheduler(UPDATE_RATE_SECONDS, align=True,
+                                        time_source=time_source)
         self.tu_thread = Thread(target=self.time_update_thread)
         self.tu_thread.daemon = True
 
     def time_update_thread(self,):
         """ print "started timeUpdateThread """
+        period = self.frame_period()
         while True:
-            time.sleep(1.0)
-            if self.mode == TIME_MODE:
-                self.clock.display()
-            elif self.mode == COUNT_MODE:
-                self.count.display()
-            else:
-                self.who.display()
+            self.scheduler.wait(period)
+            period = self.frame()
+
+    async def time_update_task(self,):
+        """ time_update_thread as a task on an asyncio event loop """
+        self.start_logging()
+        self.identity.start()
+        period = self.frame_period()
+        while True:
+            await self.scheduler.wait_async(period)
+            period = self.frame()
+
+    def frame(self,):
+        """ the body of the clock loop: update the display and return the
+            seconds to the next update
+        """
+        self.update()
+        return self.frame_period()
+
+    def frame_period(self,):
+        """ return the seconds to the next update, faster for a countdown near zero """
+        if self.mode == COUNT_MODE:
+            return self.count.frame_period()
+        return UPDATE_RATE_SECONDS
+
+    def timer_expired(self, _name):
+        """ show the next countdown at once when one expires """
+        if self.mode == COUNT_MODE:
+            self.scheduler.interrupt(command=False)
+
+    def update(self,):
+        """ update the display for the current mode """
+        if self.arbiter is None:
+            self.tick()
+            return
+        # hold the bus for the whole update rather than for each register
+        priority = NORMAL_PRIORITY if self.mode == TIME_MODE else BACKGROUND_PRIORITY
+        #pylint: disable=protected-access
+        with self.arbiter.transaction(self.display._device._address, priority):
+            self.tick()
+
+    def tick(self,):
+        """ show the current mode """
+        if self.mode == TIME_MODE:
+            self.clock.display()
+        elif self.mode == COUNT_MODE:
+            self.count.display()
+        else:
+            self.who.display()
 
     def set_mode(self, mode):
         """ set alarm indicator """
+        if mode != self.mode:
+            # the display RAM no longer holds what the next mode wrote last
+            self.clock.invalidate()
+            self.count.invalidate()
         self.mode = mode
 
     def set_hour_format(self, hour_format=True):
@@ -203,8 +401,18 @@ class LedClock:
             self.brightness = 0
         self.display.set_brightness(self.brightness)
 
+    @staticmethod
+    def start_logging():
+        """ use the device logging.ini unless the application configured logging """
+        configure_logging(CLOCK_LOGGING_INI)
+        LOGGER.info('Application started')
+
     def run(self,):
-        """ start the clock thread """
+        """ start the clock thread and find the who mode addresses in the
+            background, who mode shows ---- until they are found
+        """
+        self.start_logging()
+        self.identity.start()
         self.tu_thread.start()
 
 if __name__ == '__main__':
@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+""" Library of Game of Life seed patterns in run length encoded (RLE) form """
+
+# name: (RLE, x offset, y offset) where the offsets place the pattern on an 8x8 board
+
+LIFE_PATTERNS = {
+    "glider": ("2bo$obo$b2o!", 0, 1),
+    "oscilator1": ("o$o$o$o$o!", 3, 1),
+    "oscilator2": ("o$o$o$o$o$o!", 3, 1),
+    "oscilator3": ("3b2o$3bo$o5bo$o4b2o$o!", 0, 3),
+    "toad": ("b2o$3bo$o$b2o2bo$5bo$5bo!", 1, 1),
+    "r_pentomino": ("b2o$2o$bo!", 3, 3),
+    "acorn": ("bo$3bo$2o2b3o!", 0, 3),
+    "diehard": ("6bo$2o$bo3b3o!", 0, 3),
+    "lwss": ("bo2bo$o$o3bo$4o!", 2, 2),
+    "pulsar": ("2b3o3b3o2$o4bobo4bo$o4bobo4bo$o4bobo4bo$2b3o3b3o2$2b3o3b3o$"
+               "o4bobo4bo$o4bobo4bo$o4bobo4bo2$2b3o3b3o!", 0, 0),
+    "gosper_gun": ("24bo$22bobo$12b2o6b2o12b2o$11bo3bo4b2o12b2o$2o8bo5bo3b2o$"
+                   "2o8bo3bob2o4bobo$10bo5bo7bo$11bo3bo$12b2o!", 0, 0)
+}
+
+# the order the 8x8 board cycles through its seeds
+
+SEED_ORDER = ("glider", "oscilator1", "oscilator1", "oscilator2", "oscilator3", "toad")
+
+# patterns scattered across a large world
+
+WORLD_SEEDS = ("glider", "toad", "r_pentomino", "acorn", "diehard", "lwss", "pulsar",
+               "gosper_gun")
+
+def decode_rle(rle):
+    """ return the live (x, y) cells of an RLE pattern body """
+    cells = []
+    xpixel = 0
+    ypixel = 0
+    count = ""
+    for tag in rle:
+        if tag.isdigit():
+            count += tag
+            continue
+        run = int(count) if count else 1
+        count = ""
+        if tag == "b":
+            xpixel += run
+        elif tag == "$":
+            xpixel = 0
+            ypixel += run
+        elif tag == "!":
+            break
+        elif not tag.isspace():
+            # o and any other state letter are live cells
+            cells.extend((xpixel + step, ypixel) for step in range(run))
+            xpixel += run
+    return cells
+
+def pattern_cells(name):
+    """ return the RLE cells of a named pattern moved to its 8x8 position """
+    rle, xoffset, yoffset = LIFE_PATTERNS[name]
+    return [(xpixel + xoffset, ypixel + yoffset) for xpixel, ypixel in decode_rle(rle)]
+
+if __name__ == '__main__':
+    exit()
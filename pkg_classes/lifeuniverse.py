@@ -0,0 +1,174 @@
+#!/usr/bin/python3
+""" Large toroidal Game of Life universe for the 8x8 Life viewport, requires numpy """
+
+import numpy
+
+SMALLEST_WORLD = 64
+
+LARGEST_WORLD = 1024
+
+# the world is indexed in square tiles, only busy tiles are recomputed
+TILE_SIZE = 16
+
+# cells stop aging at 5, the age where they turn red
+OLDEST_AGE = 5
+
+# above this fraction of busy tiles the whole world is stepped at once
+DENSE_FRACTION = 0.5
+
+# weight of earlier generations when ranking the busiest tile
+ACTIVITY_DECAY = 0.75
+
+class LifeUniverse:
+    """ Vectorized Game of Life on a torus with a busy tile index """
+
+    def __init__(self, width, height=None):
+        """ create an empty world, sizes are multiples of TILE_SIZE """
+        if height is None:
+            height = width
+        for size in (width, height):
+            if size < SMALLEST_WORLD or size > LARGEST_WORLD or size % TILE_SIZE:
+                raise ValueError('world size must be a multiple of {} from {} to {} was: {}'
+                                 .format(TILE_SIZE, SMALLEST_WORLD, LARGEST_WORLD, size))
+        self.width = width
+        self.height = height
+        self.cells = numpy.zeros((height, width), dtype=numpy.uint8)
+        self.ages = numpy.zeros((height, width), dtype=numpy.uint8)
+        self.active = numpy.zeros((height // TILE_SIZE, width // TILE_SIZE), dtype=bool)
+        self.activity = numpy.zeros(self.active.shape, dtype=numpy.float32)
+        # quiet tiles whose still lifes have cells younger than OLDEST_AGE
+        self.ageing = numpy.zeros(self.active.shape, dtype=bool)
+        self.halo = numpy.arange(-1, TILE_SIZE + 1)
+        self.generation = 0
+
+    def clear(self,):
+        """ kill every cell """
+        self.cells.fill(0)
+        self.ages.fill(0)
+        self.active.fill(False)
+        self.activity.fill(0.0)
+        self.ageing.fill(False)
+        self.generation = 0
+
+    def wake(self, busy):
+        """ mark busy tiles and their neighbours for the next step """
+        awake = busy.copy()
+        for yshift in (-1, 0, 1):
+            for xshift in (-1, 0, 1):
+                if yshift or xshift:
+                    awake |= numpy.roll(busy, (yshift, xshift), axis=(0, 1))
+        self.active |= awake
+
+    def place(self, cells, xpixel, ypixel):
+        """ add newborn (x, y) cells offset by x and y, wrapping at the edges """
+        if not cells:
+            return
+        points = numpy.array(cells)
+        columns = (points[:, 0] + xpixel) % self.width
+        rows = (points[:, 1] + ypixel) % self.height
+        self.cells[rows, columns] = 1
+        self.ages[rows, columns] = 1
+        busy = numpy.zeros(self.active.shape, dtype=bool)
+        busy[rows // TILE_SIZE, columns // TILE_SIZE] = True
+        self.wake(busy)
+
+    def step(self,):
+        """ advance one generation and return the number of cells that changed """
+        tile_rows, tile_columns = numpy.nonzero(self.active)
+        if len(tile_rows) == 0:
+            self.age_settled()
+            return 0
+        if len(tile_rows) > self.active.size * DENSE_FRACTION:
+            # ages every cell, the quiet tiles included
+            changes = self.step_world()
+        else:
+            self.age_settled()
+            changes = self.step_tiles(tile_rows, tile_columns)
+        was_active = self.active
+        self.active = numpy.zeros(was_active.shape, dtype=bool)
+        self.wake(changes > 0)
+        self.settle(was_active & ~self.active)
+        self.activity *= ACTIVITY_DECAY
+        self.activity += changes
+        self.generation += 1
+        return int(changes.sum())
+
+    def settle(self, quiet):
+        """ tiles going quiet hold only still lifes, their cells keep ageing
+            a generation at a time without the tiles being stepped
+        """
+        self.ageing |= quiet
+
+    def age_settled(self,):
+        """ age the live cells of quiet tiles by a generation, up to OLDEST_AGE """
+        tile_rows, tile_columns = numpy.nonzero(self.ageing & ~self.active)
+        self.ageing.fill(False)
+        if len(tile_rows) == 0:
+            return
+        rows = (tile_rows[:, None] * TILE_SIZE + self.halo[1:-1])[:, :, None]
+        columns = (tile_columns[:, None] * TILE_SIZE + self.halo[1:-1])[:, None, :]
+        ages = numpy.minimum(self.ages[rows, columns] + self.cells[rows, columns], OLDEST_AGE)
+        self.ages[rows, columns] = ages
+        # tiles stay in the index until every cell has turned red
+        self.ageing[tile_rows, tile_columns] = ((ages > 0) & (ages < OLDEST_AGE)).any(axis=(1, 2))
+
+    def step_tiles(self, tile_rows, tile_columns):
+        """ step only the busy tiles and return the changes counted per tile """
+        # gather each busy tile with a one cell border, wrapping around the torus
+        rows = (tile_rows[:, None] * TILE_SIZE + self.halo) % self.height
+        columns = (tile_columns[:, None] * TILE_SIZE + self.halo) % self.width
+        blocks = self.cells[rows[:, :, None], columns[:, None, :]]
+        neighbours = (blocks[:, :-2, :-2] + blocks[:, :-2, 1:-1] + blocks[:, :-2, 2:] +
+                      blocks[:, 1:-1, :-2] + blocks[:, 1:-1, 2:] +
+                      blocks[:, 2:, :-2] + blocks[:, 2:, 1:-1] + blocks[:, 2:, 2:])
+        old = blocks[:, 1:-1, 1:-1]
+        new = ((neighbours == 3) | ((neighbours == 2) & (old == 1))).astype(numpy.uint8)
+        inner_rows = rows[:, 1:-1, None]
+        inner_columns = columns[:, None, 1:-1]
+        ages = self.ages[inner_rows, inner_columns]
+        self.cells[inner_rows, inner_columns] = new
+        self.ages[inner_rows, inner_columns] = numpy.where(
+            new & old, numpy.minimum(ages + 1, OLDEST_AGE), new)
+        changes = numpy.zeros(self.active.shape, dtype=numpy.int32)
+        changes[tile_rows, tile_columns] = (new != old).sum(axis=(1, 2))
+        return changes
+
+    def step_world(self,):
+        """ step the whole world when most tiles are busy """
+        old = self.cells
+        padded = numpy.pad(old, 1, mode='wrap')
+        neighbours = (padded[:-2, :-2] + padded[:-2, 1:-1] + padded[:-2, 2:] +
+                      padded[1:-1, :-2] + padded[1:-1, 2:] +
+                      padded[2:, :-2] + padded[2:, 1:-1] + padded[2:, 2:])
+        new = ((neighbours == 3) | ((neighbours == 2) & (old == 1))).astype(numpy.uint8)
+        self.ages = numpy.where(new & old, numpy.minimum(self.ages + 1, OLDEST_AGE), new)
+        self.ages = self.ages.astype(numpy.uint8, copy=False)
+        self.cells = new
+        changed = (new != old).reshape(self.active.shape[0], TILE_SIZE,
+                                       self.active.shape[1], TILE_SIZE)
+        return changed.sum(axis=(1, 3), dtype=numpy.int32)
+
+    def is_quiet(self,):
+        """ true when no tile can change in the next generation """
+        return not self.active.any()
+
+    def busiest(self,):
+        """ return the (x, y) center of the tile with the most recent activity """
+        tile_row, tile_column = numpy.unravel_index(numpy.argmax(self.activity),
+                                                    self.activity.shape)
+        return (int(tile_column) * TILE_SIZE + TILE_SIZE // 2,
+                int(tile_row) * TILE_SIZE + TILE_SIZE // 2)
+
+    def viewport(self, xpixel, ypixel):
+        """ return the 16 byte bicolor frame of the 8x8 window at (x, y) """
+        rows = (ypixel + numpy.arange(8)) % self.height
+        columns = (xpixel + numpy.arange(8)) % self.width
+        ages = self.ages[rows[:, None], columns[None, :]]
+        green = (ages > 0) & (ages < OLDEST_AGE)
+        red = ages > 1
+        planes = numpy.packbits(numpy.stack((green, red), axis=1), axis=2,
+                                bitorder='little')
+        return planes.tobytes()
+
+if __name__ == '__main__':
+    exit()
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+""" Explicit logging configuration for DIYHA applications.
+
+    Importing pkg_classes configures nothing. An application calls
+    configure_logging() once at startup, or the devices call it with their usual
+    logging.ini when they start running; the first configuration wins.
+
+    The handlers of the logging file run on a background thread, see
+    logpipeline, so logging from the display threads never waits on the file.
+"""
+
+import os
+import threading
+
+# logging files used on the devices
+CONTROLLER_LOGGING_INI = '/home/an/diyha-dev/logging.ini'
+CLOCK_LOGGING_INI = '/home/an/clocks/logging.ini'
+
+CONFIGURED = {"path": None, "done": False}
+
+LOCK = threading.Lock()
+
+def configure_logging(path=None, force=False, queued=True):
+    """ load a logging.config file once; path None or missing leaves Python's
+        default logging alone. The handlers it sets up run on the LogListener
+        thread unless queued is False. Returns True when this call configured
+        logging.
+    """
+    #pylint: disable=import-outside-toplevel
+    with LOCK:
+        if CONFIGURED["done"] and not force:
+            return False
+        # a file that is not there leaves a later call free to configure logging
+        if path is None or not os.path.exists(path):
+            return False
+        CONFIGURED["done"] = True
+    from . import logpipeline
+    # fileConfig replaces the root handlers, including a queued one
+    logpipeline.stop_log_pipeline()
+    with LOCK:
+        import logging.config
+        logging.config.fileConfig(fname=path, disable_existing_loggers=False)
+        CONFIGURED["path"] = path
+    if queued:
+        logpipeline.start_log_pipeline()
+    return True
+
+def logging_configured():
+    """ return the logging file in use, None if none was loaded """
+    return CONFIGURED["path"]
+
+if __name__ == '__main__':
+    exit()
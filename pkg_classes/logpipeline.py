@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+""" Logging that never makes the display and interrupt threads wait on the log file.
+
+    start_log_pipeline() moves the root handlers onto a LogListener thread and
+    leaves a QueuedHandler in their place, which formats the record and puts it
+    on a bounded queue. A RepeatFilter lets the first of a run of identical
+    warnings or errors through, the same I2C failure every frame for example,
+    and the listener logs how often it repeated once per summary interval.
+"""
+
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler
+
+# records waiting for the listener, more are dropped rather than block
+QUEUE_SIZE = 1024
+
+# identical records are summarized this often
+SUMMARY_SECONDS = 60.0
+
+# records below this level are never rate limited
+REPEAT_LEVEL = logging.WARNING
+
+PIPELINE = {"listener": None, "handler": None}
+
+LOCK = threading.Lock()
+
+class RepeatFilter(logging.Filter):
+    """ Pass the first record from a logging call and exception type in each
+        interval and count the rest for a summary
+    """
+
+    def __init__(self, interval=SUMMARY_SECONDS, level=REPEAT_LEVEL):
+        """ records from the same place within interval seconds are repeats """
+        super().__init__()
+        self.interval = interval
+        self.level = level
+        # key: [interval start, repeats, first record]
+        self.seen = {}
+        self.suppressed = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(record):
+        """ identify the logging call and the exception it reports, if any """
+        error = record.exc_info[0] if record.exc_info else None
+        return record.name, record.levelno, record.pathname, record.lineno, error
+
+    def filter(self, record):
+        """ return False for a repeat, before it is formatted """
+        if record.levelno < self.level:
+            return True
+        key = self.key(record)
+        with self.lock:
+            seen = self.seen.get(key)
+            if seen is None:
+                self.seen[key] = [record.created, 0, record]
+                return True
+            seen[1] += 1
+            self.suppressed += 1
+            return False
+
+    def summaries(self, now=None):
+        """ return a summary record for each run of repeats whose interval is
+            over and forget those runs
+        """
+        if now is None:
+            now = time.time()
+        records = []
+        with self.lock:
+            for key, (start, repeats, first) in list(self.seen.items()):
+                if now - start < self.interval:
+                    continue
+                del self.seen[key]
+                if repeats:
+                    records.append(logging.makeLogRecord({
+                        "name": first.name, "levelno": first.levelno,
+                        "levelname": first.levelname, "pathname": first.pathname,
+                        "lineno": first.lineno, "funcName": first.funcName,
+                        "msg": "%s repeated %d times in %.1f seconds",
+                        "args": (first.getMessage(), repeats, now - start)}))
+        return records
+
+class QueuedHandler(QueueHandler):
+    """ Format records on the logging thread and queue them without waiting """
+
+    def __init__(self, records):
+        """ records is the queue the LogListener empties """
+        super().__init__(records)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        """ drop the record when the listener has fallen behind """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogListener:
+    """ Thread passing queued records to the real handlers """
+
+    def __init__(self, records, handlers, repeats):
+        """ records is the queue of the QueuedHandler, repeats its RepeatFilter """
+        self.queue = records
+        self.handlers = handlers
+        self.repeats = repeats
+        self.handled = 0
+        self.thread = None
+
+    def start(self,):
+        """ start the listener as a daemon thread """
+        self.thread = threading.Thread(target=self.listen, name='LogListener')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self,):
+        """ handle the records already queued, then stop """
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+        self.summarize(float('inf'))
+
+    def listen(self,):
+        """ handle records as they come and summaries once a second """
+        while True:
+            try:
+                record = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                record = False
+            if record is None:
+                return
+            if record:
+                self.handle(record)
+            self.summarize()
+
+    def summarize(self, now=None):
+        """ handle the summaries of repeats that are due """
+        for record in self.repeats.summaries(now):
+            self.handle(record)
+
+    def handle(self, record):
+        """ pass a record to each handler whose level it reaches """
+        self.handled += 1
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+def start_log_pipeline(interval=SUMMARY_SECONDS, queue_size=QUEUE_SIZE):
+    """ move the root logger handlers onto a LogListener thread, the stderr
+        last resort handler when there are none; returns the listener
+    """
+    with LOCK:
+        if PIPELINE["listener"] is not None:
+            return PIPELINE["listener"]
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        if not handlers and logging.lastResort is not None:
+            handlers = [logging.lastResort]
+        records = queue.Queue(queue_size)
+        repeats = RepeatFilter(interval)
+        handler = QueuedHandler(records)
+        handler.addFilter(repeats)
+        for old in root.handlers[:]:
+            root.removeHandler(old)
+        root.addHandler(handler)
+        listener = LogListener(records, handlers, repeats)
+        listener.start()
+        PIPELINE["listener"] = listener
+        PIPELINE["handler"] = handler
+        atexit.register(stop_log_pipeline)
+        return listener
+
+def stop_log_pipeline():
+    """ write out the queued records and summaries and restore the handlers """
+    with LOCK:
+        listener = PIPELINE["listener"]
+        if listener is None:
+            return
+        root = logging.getLogger()
+        root.removeHandler(PIPELINE["handler"])
+        listener.stop()
+        for handler in listener.handlers:
+            if handler is not logging.lastResort:
+                root.addHandler(handler)
+        PIPELINE["listener"] = None
+        PIPELINE["handler"] = None
+
+def log_statistics():
+    """ return the records handled, suppressed as repeats and dropped """
+    listener = PIPELINE["listener"]
+    if listener is None:
+        return {"handled": 0, "suppressed": 0, "dropped": 0}
+    return {"handled": listener.handled, "suppressed": listener.repeats.suppressed,
+            "dropped": PIPELINE["handler"].dropped}
+
+if __name__ == '__main__':
+    exit()
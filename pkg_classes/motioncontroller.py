@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """ DIYHA Motion Controller:
-    Detect PIR motion and create a queue to manage them.
+    Detect PIR motion on one or more pins and keep timestamped, debounced
+    events in a preallocated ring buffer.
 """
 
 # The MIT License (MIT)
@@ -26,43 +27,183 @@
 # THE SOFTWARE.
 
 import queue
+import threading
+from array import array
+from collections import namedtuple
 
 from Adafruit_GPIO import GPIO
 
+from .timesource import SYSTEM_TIME
+
+# events kept before the oldest are overwritten
+CAPACITY = 64
+
+# edges closer together than this are contact bounce or sensor noise
+DEBOUNCE_SECONDS = 0.05
+
+# motion must stay off this long before it is reported as ended
+HYSTERESIS_SECONDS = 0.0
+
+MotionEvent = namedtuple('MotionEvent', 'timestamp pin state')
+
+#pylint: disable=too-many-instance-attributes
+
 class MotionController:
-    """ Motion detection device driver """
+    """ Motion detection device driver. Both edges of every pin are filtered by
+        a settle time: a new state is reported once it has lasted the debounce
+        time, or for motion ending the longer hysteresis time, and an edge back
+        within that time cancels it. Events are fixed size records of a
+        monotonic timestamp of the time source, pin and state in parallel arrays.
+    """
 
-    def __init__(self, pin):
-        """ Setup interrupts on the pGPIO pin and the motion queue. """
+    #pylint: disable=too-many-arguments
+    def __init__(self, pin, capacity=CAPACITY, debounce=DEBOUNCE_SECONDS,
+                 hysteresis=HYSTERESIS_SECONDS, time_source=SYSTEM_TIME):
+        """ Setup the pGPIO pin, or a list of pins, and the event ring buffer. """
+        self.time_source = time_source
         self.gpio = GPIO.get_platform_gpio()
-        self.queue = queue.Queue()
-        self.pin = pin
-        self.gpio.setup(self.pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
-        self.last_reading = 0
+        if isinstance(pin, int):
+            pin = (pin,)
+        self.pins = tuple(pin)
+        self.pin = self.pins[0]
+        for gpio in self.pins:
+            self.gpio.setup(gpio, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+        self.debounce = debounce
+        self.hysteresis = max(debounce, hysteresis)
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.event_pins = array('H', bytes(2 * capacity))
+        self.states = array('B', bytes(capacity))
+        self.head = 0
+        self.count = 0
+        # per pin: reported state, state waiting to settle, its edge time and deadline
+        self.reported = dict.fromkeys(self.pins, 0)
+        self.candidate = dict.fromkeys(self.pins, 0)
+        self.edge_time = dict.fromkeys(self.pins, 0.0)
+        self.settle = {}
+        self.events = 0
+        self.dropped = 0
+        self.filtered = 0
+        self.ready = threading.Condition()
+        # set once a task waits with wait_for_motion_async
+        self.loop = None
+        self.async_ready = None
 
     def pir_interrupt_handler(self, gpio):
-        """ Motion interrupt handler adds 1 or 0 to queue. """
+        """ Motion interrupt handler starts the settle time of the new state. """
         state = self.gpio.input(gpio)
-        if state == 1:
-            message = "1"
+        now = self.time_source.monotonic()
+        with self.ready:
+            # an edge that settled since the last poll is reported before this one
+            self.commit(now)
+            if gpio in self.settle:
+                # the last edge had not settled
+                self.filtered += 1
+            if state == self.reported[gpio]:
+                self.settle.pop(gpio, None)
+            else:
+                self.candidate[gpio] = state
+                self.edge_time[gpio] = now
+                self.settle[gpio] = now + (self.debounce if state else self.hysteresis)
+            self.commit(now)
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.async_ready.set)
+
+    def commit(self, now):
+        """ report the pin states that have settled, called with the lock held """
+        if not self.settle:
+            return
+        for gpio, deadline in sorted(self.settle.items(), key=lambda item: item[1]):
+            if deadline > now:
+                continue
+            del self.settle[gpio]
+            state = self.candidate[gpio]
+            self.reported[gpio] = state
+            self.append(self.edge_time[gpio], gpio, state)
+        self.ready.notify_all()
+
+    def append(self, timestamp, gpio, state):
+        """ add an event, overwriting the oldest when the buffer is full """
+        index = (self.head + self.count) % self.capacity
+        if self.count == self.capacity:
+            self.head = (self.head + 1) % self.capacity
+            self.dropped += 1
         else:
-            message = "0"
-        if state != self.last_reading:
-            self.queue.put(message)
-        self.last_reading = state
+            self.count += 1
+        self.timestamps[index] = timestamp
+        self.event_pins[index] = gpio
+        self.states[index] = state
+        self.events += 1
+
+    def next_deadline(self,):
+        """ seconds until the next pending state settles, None if none is """
+        if not self.settle:
+            return None
+        return max(0.0, min(self.settle.values()) - self.time_source.monotonic())
 
     def enable(self,):
-        """ Enable interrupts and prepare the callback. """
-        self.gpio.add_event_detect(self.pin, GPIO.RISING, callback=self.pir_interrupt_handler)
+        """ Enable interrupts on both edges and prepare the callback. """
+        for gpio in self.pins:
+            self.gpio.add_event_detect(gpio, GPIO.BOTH, callback=self.pir_interrupt_handler)
 
     def detected(self,):
-        """ Has motion been detected? True or false based on queue contents. """
-        return not self.queue.empty()
+        """ Has motion been detected? True or false based on buffer contents. """
+        with self.ready:
+            self.commit(self.time_source.monotonic())
+            return self.count > 0
+
+    def get_motions(self, max_n=None):
+        """ Remove and return up to max_n MotionEvent records, oldest first. """
+        with self.ready:
+            self.commit(self.time_source.monotonic())
+            taken = self.count if max_n is None else min(max_n, self.count)
+            events = []
+            for _ in range(taken):
+                index = self.head
+                events.append(MotionEvent(self.timestamps[index], self.event_pins[index],
+                                          self.states[index]))
+                self.head = (self.head + 1) % self.capacity
+            self.count -= taken
+            return events
 
     def get_motion(self,):
-        """ Return the last value either 1 or 0. """
-        return self.queue.get(False)
+        """ Return the oldest value either 1 or 0, raises queue.Empty if none. """
+        events = self.get_motions(1)
+        if not events:
+            raise queue.Empty
+        return str(events[0].state)
 
     def wait_for_motion(self,):
         """ Blocking wait for the next interrupt 1 or 0. """
-        return self.queue.get(True)
\ No newline at end of file
+        with self.ready:
+            while True:
+                self.commit(self.time_source.monotonic())
+                if self.count:
+                    return self.get_motion()
+                self.ready.wait(self.next_deadline())
+
+    async def wait_for_motion_async(self,):
+        """ Await the next interrupt 1 or 0 on an asyncio event loop. """
+        #pylint: disable=import-outside-toplevel
+        import asyncio
+        if self.loop is None:
+            self.async_ready = asyncio.Event()
+            self.loop = asyncio.get_running_loop()
+        while True:
+            self.async_ready.clear()
+            if self.detected():
+                return self.get_motion()
+            with self.ready:
+                timeout = self.next_deadline()
+            try:
+                await asyncio.wait_for(self.async_ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def statistics(self,):
+        """ Return the reported, dropped and filtered event counts. """
+        with self.ready:
+            return {"events": self.events, "dropped": self.dropped,
+                    "filtered": self.filtered, "buffered": self.count,
+                    "pending": len(self.settle)}
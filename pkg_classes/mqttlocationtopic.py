@@ -30,9 +30,14 @@ class MqttLocationTopic:
         avoids global PEP8 issue.
     """
 
-    def __init__(self):
-        """ Create two topics for this application. """
+    def __init__(self, latitude=None, longitude=None):
+        """ Create two topics for this application. The latitude and longitude
+            in degrees, north and east positive, give local sunrise and sunset.
+        """
+        self.latitude = latitude
+        self.longitude = longitude
         host_name = socket.gethostname()
+        self.host_name = host_name
         self.setup_topic = "diy/"+host_name+"/setup"
         self.status_topic = "diy/"+host_name+"/status"
         self.location_topic = ""
@@ -45,6 +50,19 @@ class MqttLocationTopic:
         self.location_topic = topic
         self.waiting_for_location = False
 
+    def get_host_name(self,):
+        """ The host name used in the topics. """
+        return self.host_name
+
+    def set_coordinates(self, latitude, longitude):
+        """ Set the latitude and longitude of the location. """
+        self.latitude = latitude
+        self.longitude = longitude
+
+    def get_coordinates(self,):
+        """ The (latitude, longitude) of the location, (None, None) if not set. """
+        return self.latitude, self.longitude
+
     def get_setup(self,):
         """ Typically used by MQTT subscribe methods. """
         return self.setup_topic
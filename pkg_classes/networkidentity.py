@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+""" Host name and IPv4 addresses of this device, found from the local network
+    interfaces on a background thread
+
+    Nothing is sent on the network: the addresses are read from each interface
+    with the SIOCGIFADDR ioctl, or resolved from the host name where fcntl is
+    not available. The result is cached and refreshed every REFRESH_SECONDS and
+    version goes up each time it changes, e.g. after a DHCP renewal or when a
+    second interface comes up.
+"""
+
+import socket
+import struct
+import logging
+import threading
+
+REFRESH_SECONDS = 30.0
+
+# Linux ioctl returning the address of an interface
+SIOCGIFADDR = 0x8915
+
+LOGGER = logging.getLogger(__name__)
+
+def interface_address(sock, name):
+    """ return the IPv4 address of an interface, None when it has none """
+    #pylint: disable=import-outside-toplevel
+    import fcntl
+    request = struct.pack('256s', name.encode()[:15])
+    try:
+        reply = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, request)
+    except OSError:
+        return None
+    return socket.inet_ntoa(reply[20:24])
+
+def local_addresses():
+    """ return (interface, address) for each IPv4 interface except loopback """
+    addresses = []
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            for _, name in socket.if_nameindex():
+                address = interface_address(sock, name)
+                if address is not None:
+                    addresses.append((name, address))
+        finally:
+            sock.close()
+    except (ImportError, AttributeError):
+        # no fcntl or if_nameindex, use the addresses of the host name
+        for info in socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET):
+            if ('', info[4][0]) not in addresses:
+                addresses.append(('', info[4][0]))
+    return [(name, address) for name, address in addresses
+            if not address.startswith('127.')]
+
+class NetworkIdentity:
+    """ Cached host name and addresses, refreshed by a daemon thread """
+
+    def __init__(self, host_name=None, refresh=REFRESH_SECONDS, lookup=None):
+        """ host_name is usually MqttLocationTopic.get_host_name(), by default
+            socket.gethostname(); lookup() returns the host name and addresses,
+            by default read from this machine
+        """
+        # the name given, looked up again on every refresh when there is none
+        self.given_name = host_name
+        self.lookup = lookup if lookup is not None else self.local_identity
+        self.host_name = host_name
+        self.refresh_seconds = refresh
+        self.addresses = ()
+        self.version = 0
+        self.resolved = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self,):
+        """ resolve in the background, returns at once """
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.refresh_thread, name='NetworkIdentity')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self,):
+        """ stop refreshing """
+        self.stopping.set()
+
+    def refresh_thread(self,):
+        """ refresh now and then every refresh_seconds until stopped """
+        while True:
+            self.refresh()
+            if self.stopping.wait(self.refresh_seconds):
+                return
+
+    def local_identity(self,):
+        """ return the host name and the addresses of the local interfaces """
+        host_name = self.given_name or socket.gethostname()
+        return host_name, tuple(address for _, address in local_addresses())
+
+    def refresh(self,):
+        """ look the identity up, returns True when it changed """
+        try:
+            host_name, addresses = self.lookup()
+        #pylint: disable=broad-except
+        except Exception:
+            LOGGER.error("Exception occurred", exc_info=True)
+            return False
+        with self.lock:
+            changed = (self.version == 0 or
+                       (host_name, addresses) != (self.host_name, self.addresses))
+            if changed:
+                self.host_name = host_name
+                self.addresses = addresses
+                self.version += 1
+        self.resolved.set()
+        return changed
+
+    def snapshot(self,):
+        """ return (version, host name, addresses); version 0 until resolved """
+        with self.lock:
+            return self.version, self.host_name, self.addresses
+
+if __name__ == '__main__':
+    exit()
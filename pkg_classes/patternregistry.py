@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+""" Lazily constructed Led8x8 patterns, including third party patterns found
+    through the diyha.led8x8_patterns entry point group.
+
+    A plugin package declares its pattern classes in its packaging metadata:
+
+    [project.entry-points."diyha.led8x8_patterns"]
+    rainbow = "diyha_rainbow:Led8x8Rainbow"
+
+    The class is constructed as Led8x8Rainbow(matrix8x8, framebuffer=framebuffer)
+    the first time the pattern is shown, and "rainbow" can be used as the mode of
+    a playlist entry.
+"""
+
+import logging
+import importlib
+import threading
+
+from .timesource import SYSTEM_TIME
+
+ENTRY_POINT_GROUP = 'diyha.led8x8_patterns'
+
+# patterns not shown for this long are released unless kept
+RELEASE_SECONDS = 300.0
+
+LOGGER = logging.getLogger(__name__)
+
+def entry_points(group):
+    """ return the installed entry points of a group """
+    #pylint: disable=import-outside-toplevel
+    from importlib import metadata
+    found = metadata.entry_points()
+    if hasattr(found, 'select'):
+        return found.select(group=group)
+    # Python 3.8 and 3.9 return a dictionary of groups
+    return found.get(group, [])
+
+class PatternFactory:
+    """ How to build one pattern: a callable, an entry point or "module:Class" """
+
+    def __init__(self, target, args, kwargs, keep):
+        """ remember the target and the arguments after the matrix """
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self.keep = keep
+
+    def resolve(self,):
+        """ import the target if it is not a callable yet """
+        if callable(self.target):
+            return self.target
+        if hasattr(self.target, 'load'):
+            self.target = self.target.load()
+            return self.target
+        module, _, name = self.target.partition(':')
+        self.target = getattr(importlib.import_module(module, __package__), name)
+        return self.target
+
+class PatternRegistry:
+    """ Patterns by name, constructed on first use and released when idle """
+
+    def __init__(self, matrix8x8, framebuffer, release_seconds=RELEASE_SECONDS,
+                 time_source=SYSTEM_TIME):
+        """ patterns share the matrix and framebuffer """
+        self.time_source = time_source
+        self.matrix = matrix8x8
+        self.framebuffer = framebuffer
+        self.release_seconds = release_seconds
+        self.factories = {}
+        self.instances = {}
+        self.last_used = {}
+        self.constructed = 0
+        self.released = 0
+        # the display thread and MQTT callbacks both ask for patterns
+        self.lock = threading.RLock()
+
+    def register(self, name, target, *args, keep=False, **kwargs):
+        """ add a pattern built as target(matrix8x8, *args, framebuffer=..., **kwargs),
+            target is a class or "module:Class" imported on first use; kept
+            patterns are never released
+        """
+        self.factories[name] = PatternFactory(target, args, kwargs, keep)
+        self.release(name)
+
+    def discover(self, group=ENTRY_POINT_GROUP):
+        """ register installed plugin patterns, returns their names """
+        names = []
+        for entry_point in entry_points(group):
+            if entry_point.name in self.factories:
+                LOGGER.info('PatternRegistry: %s already registered', entry_point.name)
+                continue
+            self.factories[entry_point.name] = PatternFactory(entry_point, (), {}, False)
+            names.append(entry_point.name)
+        return names
+
+    def __contains__(self, name):
+        return name in self.factories
+
+    def names(self,):
+        """ return the registered pattern names """
+        return list(self.factories)
+
+    def loaded(self, name):
+        """ has the pattern been constructed? """
+        return name in self.instances
+
+    def get(self, name):
+        """ return the pattern, constructing it the first time """
+        with self.lock:
+            pattern = self.instances.get(name)
+            if pattern is None:
+                factory = self.factories[name]
+                pattern = factory.resolve()(self.matrix, *factory.args,
+                                            framebuffer=self.framebuffer, **factory.kwargs)
+                self.instances[name] = pattern
+                self.constructed += 1
+            self.last_used[name] = self.time_source.monotonic()
+            return pattern
+
+    def touch(self, name):
+        """ mark a loaded pattern as used now, e.g. as it stops being shown """
+        if name in self.last_used:
+            self.last_used[name] = self.time_source.monotonic()
+
+    def release(self, name):
+        """ drop a constructed pattern, it is built again when next used """
+        with self.lock:
+            if self.instances.pop(name, None) is not None:
+                self.released += 1
+            self.last_used.pop(name, None)
+
+    def release_idle(self, keep=(), now=None):
+        """ release patterns unused for release_seconds, except kept ones """
+        if now is None:
+            now = self.time_source.monotonic()
+        with self.lock:
+            for name, used in list(self.last_used.items()):
+                if name in keep or self.factories[name].keep:
+                    continue
+                if now - used > self.release_seconds:
+                    self.release(name)
+
+    def statistics(self,):
+        """ return the registered, loaded, constructed and released counts """
+        return {"registered": len(self.factories), "loaded": len(self.instances),
+                "constructed": self.constructed, "released": self.released}
+
+if __name__ == '__main__':
+    exit()
@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+""" Room map for the motion display: areas of the 8x8 matrix and the MQTT topics
+    that light them, loaded from a JSON file such as rooms.json
+
+    {
+        "areas": {"study": {"size": 4, "row": 6, "column": 6}, ...},
+        "topics": {"diy/upper/study/motion": ["study"],
+                   "diy/upper/+/motion": ["upper"], "diy/perimeter/#": ["front"]}
+    }
+
+    A size 2 area is pixels (row, column) and (row, column + 1), a size 4 area adds
+    the same two pixels at row + 1, and overlapping areas mix their colors. Exact
+    topics are found with one dictionary lookup and topics with MQTT + and #
+    wildcards in a TopicTrie.
+"""
+
+import os
+import json
+
+DEFAULT_ROOMS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rooms.json')
+
+# topics remembered with the areas they matched
+CACHE_SIZE = 1024
+
+SINGLE_LEVEL = '+'
+MULTI_LEVEL = '#'
+
+# trie node key holding the values of patterns that end at the node
+VALUES = None
+
+# Color values as convenient globals.
+GREEN = 1
+RED = 2
+
+FRAME_BYTES = 16
+
+class Area:
+    """ An area of the matrix and when its occupancy expires """
+
+    def __init__(self, name, size, row, column):
+        """ size is 2 or 4 pixels starting at row and column """
+        if size not in (2, 4):
+            raise ValueError('Area {} size must be 2 or 4.'.format(name))
+        self.name = name
+        self.size = size
+        self.row = row
+        self.column = column
+        # time.monotonic() when occupancy ends and the color band shown
+        self.expires = 0.0
+        self.band = 0
+        # bumped when expires moves so older deadlines can be ignored
+        self.generation = 0
+        self.masks = self.color_masks()
+
+    def pixels(self,):
+        """ return the (x, y) pixels of the area, row is x as in ImageDraw """
+        rows = (self.row,) if self.size == 2 else (self.row, self.row + 1)
+        return [(row, column) for row in rows
+                for column in (self.column, self.column + 1)]
+
+    def color_masks(self,):
+        """ return the framebuffer bits of the area in each color, indexed by
+            color, as integers of the 16 frame bytes in little endian order
+        """
+        green = 0
+        red = 0
+        for xpixel, ypixel in self.pixels():
+            if 0 <= xpixel < 8 and 0 <= ypixel < 8:
+                green |= 1 << (16 * ypixel + xpixel)
+                red |= 1 << (16 * ypixel + 8 + xpixel)
+        return (0, green, red, green | red)
+
+class TopicTrie:
+    """ MQTT topic patterns, with + for one level and # for the rest, compiled
+        into a tree of dictionaries keyed by topic level
+    """
+
+    def __init__(self,):
+        """ create an empty trie """
+        self.root = {}
+
+    def insert(self, pattern, value):
+        """ add a value for a topic pattern """
+        levels = pattern.split('/')
+        if MULTI_LEVEL in levels[:-1]:
+            raise ValueError('# must be the last level of {}'.format(pattern))
+        node = self.root
+        for level in levels:
+            node = node.setdefault(level, {})
+        node.setdefault(VALUES, []).append(value)
+
+    def match(self, topic):
+        """ return the values of every pattern matching a topic """
+        values = []
+        self.walk(self.root, topic.split('/'), 0, values)
+        return values
+
+    def walk(self, node, levels, index, values):
+        """ collect the matches below a node for levels[index:] """
+        rest = node.get(MULTI_LEVEL)
+        if rest is not None:
+            # a/# also matches a itself
+            values.extend(rest.get(VALUES, ()))
+        if index == len(levels):
+            values.extend(node.get(VALUES, ()))
+            return
+        child = node.get(levels[index])
+        if child is not None:
+            self.walk(child, levels, index + 1, values)
+        child = node.get(SINGLE_LEVEL)
+        if child is not None:
+            self.walk(child, levels, index + 1, values)
+
+class RoomMap:
+    """ Areas by name and the topic rules that select them """
+
+    def __init__(self, path=DEFAULT_ROOMS):
+        """ load a room map file, or start empty when path is None """
+        self.areas = {}
+        self.exact = {}
+        self.trie = TopicTrie()
+        self.cache = {}
+        if path is not None:
+            with open(path, encoding='utf-8') as rooms:
+                self.configure(json.load(rooms))
+
+    def configure(self, config):
+        """ add the areas and topic rules of a parsed room map """
+        for name, area in config.get("areas", {}).items():
+            self.areas[name] = Area(name, area["size"], area["row"], area["column"])
+        for topic, names in config.get("topics", {}).items():
+            if isinstance(names, str):
+                names = [names]
+            for name in names:
+                self.add_rule(topic, name)
+
+    def add_rule(self, topic, name):
+        """ light an area when a topic, possibly with wildcards, reports motion """
+        area = self.areas[name]
+        if SINGLE_LEVEL in topic.split('/') or MULTI_LEVEL in topic.split('/'):
+            self.trie.insert(topic, area)
+        else:
+            self.exact.setdefault(topic, []).append(area)
+        self.cache.clear()
+
+    def lookup(self, topic):
+        """ return the areas for a topic, usually one cached dictionary lookup """
+        areas = self.cache.get(topic)
+        if areas is None:
+            areas = []
+            for area in self.exact.get(topic, []) + self.trie.match(topic):
+                if area not in areas:
+                    areas.append(area)
+            areas = tuple(areas)
+            if len(self.cache) >= CACHE_SIZE:
+                self.cache.clear()
+            self.cache[topic] = areas
+        return areas
+
+if __name__ == '__main__':
+    exit()
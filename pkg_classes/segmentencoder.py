@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+""" Precomputed seven segment patterns for 4 digit HT16K33 displays
+
+    A SegmentTable holds the display RAM bytes of every number it covers in one
+    array, 5 bytes per number for the 4 digits and the colon between them, so a
+    number goes into a frame with a single slice assignment:
+
+        frame = bytearray(16)
+        number_table().encode(1234, frame)
+
+    number_table() blanks leading zeros as print_number_str does, zero_table()
+    keeps them and clock_table() only blanks a leading zero of the hour, as
+    strftime %l does. Tables are built the first time they are asked for.
+"""
+
+import itertools
+from array import array
+
+# segments of the characters a digit can show, letters as close as 7 segments get
+SEGMENT_FONT = {
+    ' ': 0x00, '-': 0x40, '_': 0x08, '0': 0x3F, '1': 0x06, '2': 0x5B, '3': 0x4F,
+    '4': 0x66, '5': 0x6D, '6': 0x7D, '7': 0x07, '8': 0x7F, '9': 0x6F, 'a': 0x77,
+    'b': 0x7C, 'c': 0x58, 'd': 0x5E, 'e': 0x79, 'f': 0x71, 'g': 0x3D, 'h': 0x74,
+    'i': 0x30, 'j': 0x1E, 'k': 0x75, 'l': 0x38, 'm': 0x37, 'n': 0x54, 'o': 0x5C,
+    'p': 0x73, 'q': 0x67, 'r': 0x50, 's': 0x6D, 't': 0x78, 'u': 0x3E, 'v': 0x1C,
+    'w': 0x2A, 'x': 0x76, 'y': 0x6E, 'z': 0x5B
+}
+
+DECIMAL_POINT = 0x80
+
+# display RAM index of each digit, the colon sits between digits 1 and 2
+DIGIT_INDEX = (0, 2, 6, 8)
+COLON_INDEX = 4
+COLON = 0x02
+
+# display RAM bytes 0, 2, 4, 6 and 8 of each number
+STRIDE = 5
+
+NUMBERS = 10000
+
+# hhmm values of the hour and minute tables
+CLOCK_NUMBERS = 2400
+
+# leading zeros that can be blank: display RAM offset and the numbers below
+# which that digit is a leading zero
+LEADING_ZEROS = ((0, 1000), (1, 100), (3, 10))
+
+TABLES = {}
+
+class SegmentTable:
+    """ Display RAM bytes of the numbers 0 to size - 1 """
+
+    def __init__(self, blank=0, size=NUMBERS):
+        """ blank is how many leading zeros show as blank digits, 3 to right
+            justify numbers
+        """
+        self.size = size
+        digits = [SEGMENT_FONT[str(digit)] for digit in range(10)]
+        # every 4 digit number in order, the colon byte clear
+        self.table = array('B', bytes(itertools.chain.from_iterable(
+            itertools.product(digits, digits, (0x00,), digits, digits))))
+        for offset, below in LEADING_ZEROS[:blank]:
+            self.table[offset:STRIDE * below:STRIDE] = array('B', bytes(below))
+        del self.table[STRIDE * size:]
+
+    def encode(self, number, frame):
+        """ put the digits of a number in the display RAM of a frame, clearing
+            the colon
+        """
+        start = STRIDE * number
+        frame[0:2 * STRIDE:2] = self.table[start:start + STRIDE]
+
+def cached_table(name, blank, size=NUMBERS):
+    """ return a table, building it the first time """
+    table = TABLES.get(name)
+    if table is None:
+        table = SegmentTable(blank, size)
+        TABLES[name] = table
+    return table
+
+def number_table():
+    """ numbers right justified with blank leading zeros, 7 as '   7' """
+    return cached_table('number', 3)
+
+def zero_table():
+    """ numbers with their leading zeros, 7 as '0007', e.g. %I%M or %H%M """
+    return cached_table('zero', 0)
+
+def clock_table():
+    """ hhmm with a blank leading zero of the hour, 907 as ' 907' and 7 as ' 007',
+        e.g. %l%M or %k%M
+    """
+    return cached_table('clock', 1, CLOCK_NUMBERS)
+
+if __name__ == '__main__':
+    exit()
@@ -0,0 +1,273 @@
+#!/usr/bin/python3
+""" Simulated Adafruit LED backpacks that record every I2C bus transaction.
+
+    SimulatedMatrix8x8 and SimulatedSevenSegment have the same interface as the
+    Adafruit_LED_Backpack BicolorMatrix8x8 and SevenSegment drivers, so every
+    display path runs and can be measured on a plain Linux box.
+"""
+
+import time
+from collections import namedtuple
+
+# HT16K33 commands
+HT16K33_BLINK_CMD = 0x80
+HT16K33_BLINK_DISPLAYON = 0x01
+HT16K33_BLINK_OFF = 0x00
+HT16K33_SYSTEM_SETUP = 0x20
+HT16K33_OSCILLATOR = 0x01
+HT16K33_CMD_BRIGHTNESS = 0xE0
+
+# Color values as convenient globals.
+OFF = 0
+GREEN = 1
+RED = 2
+YELLOW = 3
+
+DIGIT_VALUES = {
+    ' ': 0x00, '-': 0x40, '0': 0x3F, '1': 0x06, '2': 0x5B, '3': 0x4F, '4': 0x66,
+    '5': 0x6D, '6': 0x7D, '7': 0x07, '8': 0x7F, '9': 0x6F, 'A': 0x77, 'B': 0x7C,
+    'C': 0x39, 'D': 0x5E, 'E': 0x79, 'F': 0x71
+}
+
+SEGMENT_CHARACTERS = {value: key for key, value in DIGIT_VALUES.items()}
+
+PIXEL_CHARACTERS = ('.', 'G', 'R', 'Y')
+
+Transaction = namedtuple('Transaction', 'timestamp address register size')
+
+class I2CTransactionRecorder:
+    """ Record simulated I2C writes with their time, address and byte count """
+
+    def __init__(self, keep_log=True):
+        """ start with an empty log; with keep_log False only totals are kept """
+        self.keep_log = keep_log
+        self.transactions = []
+        self.counts = {}
+        self.sizes = {}
+
+    def clear(self,):
+        """ forget every recorded transaction """
+        del self.transactions[:]
+        self.counts.clear()
+        self.sizes.clear()
+
+    def record(self, address, register, size):
+        """ log one write of size data bytes to a register """
+        self.counts[address] = self.counts.get(address, 0) + 1
+        # the register byte goes on the bus with the data
+        self.sizes[address] = self.sizes.get(address, 0) + size + 1
+        if self.keep_log:
+            self.transactions.append(Transaction(time.monotonic(), address, register, size))
+
+    def count(self, address=None):
+        """ return the number of transactions, optionally for one address """
+        if address is None:
+            return sum(self.counts.values())
+        return self.counts.get(address, 0)
+
+    def bytes_written(self, address=None):
+        """ return the bytes put on the bus including the register bytes """
+        if address is None:
+            return sum(self.sizes.values())
+        return self.sizes.get(address, 0)
+
+class SimulatedDevice:
+    """ Adafruit_GPIO.I2C.Device stand in that records instead of writing """
+
+    def __init__(self, address, recorder):
+        """ attach to an address on a recorded bus """
+        self.address = address
+        # the Adafruit device keeps its address here, I2CBusArbiter reads it
+        self._address = address
+        self.recorder = recorder
+
+    def writeRaw8(self, value):
+        """ write a single byte with no register """
+        #pylint: disable=invalid-name,unused-argument
+        self.recorder.record(self.address, None, 0)
+
+    def write8(self, register, value):
+        """ write one byte to a register """
+        #pylint: disable=invalid-name,unused-argument
+        self.recorder.record(self.address, register, 1)
+
+    def writeList(self, register, data):
+        """ write a block of bytes starting at a register """
+        #pylint: disable=invalid-name
+        self.recorder.record(self.address, register, len(data))
+
+class SimulatedHT16K33:
+    """ HT16K33 LED driver with 16 bytes of display RAM """
+
+    def __init__(self, address=0x70, recorder=None):
+        """ create the display RAM and attach to a recorded bus """
+        if recorder is None:
+            recorder = I2CTransactionRecorder()
+        self.recorder = recorder
+        self._device = SimulatedDevice(address, recorder)
+        self.buffer = bytearray(16)
+        self.brightness = 15
+        self.blink = HT16K33_BLINK_OFF
+
+    def begin(self,):
+        """ start the oscillator, stop blinking and set full brightness """
+        self._device.writeList(HT16K33_SYSTEM_SETUP | HT16K33_OSCILLATOR, [])
+        self.set_blink(HT16K33_BLINK_OFF)
+        self.set_brightness(15)
+
+    def set_blink(self, frequency):
+        """ set the blink frequency """
+        self.blink = frequency
+        self._device.writeList(HT16K33_BLINK_CMD | HT16K33_BLINK_DISPLAYON | frequency, [])
+
+    def set_brightness(self, brightness):
+        """ set brightness from 0 to 15 """
+        if brightness < 0 or brightness > 15:
+            raise ValueError('Brightness must be a value of 0 to 15.')
+        self.brightness = brightness
+        self._device.writeList(HT16K33_CMD_BRIGHTNESS | brightness, [])
+
+    def set_led(self, led, value):
+        """ set LED 0 to 127 on or off in the buffer """
+        if led < 0 or led > 127:
+            raise ValueError('LED must be value of 0 to 127.')
+        pos = led // 8
+        offset = led % 8
+        if value:
+            self.buffer[pos] |= 1 << offset
+        else:
+            self.buffer[pos] &= ~(1 << offset) & 0xFF
+
+    def write_display(self,):
+        """ write the buffer one register at a time like the Adafruit driver """
+        for i, value in enumerate(self.buffer):
+            self._device.write8(i, value)
+
+    def clear(self,):
+        """ clear the buffer """
+        self.buffer[:] = bytes(16)
+
+class SimulatedMatrix8x8(SimulatedHT16K33):
+    """ Bicolor 8x8 matrix with the BicolorMatrix8x8 pixel interface """
+
+    def set_pixel(self, x, y, value):
+        """ set pixel (x, y) to OFF, GREEN, RED or YELLOW """
+        #pylint: disable=invalid-name
+        if x < 0 or x > 7 or y < 0 or y > 7:
+            return
+        self.set_led(y * 16 + x, 1 if value & GREEN > 0 else 0)
+        self.set_led(y * 16 + x + 8, 1 if value & RED > 0 else 0)
+
+    def get_pixel(self, x, y):
+        """ return the color of pixel (x, y) in the buffer """
+        #pylint: disable=invalid-name
+        green = (self.buffer[2 * y] >> x) & 1
+        red = (self.buffer[2 * y + 1] >> x) & 1
+        return green | (red << 1)
+
+    def set_image(self, image):
+        """ set the buffer from an 8x8 RGB PIL image """
+        imwidth, imheight = image.size
+        if imwidth != 8 or imheight != 8:
+            raise ValueError('Image must be an 8x8 pixels in size.')
+        pix = image.convert('RGB').load()
+        for x in range(8):
+            for y in range(8):
+                color = pix[(x, y)]
+                if color == (255, 0, 0):
+                    self.set_pixel(x, y, RED)
+                elif color == (0, 255, 0):
+                    self.set_pixel(x, y, GREEN)
+                elif color == (255, 255, 0):
+                    self.set_pixel(x, y, YELLOW)
+                else:
+                    self.set_pixel(x, y, OFF)
+
+    def render(self,):
+        """ return the buffer as 8 lines of . G R Y characters """
+        return '\n'.join(''.join(PIXEL_CHARACTERS[self.get_pixel(x, y)] for x in range(8))
+                         for y in range(8))
+
+class SimulatedSevenSegment(SimulatedHT16K33):
+    """ 4 digit seven segment display with the SevenSegment interface """
+
+    def __init__(self, address=0x70, recorder=None):
+        """ create the display on an address, the clock uses 0x71 """
+        SimulatedHT16K33.__init__(self, address, recorder)
+        self.invert = False
+
+    def set_invert(self, _invert):
+        """ upside down displays are not simulated """
+
+    def set_digit_raw(self, pos, bitmask):
+        """ set digit 0 to 3 to raw segment bits, skipping the colon position """
+        if pos < 0 or pos > 3:
+            return
+        offset = 0 if pos < 2 else 1
+        pos = pos + offset
+        self.buffer[pos * 2] = bitmask & 0xFF
+
+    def set_decimal(self, pos, decimal):
+        """ turn the decimal point of digit 0 to 3 on or off """
+        if pos < 0 or pos > 3:
+            return
+        offset = 0 if pos < 2 else 1
+        pos = pos + offset
+        if decimal:
+            self.buffer[pos * 2] |= (1 << 7)
+        else:
+            self.buffer[pos * 2] &= ~(1 << 7) & 0xFF
+
+    def set_digit(self, pos, digit, decimal=False):
+        """ show a hex digit, space or dash at a position """
+        self.set_digit_raw(pos, DIGIT_VALUES.get(str(digit).upper(), 0x00))
+        if decimal:
+            self.set_decimal(pos, True)
+
+    def set_colon(self, show_colon):
+        """ turn the colon on or off """
+        if show_colon:
+            self.buffer[4] |= 0x02
+        else:
+            self.buffer[4] &= (~0x02) & 0xFF
+
+    def print_number_str(self, value, justify_right=True):
+        """ print up to 4 characters plus decimal points, ---- when too long """
+        length = sum(map(lambda x: x != '.', value))
+        if length > 4:
+            self.print_number_str('----')
+            return
+        pos = (4 - length) if justify_right else 0
+        for char in value:
+            if char == '.':
+                self.set_decimal(pos - 1, True)
+            else:
+                self.set_digit(pos, char)
+                pos += 1
+
+    def print_float(self, value, decimal_digits=2, justify_right=True):
+        """ print a number with a fixed number of decimal digits """
+        format_string = '{{0:0.{0}F}}'.format(decimal_digits)
+        self.print_number_str(format_string.format(value), justify_right)
+
+    def print_hex(self, value, justify_right=True):
+        """ print a number from 0 to FFFF in hex """
+        if value < 0 or value > 0xFFFF:
+            self.print_number_str('----')
+            return
+        self.print_number_str('{0:X}'.format(value), justify_right)
+
+    def render(self,):
+        """ return the digits as text with : for the colon and . for decimals """
+        text = ''
+        for index in (0, 2, 6, 8):
+            segments = self.buffer[index]
+            text += SEGMENT_CHARACTERS.get(segments & 0x7F, '?')
+            if segments & 0x80:
+                text += '.'
+            if index == 2:
+                text += ':' if self.buffer[4] & 0x02 else ' '
+        return text
+
+if __name__ == '__main__':
+    exit()
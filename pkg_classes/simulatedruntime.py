@@ -0,0 +1,210 @@
+#!/usr/bin/python3
+""" Run LED controllers, clocks and interval timers on VirtualTime, one step at
+    a time on the calling thread, so a day of timed events takes seconds.
+
+    time_source = VirtualTime(datetime.datetime(2026, 10, 18))
+    runtime = SimulatedRuntime(time_source)
+    controller = runtime.add_controller(
+        Led8x8Controller(SimulatedMatrix8x8(), time_source=time_source))
+    clock = runtime.add_clock(LedClock(SimulatedSevenSegment(0x71), time_source=time_source))
+    runtime.add_interval_timer(IntervalTimer(clock, controller, time_source=time_source))
+    runtime.call_later(3600, controller.set_mode, FIRE_MODE)
+    runtime.run_for(24 * 3600)
+
+    Each device is stepped the way its display thread or task loops, but instead
+    of waiting the runtime jumps the time source to the earliest deadline of any
+    device. Interrupts, new events and countdown timers wake a device early just
+    as they cut a real wait short.
+"""
+
+import heapq
+import logging
+
+from .timesource import VirtualTime
+
+LOGGER = logging.getLogger(__name__)
+
+# the identity who mode shows instead of the host's, 192.0.2.0/24 is for examples
+SIMULATED_HOST = 'simulated'
+SIMULATED_ADDRESSES = ('192.0.2.10',)
+
+class SimulatedActor:
+    """ A step the runtime calls at its deadline """
+
+    def __init__(self, step, wake=None):
+        """ step() returns the seconds until it runs again, None to sleep until
+            wake() returns a time; wake() returns the monotonic time the step
+            must run by, earlier than planned after an interrupt, or None
+        """
+        self.step = step
+        self.wake = wake
+        self.when = None
+        # bumped when the deadline moves so older heap entries can be ignored
+        self.generation = 0
+        self.steps = 0
+
+class FrameLoop:
+    """ The wait and show loop of a display thread as steps """
+
+    def __init__(self, scheduler):
+        """ frames are timed by a FrameScheduler """
+        self.scheduler = scheduler
+        self.waiting = False
+
+    def wake(self,):
+        """ run at once when the scheduler was interrupted """
+        if self.scheduler.wakeup.is_set():
+            return self.scheduler.time_source.monotonic()
+        return None
+
+    def wait_over(self,):
+        """ end the wait of the last step, returns True when it was interrupted """
+        if not self.waiting:
+            return True
+        self.waiting = False
+        return self.scheduler.wait_over()
+
+    def wait(self, period):
+        """ start a wait, returns the seconds to the next step """
+        delay = self.scheduler.begin_wait(period)
+        if delay is None:
+            return 0.0
+        self.waiting = True
+        return max(0.0, delay)
+
+class SimulatedRuntime:
+    """ Devices as steps on a heap of VirtualTime deadlines """
+
+    def __init__(self, time_source=None):
+        """ use a VirtualTime passed in, the one the devices were built with,
+            or start a new one now
+        """
+        if time_source is None:
+            time_source = VirtualTime()
+        self.time_source = time_source
+        self.actors = []
+        self.heap = []
+        self.sequence = 0
+        self.steps = 0
+
+    def now(self,):
+        """ the simulated monotonic time """
+        return self.time_source.monotonic()
+
+    def schedule(self, actor, when):
+        """ set the deadline of an actor """
+        actor.when = when
+        actor.generation += 1
+        self.sequence += 1
+        heapq.heappush(self.heap, (when, self.sequence, actor.generation, actor))
+
+    def add_step(self, step, delay=0.0, wake=None):
+        """ call step() after delay seconds and from then on as it asks """
+        actor = SimulatedActor(step, wake)
+        self.actors.append(actor)
+        if delay is not None:
+            self.schedule(actor, self.now() + delay)
+        return actor
+
+    def call_later(self, delay, callback, *args):
+        """ call callback(*args) once after delay seconds, e.g. an MQTT command """
+        def step():
+            """ the call, once """
+            callback(*args)
+        return self.add_step(step, delay)
+
+    def add_controller(self, controller):
+        """ step a Led8x8Controller display as display_thread loops """
+        frames = FrameLoop(controller.scheduler)
+
+        def step():
+            """ show the frame waited for and wait for the next """
+            try:
+                return frames.wait(controller.frame(frames.wait_over()))
+            #pylint: disable=broad-except
+            except Exception as ex:
+                frames.waiting = False
+                return 1.0 if controller.recover(ex) else None
+
+        self.add_step(step, wake=frames.wake)
+        return controller
+
+    def add_clock(self, clock, addresses=SIMULATED_ADDRESSES):
+        """ step a LedClock display as time_update_thread loops, with its
+            countdown timers expiring and its identity refreshing on the runtime
+            instead of their threads; who mode shows the given addresses
+        """
+        frames = FrameLoop(clock.scheduler)
+
+        def step():
+            """ update the display and wait for the next tick """
+            frames.wait_over()
+            return frames.wait(clock.frame())
+
+        identity = clock.identity
+        identity.lookup = lambda: (identity.given_name or SIMULATED_HOST, tuple(addresses))
+
+        def refresh():
+            """ refresh the who mode identity """
+            identity.refresh()
+            return identity.refresh_seconds
+
+        engine = clock.count.timers
+        engine.threaded = False
+
+        def expire():
+            """ expire the countdown timers that are due """
+            engine.expire_due()
+
+        self.add_step(step, frames.wait(clock.frame_period()), frames.wake)
+        self.add_step(expire, None, engine.next_deadline)
+        self.add_step(refresh)
+        return clock
+
+    def add_interval_timer(self, timer):
+        """ step IntervalTimer timed events as timer_thread loops """
+        def wake():
+            """ run at once when an event was added """
+            return self.now() if timer.wakeup.is_set() else None
+
+        self.add_step(timer.run_due_events, wake=wake)
+        return timer
+
+    def wake_actors(self,):
+        """ move deadlines earlier for actors woken by the last step """
+        for actor in self.actors:
+            if actor.wake is None:
+                continue
+            when = actor.wake()
+            if when is not None and (actor.when is None or when < actor.when):
+                self.schedule(actor, max(when, self.now()))
+
+    def run_until(self, end):
+        """ run every step due up to the monotonic time end, then move time to end """
+        while self.heap and self.heap[0][0] <= end:
+            when, _, generation, actor = heapq.heappop(self.heap)
+            if generation != actor.generation:
+                continue
+            self.time_source.advance_to(when)
+            actor.when = None
+            actor.steps += 1
+            self.steps += 1
+            delay = None
+            try:
+                delay = actor.step()
+            #pylint: disable=broad-except
+            except Exception:
+                LOGGER.error("Exception occurred", exc_info=True)
+            if delay is not None:
+                self.schedule(actor, self.now() + max(0.0, delay))
+            self.wake_actors()
+        self.time_source.advance_to(end)
+
+    def run_for(self, seconds):
+        """ run the simulated seconds, returns the number of steps """
+        steps = self.steps
+        self.run_until(self.now() + seconds)
+        return self.steps - steps
+
+if __name__ == '__main__':
+    exit()
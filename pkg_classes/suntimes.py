@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+""" Local sunrise and sunset times computed from latitude and longitude
+
+    Uses the sunrise equation of the Almanac for Computers (1990), good to a
+    minute or two, with the official zenith of 90 degrees 50 minutes that allows
+    for refraction and the size of the sun. Nothing is looked up on the network.
+"""
+
+import math
+import datetime
+
+OFFICIAL_ZENITH = 90.833
+
+def sun_event_hours(day, latitude, longitude, rising, zenith=OFFICIAL_ZENITH):
+    """ return the UTC hour of sunrise or sunset on a date, None when the sun
+        stays up or down all day
+    """
+    day_of_year = day.timetuple().tm_yday
+    longitude_hour = longitude / 15.0
+    approximate = day_of_year + ((6.0 if rising else 18.0) - longitude_hour) / 24.0
+    # mean anomaly and true longitude of the sun
+    anomaly = 0.9856 * approximate - 3.289
+    true_longitude = (anomaly + 1.916 * math.sin(math.radians(anomaly)) +
+                      0.020 * math.sin(math.radians(2 * anomaly)) + 282.634) % 360.0
+    right_ascension = math.degrees(math.atan(0.91764 * math.tan(math.radians(true_longitude))))
+    right_ascension %= 360.0
+    # right ascension in the same quadrant as the true longitude, in hours
+    right_ascension += (math.floor(true_longitude / 90.0) -
+                        math.floor(right_ascension / 90.0)) * 90.0
+    right_ascension /= 15.0
+    sin_declination = 0.39782 * math.sin(math.radians(true_longitude))
+    cos_declination = math.cos(math.asin(sin_declination))
+    cos_hour_angle = ((math.cos(math.radians(zenith)) -
+                       sin_declination * math.sin(math.radians(latitude))) /
+                      (cos_declination * math.cos(math.radians(latitude))))
+    if cos_hour_angle > 1.0 or cos_hour_angle < -1.0:
+        return None
+    hour_angle = math.degrees(math.acos(cos_hour_angle))
+    if rising:
+        hour_angle = 360.0 - hour_angle
+    local_mean = hour_angle / 15.0 + right_ascension - 0.06571 * approximate - 6.622
+    return (local_mean - longitude_hour) % 24.0
+
+def sun_event(day, latitude, longitude, rising):
+    """ return the local naive datetime of sunrise or sunset on a local date,
+        None when there is none
+    """
+    # the UTC date of a local sun event can be the day before or after
+    for utc_day in (day, day - datetime.timedelta(days=1), day + datetime.timedelta(days=1)):
+        hours = sun_event_hours(utc_day, latitude, longitude, rising)
+        if hours is None:
+            continue
+        utc = datetime.datetime.combine(utc_day, datetime.time(tzinfo=datetime.timezone.utc))
+        local = (utc + datetime.timedelta(hours=hours)).astimezone().replace(tzinfo=None)
+        if local.date() == day:
+            return local
+    return None
+
+def sun_times(day, latitude, longitude):
+    """ return the local (sunrise, sunset) of a date, either None when the sun
+        does not rise or set that day
+    """
+    return (sun_event(day, latitude, longitude, True),
+            sun_event(day, latitude, longitude, False))
+
+if __name__ == '__main__':
+    exit()
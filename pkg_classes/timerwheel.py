@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+""" Hashed timer wheel for coarse timed events such as pattern rotation """
+
+import math
+
+from .timesource import SYSTEM_TIME
+
+TICK_SECONDS = 1.0
+
+SLOTS = 64
+
+class Timer:
+    """ A callback due at a tick of the wheel """
+
+    def __init__(self, expiry, callback, args):
+        """ expiry is the absolute tick number """
+        self.expiry = expiry
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self,):
+        """ stop the timer from firing """
+        self.cancelled = True
+
+class TimerWheel:
+    """ Timers are kept in the slot of their expiry tick modulo the number of
+        slots, so scheduling is O(1) and each tick only looks at one slot. Timers
+        further out than one turn of the wheel stay in their slot until their
+        turn comes round.
+    """
+
+    def __init__(self, tick=TICK_SECONDS, slots=SLOTS, now=None, time_source=SYSTEM_TIME):
+        """ create an empty wheel turning one slot per tick seconds of the
+            time_source monotonic clock
+        """
+        self.time_source = time_source
+        if now is None:
+            now = time_source.monotonic()
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.current = int(now // tick)
+        self.pending = 0
+
+    def schedule(self, delay, callback, *args, now=None):
+        """ call callback(*args) once delay seconds have passed, rounded up to
+            the next tick; returns a Timer that can be cancelled
+        """
+        if now is None:
+            now = self.time_source.monotonic()
+        expiry = max(self.current + 1, math.ceil((now + delay) / self.tick))
+        timer = Timer(expiry, callback, args)
+        self.slots[expiry % len(self.slots)].append(timer)
+        self.pending += 1
+        return timer
+
+    def advance(self, now=None):
+        """ fire the timers due by now, returns the number fired """
+        if now is None:
+            now = self.time_source.monotonic()
+        target = int(now // self.tick)
+        if target <= self.current or not self.pending:
+            self.current = max(self.current, target)
+            return 0
+        due = []
+        # after a long gap every slot is due at most once
+        ticks = min(target - self.current, len(self.slots))
+        for step in range(1, ticks + 1):
+            slot = self.slots[(self.current + step) % len(self.slots)]
+            if not slot:
+                continue
+            expired = [timer for timer in slot if timer.expiry <= target]
+            if expired:
+                slot[:] = [timer for timer in slot if timer.expiry > target]
+                due.extend(expired)
+        self.pending -= len(due)
+        # callbacks may schedule new timers from the new current tick
+        self.current = target
+        fired = 0
+        for timer in sorted(due, key=lambda timer: timer.expiry):
+            if not timer.cancelled:
+                fired += 1
+                timer.callback(*timer.args)
+        return fired
+
+    def remaining(self, timer, now=None):
+        """ return the seconds until a timer is due """
+        if now is None:
+            now = self.time_source.monotonic()
+        return max(0.0, timer.expiry * self.tick - now)
+
+    def next_expiry(self,):
+        """ return the tick time of the earliest live timer, None if none """
+        expiries = [timer.expiry for slot in self.slots for timer in slot
+                    if not timer.cancelled]
+        if not expiries:
+            return None
+        return min(expiries) * self.tick
+
+if __name__ == '__main__':
+    exit()
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+""" Where pkg_classes gets the time from, so timed behaviour can be simulated
+
+    Devices take a time_source and default to SYSTEM_TIME, the real clocks.
+    VirtualTime only moves when told to, and waiting on it jumps straight to the
+    end of the wait, so a SimulatedRuntime can run a day of timed events in
+    seconds:
+
+        time_source = VirtualTime(datetime.datetime(2026, 10, 18))
+        controller = Led8x8Controller(SimulatedMatrix8x8(), time_source=time_source)
+"""
+
+import time
+import datetime
+
+class SystemTime:
+    """ The real time.monotonic, time.time and waits """
+
+    @staticmethod
+    def monotonic():
+        """ seconds for deadlines, never going back """
+        return time.monotonic()
+
+    @staticmethod
+    def time():
+        """ wall clock seconds since the epoch """
+        return time.time()
+
+    def localtime(self,):
+        """ wall clock time as a time.struct_time """
+        return time.localtime(self.time())
+
+    def now(self,):
+        """ wall clock time as a naive local datetime """
+        return datetime.datetime.fromtimestamp(self.time())
+
+    @staticmethod
+    def sleep(seconds):
+        """ pause the calling thread """
+        time.sleep(seconds)
+
+    @staticmethod
+    def wait(event, timeout=None):
+        """ wait for a threading.Event, returns True when it is set """
+        return event.wait(timeout)
+
+class VirtualTime(SystemTime):
+    """ Simulated time that only moves forward when advanced or waited on; the
+        monotonic and wall clocks are the same seconds since the epoch
+    """
+
+    def __init__(self, start=None):
+        """ start is a naive local datetime or seconds since the epoch, by
+            default now
+        """
+        if start is None:
+            start = time.time()
+        elif isinstance(start, datetime.datetime):
+            start = start.timestamp()
+        self.seconds = float(start)
+
+    def monotonic(self,):
+        """ the simulated seconds """
+        return self.seconds
+
+    def time(self,):
+        """ the simulated seconds """
+        return self.seconds
+
+    def advance(self, seconds):
+        """ move time forward """
+        if seconds > 0.0:
+            self.seconds += seconds
+
+    def advance_to(self, seconds):
+        """ move time forward to a monotonic() value, never back """
+        self.seconds = max(self.seconds, seconds)
+
+    def sleep(self, seconds):
+        """ jump over the sleep """
+        self.advance(seconds)
+
+    def wait(self, event, timeout=None):
+        """ nothing else runs while simulated code waits, so jump to the timeout """
+        if not event.is_set() and timeout is not None:
+            self.advance(timeout)
+        return event.is_set()
+
+SYSTEM_TIME = SystemTime()
+
+if __name__ == '__main__':
+    exit()
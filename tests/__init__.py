@@ -0,0 +1 @@
+""" Unit tests of the pkg_classes engines, run with python3 -m unittest """
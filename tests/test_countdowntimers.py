@@ -0,0 +1,84 @@
+""" CountdownEngine timers driven by expire_due on VirtualTime """
+
+import unittest
+
+from pkg_classes.countdowntimers import CountdownEngine
+from pkg_classes.ledclock import CountdownDisplay, DEFAULT_TIMER
+from pkg_classes.simulatedbackpack import SimulatedSevenSegment
+from pkg_classes.timesource import VirtualTime
+
+class CountdownEngineTest(unittest.TestCase):
+    """ the engine without its expiry thread """
+
+    def setUp(self,):
+        self.time = VirtualTime(1000.0)
+        self.expired = []
+        self.engine = CountdownEngine(self.expired.append, time_source=self.time)
+        self.engine.threaded = False
+
+    def advance(self, seconds):
+        """ move time on and expire the timers due """
+        self.time.advance(seconds)
+        return self.engine.expire_due()
+
+    def test_timer_expires_at_its_deadline(self,):
+        self.engine.start('tea', 240)
+        self.assertEqual(self.advance(239.0), 0)
+        self.assertEqual(self.engine.remaining('tea'), 1.0)
+        self.assertEqual(self.advance(1.0), 1)
+        self.assertEqual(self.expired, ['tea'])
+        self.assertNotIn('tea', self.engine)
+        self.assertIsNone(self.engine.nearest())
+
+    def test_paused_timer_keeps_its_time(self,):
+        self.engine.start('eggs', 420)
+        self.advance(60.0)
+        self.engine.pause('eggs')
+        self.assertEqual(self.advance(600.0), 0)
+        self.assertEqual(self.engine.remaining('eggs'), 360.0)
+        self.engine.resume('eggs')
+        self.engine.extend('eggs', 10)
+        self.assertEqual(self.advance(369.0), 0)
+        self.assertEqual(self.advance(1.0), 1)
+
+    def test_restart_and_cancel_drop_the_old_deadline(self,):
+        self.engine.start('tea', 10)
+        self.engine.start('tea', 20)
+        self.engine.start('rice', 5)
+        self.engine.cancel('rice')
+        self.assertEqual(self.advance(10.0), 0)
+        self.assertEqual(self.engine.next_deadline(), 1020.0)
+        self.assertEqual(self.advance(10.0), 1)
+        self.assertEqual(self.expired, ['tea'])
+
+    def test_repeating_timer_starts_over_from_its_deadline(self,):
+        self.engine.start('beat', 10, repeat=True)
+        self.advance(10.5)
+        self.assertEqual(self.engine.remaining('beat'), 9.5)
+        self.assertEqual(self.advance(100.0), 1)
+        self.assertEqual(self.engine.remaining('beat'), 10.0)
+
+    def test_nearest_prefers_running_timers(self,):
+        self.engine.start('long', 600)
+        self.engine.start('short', 60)
+        self.engine.start('paused', 5)
+        self.engine.pause('paused')
+        self.assertEqual(self.engine.nearest().name, 'short')
+        self.assertEqual(self.engine.nearest(exclude='short').name, 'long')
+        self.engine.cancel('long')
+        self.engine.cancel('short')
+        self.assertEqual(self.engine.nearest().name, 'paused')
+        self.assertEqual(self.engine.nearest(exclude='short').name, 'paused')
+
+    def test_display_shows_set_timers_before_the_free_running_countdown(self,):
+        display = CountdownDisplay(SimulatedSevenSegment(0x71), self.engine)
+        display.display()
+        self.assertEqual(display.shown_timer().name, DEFAULT_TIMER)
+        # a longer timer is still shown ahead of the default countdown
+        self.engine.start('roast', 3 * 3600)
+        self.assertEqual(display.shown_timer().name, 'roast')
+        self.engine.cancel('roast')
+        self.assertEqual(display.shown_timer().name, DEFAULT_TIMER)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+""" FrameScheduler deadlines, interrupts and latencies on VirtualTime """
+
+import datetime
+import unittest
+
+from pkg_classes.framescheduler import FrameScheduler, ALIGN_OFFSET
+from pkg_classes.timesource import VirtualTime
+
+START = datetime.datetime(2026, 10, 18)
+
+class FrameSchedulerTest(unittest.TestCase):
+    """ waits jump the virtual clock, so each test runs instantly """
+
+    def setUp(self,):
+        self.time = VirtualTime(START)
+        self.start = self.time.monotonic()
+        self.scheduler = FrameScheduler(time_source=self.time)
+
+    def elapsed(self,):
+        """ seconds since the test started """
+        return self.time.monotonic() - self.start
+
+    def test_render_time_does_not_stretch_the_period(self,):
+        for frame in range(1, 4):
+            self.assertFalse(self.scheduler.wait(0.5))
+            self.assertAlmostEqual(self.elapsed(), 0.5 * frame)
+            # rendering takes a fifth of the period
+            self.time.advance(0.1)
+        self.assertEqual(self.scheduler.frames, 3)
+        self.assertEqual(self.scheduler.overruns, 0)
+
+    def test_late_frames_are_skipped(self,):
+        self.scheduler.wait(1.0)
+        self.time.advance(3.5)
+        self.scheduler.wait(1.0)
+        self.assertEqual(self.scheduler.overruns, 1)
+        self.assertEqual(self.scheduler.skipped, 2)
+        # the next deadline stays on the original grid
+        self.scheduler.wait(1.0)
+        self.assertAlmostEqual(self.elapsed(), 5.0)
+
+    def test_interrupt_ends_the_wait_and_restarts_the_sequence(self,):
+        self.scheduler.wait(1.0)
+        self.time.advance(0.25)
+        self.scheduler.interrupt()
+        self.assertTrue(self.scheduler.wait(1.0))
+        self.assertEqual(self.scheduler.preemptions, 1)
+        # the frame after the interrupt is due at once
+        self.assertFalse(self.scheduler.wait(1.0))
+        self.assertAlmostEqual(self.elapsed(), 1.25)
+
+    def test_latency_ends_with_the_first_frame_shown(self,):
+        self.scheduler.wait(1.0)
+        self.scheduler.interrupt()
+        self.time.advance(0.02)
+        self.scheduler.wait(1.0)
+        self.time.advance(0.03)
+        self.scheduler.frame_shown()
+        self.scheduler.frame_shown()
+        self.assertEqual(self.scheduler.measured, 1)
+        self.assertAlmostEqual(self.scheduler.latencies[-1], 0.05)
+        self.assertAlmostEqual(self.scheduler.max_latency, 0.05)
+
+    def test_data_wakeup_is_not_a_command(self,):
+        self.scheduler.interrupt(command=False)
+        self.assertTrue(self.scheduler.wait(1.0))
+        self.scheduler.frame_shown()
+        self.assertEqual(self.scheduler.preemptions, 0)
+        self.assertEqual(self.scheduler.measured, 0)
+
+    def test_begin_wait_and_wait_over_time_a_step(self,):
+        self.assertAlmostEqual(self.scheduler.begin_wait(0.5), 0.5)
+        self.time.advance(0.5)
+        self.assertFalse(self.scheduler.wait_over())
+        self.scheduler.interrupt()
+        self.assertIsNone(self.scheduler.begin_wait(0.5))
+        self.assertEqual(self.scheduler.begin_wait(0.5), 0.0)
+
+    def test_aligned_frames_fall_on_wall_clock_seconds(self,):
+        scheduler = FrameScheduler(align=True, time_source=self.time)
+        self.time.advance(0.3)
+        for second in range(1, 4):
+            scheduler.wait(1.0)
+            self.assertAlmostEqual(self.elapsed(), second + ALIGN_OFFSET, places=5)
+            self.time.advance(0.2)
+        self.time.advance(2.0)
+        scheduler.wait(1.0)
+        self.assertEqual(scheduler.skipped, 2)
+        self.assertAlmostEqual(self.elapsed(), 6.0 + ALIGN_OFFSET, places=5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+""" I2CBusArbiter ownership and the order waiters are served in """
+
+import threading
+import time
+import unittest
+
+from pkg_classes.i2cbusarbiter import I2CBusArbiter
+from pkg_classes.i2cbusarbiter import ALARM_PRIORITY, NORMAL_PRIORITY, BACKGROUND_PRIORITY
+from pkg_classes.simulatedbackpack import I2CTransactionRecorder, SimulatedMatrix8x8
+
+MATRIX = 0x70
+
+CLOCK = 0x71
+
+class I2CBusArbiterTest(unittest.TestCase):
+    """ waiting threads queue behind the bus held by the test """
+
+    def setUp(self,):
+        self.arbiter = I2CBusArbiter()
+        self.order = []
+        self.threads = []
+
+    def tearDown(self,):
+        for thread in self.threads:
+            thread.join(1.0)
+
+    def wait_for_queue(self, depth):
+        """ wait until depth threads are queued for the bus """
+        give_up = time.monotonic() + 5.0
+        while self.arbiter.queue_depth() < depth:
+            self.assertLess(time.monotonic(), give_up, 'waiters did not queue')
+            time.sleep(0.001)
+
+    def queue(self, name, address, priority):
+        """ start a thread that records its name once it has the bus """
+        def use_bus():
+            """ one transaction """
+            with self.arbiter.transaction(address, priority):
+                self.order.append(name)
+        thread = threading.Thread(target=use_bus)
+        thread.start()
+        self.threads.append(thread)
+        self.wait_for_queue(len(self.threads))
+
+    def test_owner_can_nest_transactions(self,):
+        with self.arbiter.transaction(MATRIX):
+            with self.arbiter.transaction(MATRIX):
+                self.assertEqual(self.arbiter.depth, 2)
+        self.assertIsNone(self.arbiter.owner)
+        self.assertEqual(self.arbiter.statistics()["transactions"], 1)
+
+    def test_alarm_goes_first_then_arrival_order(self,):
+        self.arbiter.acquire(MATRIX)
+        self.queue('background', CLOCK, BACKGROUND_PRIORITY)
+        self.queue('clock', CLOCK, NORMAL_PRIORITY)
+        self.queue('alarm', CLOCK, ALARM_PRIORITY)
+        self.queue('second clock', CLOCK, NORMAL_PRIORITY)
+        self.arbiter.release()
+        self.tearDown()
+        self.assertEqual(self.order, ['alarm', 'clock', 'second clock', 'background'])
+        self.assertEqual(self.arbiter.statistics()["contended"], 4)
+
+    def test_same_device_is_batched_within_a_priority(self,):
+        self.arbiter.acquire(MATRIX)
+        self.queue('clock', CLOCK, NORMAL_PRIORITY)
+        self.queue('matrix', MATRIX, NORMAL_PRIORITY)
+        self.arbiter.release()
+        self.tearDown()
+        self.assertEqual(self.order, ['matrix', 'clock'])
+
+    def test_frame_writes_are_one_transaction(self,):
+        recorder = I2CTransactionRecorder()
+        matrix = self.arbiter.attach(SimulatedMatrix8x8(MATRIX, recorder))
+        with self.arbiter.transaction(MATRIX):
+            matrix.write_display()
+        self.assertEqual(self.arbiter.statistics()["devices"], {MATRIX: 1})
+        self.assertEqual(recorder.count(MATRIX), 16)
+
+if __name__ == '__main__':
+    unittest.main()
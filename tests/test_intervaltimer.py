@@ -0,0 +1,63 @@
+""" IntervalTimer daily events stepped through a simulated day """
+
+import datetime
+import unittest
+
+from pkg_classes.intervaltimer import IntervalTimer
+from pkg_classes.simulatedruntime import SimulatedRuntime
+from pkg_classes.timesource import VirtualTime
+
+START = datetime.datetime(2026, 10, 18)
+
+HOUR = 3600
+
+class Lamp:
+    """ a registered device recording the local time of each call """
+
+    def __init__(self, time_source):
+        self.time_source = time_source
+        self.calls = []
+
+    def switch(self, value):
+        """ note the call """
+        self.calls.append((self.time_source.now().strftime('%H:%M'), value))
+
+class IntervalTimerTest(unittest.TestCase):
+    """ the timer on a SimulatedRuntime without any LED devices """
+
+    def setUp(self,):
+        self.time = VirtualTime(START)
+        self.runtime = SimulatedRuntime(self.time)
+        self.timer = IntervalTimer(None, None, time_source=self.time)
+        self.lamp = Lamp(self.time)
+        self.timer.register("lamp", self.lamp)
+        self.runtime.add_interval_timer(self.timer)
+
+    def test_lights_follow_day_and_night(self,):
+        self.assertFalse(self.timer.lights_are_on)
+        self.runtime.run_for(6 * HOUR)
+        self.assertTrue(self.timer.lights_are_on)
+        self.runtime.run_for(15 * HOUR)
+        self.assertFalse(self.timer.lights_are_on)
+
+    def test_events_repeat_every_day(self,):
+        self.timer.add_event("07:30", "lamp", "switch", "on")
+        self.timer.add_event("07:30", "lamp", "switch", "early", offset=-15)
+        self.runtime.run_for(48 * HOUR)
+        # the event in effect since yesterday is applied at once
+        self.assertEqual(self.lamp.calls,
+                         [('00:00', 'on')] + [('07:15', 'early'), ('07:30', 'on')] * 2)
+
+    def test_event_added_while_sleeping_is_not_missed(self,):
+        self.runtime.run_for(HOUR)
+        self.runtime.call_later(60, self.timer.add_event, "01:30", "lamp", "switch", "off")
+        self.runtime.call_later(60, self.timer.add_event, "01:45", "lamp", "switch", "on")
+        self.runtime.run_for(HOUR)
+        self.assertEqual(self.lamp.calls, [('01:01', 'on'), ('01:30', 'off'), ('01:45', 'on')])
+
+    def test_sun_events_need_a_location(self,):
+        with self.assertRaises(ValueError):
+            self.timer.add_event("sunset", "lamp", "switch", "on")
+
+if __name__ == '__main__':
+    unittest.main()
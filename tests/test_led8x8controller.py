@@ -0,0 +1,112 @@
+""" ModeController playlist rotation and the Led8x8Controller display loop body """
+
+import datetime
+import unittest
+
+from pkg_classes.led8x8controller import Led8x8Controller, ModeController, PlaylistEntry
+from pkg_classes.led8x8controller import DEMO_STATE, IDLE_STATE, SECURITY_STATE
+from pkg_classes.led8x8controller import FIBONACCI_MODE, WOPR_MODE, LIFE_MODE, FIRE_MODE
+from pkg_classes.simulatedbackpack import SimulatedMatrix8x8
+from pkg_classes.timesource import VirtualTime
+
+START = datetime.datetime(2026, 10, 18)
+
+PLAYLIST = (
+    PlaylistEntry(FIBONACCI_MODE, 10.0, 3),
+    PlaylistEntry(WOPR_MODE, 20.0, None),
+    PlaylistEntry(LIFE_MODE, 30.0, 9)
+)
+
+class ModeControllerTest(unittest.TestCase):
+    """ the rotation timer on VirtualTime """
+
+    def setUp(self,):
+        self.time = VirtualTime(START)
+        self.started = []
+        self.modes = ModeController(PLAYLIST, self.started.append, self.time)
+
+    def advance(self, seconds):
+        """ move time on and fire the rotation when due """
+        self.time.advance(seconds)
+        self.modes.evaluate()
+
+    def test_playlist_rotates_in_demo(self,):
+        self.advance(10.0)
+        self.assertEqual(self.modes.get_mode(), WOPR_MODE)
+        self.advance(20.0)
+        self.assertEqual(self.modes.get_mode(), LIFE_MODE)
+        self.advance(30.0)
+        self.assertEqual(self.modes.get_mode(), FIBONACCI_MODE)
+        self.assertEqual([entry.mode for entry in self.started],
+                         [WOPR_MODE, LIFE_MODE, FIBONACCI_MODE])
+
+    def test_rotation_is_held_outside_demo(self,):
+        self.advance(4.0)
+        self.modes.set_state(IDLE_STATE)
+        self.advance(100.0)
+        self.assertEqual(self.modes.get_mode(), FIBONACCI_MODE)
+        self.modes.set_state(SECURITY_STATE)
+        self.modes.set_state(DEMO_STATE)
+        # the six seconds left when demo was left
+        self.advance(5.0)
+        self.assertEqual(self.modes.get_mode(), FIBONACCI_MODE)
+        self.advance(1.0)
+        self.assertEqual(self.modes.get_mode(), WOPR_MODE)
+
+    def test_alarm_ignores_modes_until_restored(self,):
+        self.modes.set_mode(WOPR_MODE)
+        self.modes.set_mode(FIRE_MODE)
+        self.assertFalse(self.modes.set_mode(LIFE_MODE))
+        self.advance(60.0)
+        self.assertEqual(self.modes.get_mode(), FIRE_MODE)
+        self.modes.restore_mode()
+        self.assertEqual(self.modes.get_mode(), WOPR_MODE)
+
+class Led8x8ControllerTest(unittest.TestCase):
+    """ frame() as the display thread calls it, waiting on VirtualTime """
+
+    def setUp(self,):
+        self.time = VirtualTime(START)
+        self.matrix = SimulatedMatrix8x8()
+        self.controller = Led8x8Controller(self.matrix, playlist=PLAYLIST,
+                                           time_source=self.time)
+        self.scheduler = self.controller.scheduler
+
+    def loop(self, frames, interrupted=False):
+        """ run the display loop for a number of frames """
+        for _ in range(frames):
+            interrupted = self.scheduler.wait(self.controller.frame(interrupted))
+        return interrupted
+
+    def test_first_playlist_brightness_applies_at_construction(self,):
+        self.assertEqual(self.matrix.brightness, 3)
+
+    def test_frames_are_rendered_and_flushed(self,):
+        self.loop(5)
+        self.assertEqual(self.scheduler.frames, 5)
+        self.assertNotEqual(self.matrix.render(), '\n'.join(['........'] * 8))
+
+    def test_alarm_latency_is_measured_at_the_first_alarm_frame(self,):
+        interrupted = self.loop(3)
+        self.controller.set_mode(FIRE_MODE)
+        self.assertEqual(self.scheduler.measured, 0)
+        self.loop(3, interrupted)
+        self.assertEqual(self.scheduler.preemptions, 1)
+        self.assertEqual(self.scheduler.measured, 1)
+        # the alarm frame is shown without waiting out the frame period
+        self.assertEqual(self.scheduler.latencies[-1], 0.0)
+        self.assertEqual(self.controller.selected_name, "fire")
+
+    def test_motion_wakes_only_the_motion_display(self,):
+        self.loop(2)
+        self.controller.update_motion("diy/main/living/motion")
+        self.assertFalse(self.scheduler.wakeup.is_set())
+        self.controller.set_state(SECURITY_STATE)
+        interrupted = self.loop(2)
+        self.controller.update_motion("diy/upper/study/motion")
+        self.assertTrue(self.scheduler.wakeup.is_set())
+        self.loop(2, interrupted)
+        self.assertEqual(self.scheduler.preemptions, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+""" Led8x8Framebuffer drawing and flushing, and patterns drawing into it """
+
+import unittest
+
+from pkg_classes.led8x8framebuffer import Led8x8Framebuffer, GREEN, RED, YELLOW
+from pkg_classes.led8x8idle import Led8x8Idle
+from pkg_classes.simulatedbackpack import I2CTransactionRecorder, SimulatedMatrix8x8
+
+class Led8x8FramebufferTest(unittest.TestCase):
+    """ the buffer and the writes it makes """
+
+    def setUp(self,):
+        self.recorder = I2CTransactionRecorder()
+        self.matrix = SimulatedMatrix8x8(0x70, self.recorder)
+        self.framebuffer = Led8x8Framebuffer(self.matrix)
+
+    def test_pixels_use_the_matrix_colors(self,):
+        self.framebuffer.set_pixel(0, 0, GREEN)
+        self.framebuffer.set_pixel(7, 1, RED)
+        self.framebuffer.set_pixel(3, 7, YELLOW)
+        self.framebuffer.set_pixel(8, 0, RED)
+        self.framebuffer.flush()
+        self.assertEqual(self.matrix.render().splitlines(),
+                         ['G.......', '.......R', '........', '........',
+                          '........', '........', '........', '...Y....'])
+
+    def test_unchanged_frame_is_not_written(self,):
+        self.framebuffer.fill(GREEN)
+        self.assertTrue(self.framebuffer.flush())
+        writes = self.recorder.count()
+        self.framebuffer.set_row(0, 0xFF, 0x00)
+        self.assertFalse(self.framebuffer.flush())
+        self.assertEqual(self.recorder.count(), writes)
+        self.assertEqual((self.framebuffer.frames_written, self.framebuffer.frames_skipped),
+                         (1, 1))
+
+    def test_invalidate_writes_the_same_frame_again(self,):
+        self.framebuffer.clear()
+        self.framebuffer.flush()
+        self.framebuffer.invalidate()
+        self.assertTrue(self.framebuffer.flush())
+
+class PatternFramebufferTest(unittest.TestCase):
+    """ who writes a pattern's frames """
+
+    def setUp(self,):
+        self.matrix = SimulatedMatrix8x8()
+
+    def test_pattern_on_its_own_writes_its_frames(self,):
+        idle = Led8x8Idle(self.matrix)
+        idle.display()
+        self.assertTrue(idle.owns_framebuffer)
+        self.assertIn('G', self.matrix.render())
+
+    def test_shared_framebuffer_is_left_to_the_controller(self,):
+        framebuffer = Led8x8Framebuffer(self.matrix)
+        idle = Led8x8Idle(self.matrix, framebuffer=framebuffer)
+        idle.display()
+        self.assertFalse(idle.owns_framebuffer)
+        self.assertNotIn('G', self.matrix.render())
+        framebuffer.flush()
+        self.assertIn('G', self.matrix.render())
+
+if __name__ == '__main__':
+    unittest.main()
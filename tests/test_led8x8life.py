@@ -0,0 +1,57 @@
+""" Led8x8Life bitboard generations and age colors """
+
+import unittest
+
+from pkg_classes.led8x8life import Led8x8Life, GREEN, YELLOW, RED
+from pkg_classes.simulatedbackpack import SimulatedMatrix8x8
+
+BLINKER = [(3, 2), (3, 3), (3, 4)]
+
+GLIDER = [(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)]
+
+BLOCK = [(2, 2), (3, 2), (2, 3), (3, 3)]
+
+def cells(board):
+    """ return the set of live (x, y) cells of a board """
+    return {(bit % 8, bit // 8) for bit in range(64) if board >> bit & 1}
+
+class Led8x8LifeTest(unittest.TestCase):
+    """ the bit sliced generation against known patterns """
+
+    def setUp(self,):
+        self.matrix = SimulatedMatrix8x8()
+        self.life = Led8x8Life(self.matrix)
+
+    def test_blinker_oscillates(self,):
+        self.life.load(BLINKER)
+        self.life.age()
+        self.assertEqual(cells(self.life.board), {(2, 3), (3, 3), (4, 3)})
+        self.life.age()
+        self.assertEqual(cells(self.life.board), set(BLINKER))
+
+    def test_glider_wraps_around_the_torus(self,):
+        self.life.load(GLIDER)
+        for _ in range(4 * 8):
+            self.life.age()
+        # a glider moves one cell diagonally every 4 generations
+        self.assertEqual(cells(self.life.board), set(GLIDER))
+        self.life.load(GLIDER)
+        for _ in range(4 * 7):
+            self.life.age()
+        self.assertEqual(cells(self.life.board),
+                         {((x + 7) % 8, (y + 7) % 8) for x, y in GLIDER})
+
+    def test_block_ages_from_green_to_red(self,):
+        self.life.load(BLOCK)
+        colors = []
+        for _ in range(6):
+            self.life.draw()
+            self.life.framebuffer.flush()
+            colors.append(self.matrix.get_pixel(2, 2))
+            self.life.age()
+        self.assertEqual(cells(self.life.board), set(BLOCK))
+        self.assertEqual(colors, [GREEN, YELLOW, YELLOW, YELLOW, RED, RED])
+        self.assertEqual(self.matrix.get_pixel(0, 0), 0)
+
+if __name__ == '__main__':
+    unittest.main()
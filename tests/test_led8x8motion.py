@@ -0,0 +1,96 @@
+""" Led8x8Motion color bands and band change deadlines on VirtualTime """
+
+import unittest
+
+from pkg_classes.led8x8motion import (BLACK, GREEN, IDLE_PERIOD_SECONDS, RED,
+                                      YELLOW, Led8x8Motion)
+from pkg_classes.roommap import RoomMap
+from pkg_classes.simulatedbackpack import SimulatedMatrix8x8
+from pkg_classes.timesource import VirtualTime
+
+CONFIG = {
+    "areas": {
+        "front": {"size": 2, "row": 0, "column": 0},
+        "garage": {"size": 2, "row": 4, "column": 4}
+    },
+    "topics": {
+        "diy/perimeter/front/motion": "front",
+        "diy/perimeter/garage/motion": "garage"
+    }
+}
+
+class Led8x8MotionTest(unittest.TestCase):
+    """ one pattern drawing into its own framebuffer """
+
+    def setUp(self,):
+        self.time = VirtualTime(100.0)
+        self.matrix = SimulatedMatrix8x8()
+        rooms = RoomMap(None)
+        rooms.configure(CONFIG)
+        self.motion = Led8x8Motion(self.matrix, rooms=rooms, time_source=self.time)
+        self.front = rooms.areas['front']
+        self.garage = rooms.areas['garage']
+        # the reset shows every room for a while, let it run out
+        self.motion.display()
+        self.time.advance(10.0)
+        self.motion.display()
+
+    def at(self, seconds):
+        """ show the frame seconds after the first motion at 110 """
+        self.time.advance_to(110.0 + seconds)
+        self.motion.display()
+
+    def test_reset_shows_green_then_clears(self,):
+        self.assertEqual(self.front.band, BLACK)
+        self.assertEqual(self.motion.motions, 0)
+        self.assertEqual(self.motion.frame_period, IDLE_PERIOD_SECONDS)
+        self.assertEqual(self.matrix.render(), '\n'.join(['........'] * 8))
+
+    def test_bands_follow_the_occupancy(self,):
+        self.assertTrue(self.motion.motion_detected('diy/perimeter/front/motion'))
+        self.at(0.0)
+        self.assertEqual(self.front.band, RED)
+        self.assertEqual(self.garage.band, BLACK)
+        self.assertEqual(self.motion.motions, 1)
+        self.assertEqual(self.matrix.get_pixel(0, 0), RED)
+        # sleeps until the red band ends
+        self.assertEqual(self.motion.frame_period, 10.0)
+        self.at(10.0)
+        self.assertEqual(self.front.band, YELLOW)
+        self.assertEqual(self.matrix.get_pixel(0, 1), YELLOW)
+        self.assertEqual(self.motion.frame_period, 20.0)
+        self.at(30.0)
+        self.assertEqual(self.front.band, GREEN)
+        self.assertEqual(self.motion.frame_period, 30.0)
+        self.at(60.0)
+        self.assertEqual(self.front.band, BLACK)
+        self.assertEqual(self.motion.motions, 0)
+        self.assertEqual(self.matrix.get_pixel(0, 0), BLACK)
+        self.assertEqual(self.motion.frame_period, IDLE_PERIOD_SECONDS)
+
+    def test_new_motion_restarts_the_occupancy(self,):
+        self.motion.motion_detected('diy/perimeter/front/motion')
+        self.at(0.0)
+        self.at(25.0)
+        self.assertEqual(self.front.band, YELLOW)
+        self.motion.motion_detected('diy/perimeter/front/motion')
+        self.motion.motion_detected('diy/perimeter/garage/motion')
+        self.at(26.0)
+        self.assertEqual(self.front.band, RED)
+        self.assertEqual(self.garage.band, RED)
+        self.assertEqual(self.motion.motions, 2)
+        # the green deadline of the first motion still wakes the pattern, stale
+        self.assertEqual(self.motion.frame_period, 4.0)
+        self.at(30.0)
+        self.assertEqual(self.front.band, RED)
+        self.assertEqual(self.motion.frame_period, 5.0)
+        self.at(35.0)
+        self.assertEqual(self.front.band, YELLOW)
+
+    def test_unknown_topic_changes_nothing(self,):
+        self.assertFalse(self.motion.motion_detected('diy/upper/study/motion'))
+        self.at(0.0)
+        self.assertEqual(self.motion.motions, 0)
+
+if __name__ == '__main__':
+    unittest.main()
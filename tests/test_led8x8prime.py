@@ -0,0 +1,50 @@
+""" Led8x8Prime sieving and the frames of wide primes on chained matrices """
+
+import unittest
+
+from pkg_classes.led8x8framebuffer import Led8x8Framebuffer
+from pkg_classes.led8x8prime import Led8x8Prime, sieve, sieve_segment, SEGMENT_SIZE
+from pkg_classes.simulatedbackpack import SimulatedMatrix8x8
+
+def is_prime(number):
+    """ trial division """
+    return number > 1 and all(number % divisor for divisor in range(2, int(number ** 0.5) + 1))
+
+class SieveTest(unittest.TestCase):
+    """ the segmented sieve against trial division """
+
+    def test_sieve(self,):
+        self.assertEqual(list(sieve(50)), [number for number in range(50) if is_prime(number)])
+
+    def test_segment(self,):
+        base = sieve(SEGMENT_SIZE)
+        start = 3 * SEGMENT_SIZE
+        self.assertEqual(list(sieve_segment(start, start + SEGMENT_SIZE, base)),
+                         [number for number in range(start, start + SEGMENT_SIZE)
+                          if is_prime(number)])
+
+class Led8x8PrimeTest(unittest.TestCase):
+    """ primes shown one column at a time """
+
+    def test_width_needs_a_framebuffer_per_byte(self,):
+        with self.assertRaises(ValueError):
+            Led8x8Prime(SimulatedMatrix8x8(), width=16)
+        with self.assertRaises(ValueError):
+            Led8x8Prime(SimulatedMatrix8x8(), width=12)
+
+    def test_wide_primes_write_every_chained_matrix(self,):
+        matrices = [SimulatedMatrix8x8(address) for address in (0x70, 0x72)]
+        chained = Led8x8Framebuffer(matrices[1])
+        prime = Led8x8Prime(matrices[0], width=16, chain=(chained,))
+        prime.reset()
+        blank = '\n'.join(['........'] * 8)
+        # the primes from 3 to 251 fit in the first byte
+        for _ in range(53):
+            prime.display()
+        self.assertEqual(matrices[1].render(), blank)
+        prime.display()
+        self.assertEqual(prime.primes[prime.index], 257)
+        self.assertNotEqual(matrices[1].render(), blank)
+
+if __name__ == '__main__':
+    unittest.main()
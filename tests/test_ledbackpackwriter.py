@@ -0,0 +1,66 @@
+""" LedBackpackWriter dirty row runs and the full write fallback """
+
+import unittest
+
+from pkg_classes.ledbackpackwriter import LedBackpackWriter
+from pkg_classes.simulatedbackpack import I2CTransactionRecorder, SimulatedMatrix8x8
+
+def frame_with(rows):
+    """ a blank frame with the green byte of some rows set """
+    frame = bytearray(16)
+    for row in rows:
+        frame[2 * row] = 0xFF
+    return frame
+
+class LedBackpackWriterTest(unittest.TestCase):
+    """ the writes reaching the simulated bus """
+
+    def setUp(self,):
+        self.recorder = I2CTransactionRecorder()
+        self.matrix = SimulatedMatrix8x8(0x70, self.recorder)
+        self.writer = LedBackpackWriter(self.matrix)
+        self.writer.write(bytes(16))
+        self.recorder.clear()
+
+    def writes(self,):
+        """ the (register, size) of each write since the last call """
+        writes = [(transaction.register, transaction.size)
+                  for transaction in self.recorder.transactions]
+        self.recorder.clear()
+        return writes
+
+    def test_first_write_is_full(self,):
+        writer = LedBackpackWriter(self.matrix)
+        self.assertEqual(writer.write(bytes(16)), 1)
+        self.assertEqual(self.writes(), [(0, 16)])
+        self.assertEqual(writer.full_writes, 1)
+
+    def test_unchanged_frame_is_not_written(self,):
+        self.assertEqual(self.writer.write(bytes(16)), 0)
+        self.assertEqual(self.writes(), [])
+
+    def test_distant_rows_are_separate_runs(self,):
+        self.assertEqual(self.writer.dirty_runs(frame_with((1, 6))), [[1, 2], [6, 7]])
+        self.assertEqual(self.writer.write(frame_with((1, 6))), 2)
+        self.assertEqual(self.writes(), [(2, 2), (12, 2)])
+        self.assertEqual(self.matrix.buffer, frame_with((1, 6)))
+
+    def test_a_one_row_gap_is_merged(self,):
+        # rewriting the unchanged row costs no more than another transaction
+        self.assertEqual(self.writer.dirty_runs(frame_with((2, 4))), [[2, 5]])
+        self.writer.write(frame_with((2, 4)))
+        self.assertEqual(self.writes(), [(4, 6)])
+
+    def test_partial_writes_costing_as_much_fall_back_to_a_full_write(self,):
+        self.writer.write(frame_with((0, 2, 4, 6, 7)))
+        self.assertEqual(self.writes(), [(0, 16)])
+        self.assertEqual(self.writer.full_writes, 2)
+        self.assertEqual(self.writer.partial_writes, 0)
+
+    def test_invalidate_writes_everything(self,):
+        self.writer.invalidate()
+        self.writer.write(bytes(16))
+        self.assertEqual(self.writes(), [(0, 16)])
+
+if __name__ == '__main__':
+    unittest.main()
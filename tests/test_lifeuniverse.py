@@ -0,0 +1,69 @@
+""" LifeUniverse busy tiles and the ageing of settled still lifes """
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+GLIDER = [(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)]
+
+BLOCK = [(0, 0), (1, 0), (0, 1), (1, 1)]
+
+@unittest.skipIf(numpy is None, 'the large world needs numpy')
+class LifeUniverseTest(unittest.TestCase):
+    """ tiled and whole world steps on a 64x64 torus """
+
+    def setUp(self,):
+        #pylint: disable=import-outside-toplevel
+        from pkg_classes.lifeuniverse import LifeUniverse, OLDEST_AGE
+        self.universe = LifeUniverse(64)
+        self.oldest = OLDEST_AGE
+
+    def test_size_is_checked(self,):
+        #pylint: disable=import-outside-toplevel
+        from pkg_classes.lifeuniverse import LifeUniverse
+        with self.assertRaises(ValueError):
+            LifeUniverse(72)
+
+    def test_glider_crosses_tiles_and_the_edge(self,):
+        self.universe.place(GLIDER, 60, 60)
+        for _ in range(4 * 16):
+            self.universe.step()
+        # 16 cells diagonally from (60, 60) wraps to (12, 12)
+        live = set(zip(*numpy.nonzero(self.universe.cells)))
+        self.assertEqual(live, {((y + 12) % 64, (x + 12) % 64) for x, y in GLIDER})
+        self.assertFalse(self.universe.is_quiet())
+
+    def test_still_life_keeps_ageing_once_quiet(self,):
+        self.universe.place(BLOCK, 30, 30)
+        ages = []
+        for _ in range(self.oldest + 1):
+            self.universe.step()
+            ages.append(int(self.universe.ages[30, 30]))
+        self.assertTrue(self.universe.is_quiet())
+        self.assertEqual(ages, [2, 3, 4, 5, 5, 5])
+
+    def test_dense_world_ages_every_cell_once(self,):
+        self.universe.place(BLOCK, 30, 30)
+        # busy tiles everywhere take the whole world path
+        for row in range(0, 64, 16):
+            for column in range(0, 64, 16):
+                self.universe.place([(0, 0), (1, 0), (2, 0)], column + 6, row + 8)
+        for _ in range(3):
+            self.universe.step()
+        self.assertEqual(int(self.universe.ages[30, 30]), 4)
+
+    def test_viewport_colors_new_and_old_cells(self,):
+        self.universe.place(BLOCK, 0, 0)
+        frame = self.universe.viewport(0, 0)
+        # green plane then red plane for each row, newborn cells are green only
+        self.assertEqual(frame[0:2], bytes((0x03, 0x00)))
+        for _ in range(self.oldest):
+            self.universe.step()
+        frame = self.universe.viewport(0, 0)
+        self.assertEqual(frame[0:2], bytes((0x00, 0x03)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+""" configure_logging loads one logging file, the first one that exists """
+
+import os
+import logging
+import tempfile
+import unittest
+
+from pkg_classes import logconfig
+
+LOGGING_INI = """
+[loggers]
+keys=root
+
+[handlers]
+keys=null
+
+[formatters]
+keys=
+
+[logger_root]
+level=INFO
+handlers=null
+
+[handler_null]
+class=NullHandler
+args=()
+"""
+
+class ConfigureLoggingTest(unittest.TestCase):
+    """ configure_logging with the root logger restored afterwards """
+
+    def setUp(self,):
+        root = logging.getLogger()
+        self.saved = (dict(logconfig.CONFIGURED), list(root.handlers), root.level)
+        logconfig.CONFIGURED.update({"path": None, "done": False})
+        descriptor, self.path = tempfile.mkstemp(suffix='.ini')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as ini:
+            ini.write(LOGGING_INI)
+
+    def tearDown(self,):
+        os.remove(self.path)
+        configured, handlers, level = self.saved
+        logconfig.CONFIGURED.update(configured)
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+
+    def test_missing_file_leaves_logging_unconfigured(self,):
+        self.assertFalse(logconfig.configure_logging(self.path + '.missing'))
+        self.assertIsNone(logconfig.logging_configured())
+        self.assertTrue(logconfig.configure_logging(self.path, queued=False))
+        self.assertEqual(logconfig.logging_configured(), self.path)
+
+    def test_first_configuration_wins(self,):
+        self.assertTrue(logconfig.configure_logging(self.path, queued=False))
+        self.assertFalse(logconfig.configure_logging(self.path, queued=False))
+        self.assertTrue(logconfig.configure_logging(self.path, force=True, queued=False))
+
+if __name__ == '__main__':
+    unittest.main()
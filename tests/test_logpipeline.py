@@ -0,0 +1,86 @@
+""" RepeatFilter summaries and the QueuedHandler that drops when full """
+
+import time
+import queue
+import logging
+import unittest
+
+from pkg_classes.logpipeline import LogListener, QueuedHandler, RepeatFilter
+
+def make_record(level=logging.ERROR, lineno=10, created=1000.0, msg="I2C write failed"):
+    """ a record from one logging call """
+    record = logging.makeLogRecord({
+        "name": "pkg_classes.ledclock", "levelno": level,
+        "levelname": logging.getLevelName(level), "pathname": "ledclock.py",
+        "lineno": lineno, "msg": msg})
+    record.created = created
+    return record
+
+class RepeatFilterTest(unittest.TestCase):
+    """ the filter with explicit times """
+
+    def setUp(self,):
+        self.repeats = RepeatFilter(interval=60.0)
+
+    def test_first_record_passes_repeats_are_counted(self,):
+        self.assertTrue(self.repeats.filter(make_record()))
+        for second in range(1, 4):
+            self.assertFalse(self.repeats.filter(make_record(created=1000.0 + second)))
+        self.assertEqual(self.repeats.suppressed, 3)
+
+    def test_other_calls_and_levels_pass(self,):
+        self.assertTrue(self.repeats.filter(make_record()))
+        self.assertTrue(self.repeats.filter(make_record(lineno=11)))
+        self.assertTrue(self.repeats.filter(make_record(level=logging.INFO)))
+        self.assertTrue(self.repeats.filter(make_record(level=logging.INFO)))
+        self.assertEqual(self.repeats.suppressed, 0)
+
+    def test_summary_once_the_interval_is_over(self,):
+        self.repeats.filter(make_record())
+        self.repeats.filter(make_record(created=1001.0))
+        self.repeats.filter(make_record(created=1002.0))
+        self.assertEqual(self.repeats.summaries(now=1030.0), [])
+        summaries = self.repeats.summaries(now=1060.0)
+        self.assertEqual(len(summaries), 1)
+        self.assertEqual(summaries[0].levelno, logging.ERROR)
+        self.assertEqual(summaries[0].getMessage(),
+                         "I2C write failed repeated 2 times in 60.0 seconds")
+        # the run is over, the next record starts a new one
+        self.assertTrue(self.repeats.filter(make_record(created=1061.0)))
+
+    def test_no_summary_without_repeats(self,):
+        self.repeats.filter(make_record())
+        self.assertEqual(self.repeats.summaries(now=2000.0), [])
+        self.assertEqual(self.repeats.seen, {})
+
+class QueuedHandlerTest(unittest.TestCase):
+    """ the handler on a small queue nobody empties """
+
+    def test_full_queue_drops_records(self,):
+        records = queue.Queue(2)
+        handler = QueuedHandler(records)
+        for lineno in range(5):
+            handler.handle(make_record(lineno=lineno))
+        self.assertEqual(records.qsize(), 2)
+        self.assertEqual(handler.dropped, 3)
+
+    def test_listener_handles_queued_records_and_summaries(self,):
+        records = queue.Queue(8)
+        repeats = RepeatFilter(interval=60.0)
+        handler = QueuedHandler(records)
+        handler.addFilter(repeats)
+        # records from now, so only stop() finds their interval over
+        for _ in range(3):
+            handler.handle(make_record(created=time.time()))
+        collected = []
+        target = logging.Handler()
+        target.emit = collected.append
+        listener = LogListener(records, [target], repeats)
+        listener.start()
+        listener.stop()
+        self.assertEqual([record.getMessage() for record in collected],
+                         ["I2C write failed", "I2C write failed repeated 2 times in inf seconds"])
+        self.assertEqual(listener.handled, 2)
+
+if __name__ == '__main__':
+    unittest.main()
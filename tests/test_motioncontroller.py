@@ -0,0 +1,120 @@
+""" MotionController debounce and hysteresis with a fake GPIO on VirtualTime """
+
+import sys
+import types
+import unittest
+from unittest import mock
+
+from pkg_classes.timesource import VirtualTime
+
+def fake_gpio_module():
+    """ a stand in for Adafruit_GPIO to import the module, each test
+        patches GPIO again
+    """
+    module = types.ModuleType('Adafruit_GPIO')
+    module.GPIO = types.SimpleNamespace()
+    return module
+
+try:
+    from pkg_classes import motioncontroller
+except ImportError:
+    with mock.patch.dict(sys.modules, {'Adafruit_GPIO': fake_gpio_module()}):
+        from pkg_classes import motioncontroller
+
+PIR = 17
+
+class FakePins:
+    """ input levels set by the test, interrupts delivered by hand """
+
+    def __init__(self,):
+        self.levels = {}
+
+    def setup(self, pin, _mode, pull_up_down=None):
+        """ every pin starts low """
+        #pylint: disable=unused-argument
+        self.levels[pin] = 0
+
+    def input(self, pin):
+        """ the level set by the test """
+        return self.levels[pin]
+
+    def add_event_detect(self, pin, edge, callback=None):
+        """ interrupts are called by the test """
+
+class MotionControllerTest(unittest.TestCase):
+    """ edges at chosen times on one pin """
+
+    def setUp(self,):
+        self.pins = FakePins()
+        self.time = VirtualTime(100.0)
+        gpio = types.SimpleNamespace(IN=1, PUD_DOWN=21, BOTH=33,
+                                     get_platform_gpio=lambda: self.pins)
+        patch = mock.patch.object(motioncontroller, 'GPIO', gpio)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.motion = motioncontroller.MotionController(PIR, capacity=4, debounce=0.05,
+                                                        hysteresis=2.0, time_source=self.time)
+
+    def at(self, seconds):
+        """ move time on to a moment of the test """
+        self.time.advance_to(seconds)
+
+    def edge(self, level, seconds):
+        """ the pin changes level at a time """
+        self.at(seconds)
+        self.pins.levels[PIR] = level
+        self.motion.pir_interrupt_handler(PIR)
+
+    def test_bounce_is_filtered(self,):
+        self.edge(1, 100.00)
+        self.edge(0, 100.01)
+        self.edge(1, 100.02)
+        self.edge(0, 100.03)
+        self.at(101.0)
+        self.assertFalse(self.motion.detected())
+        # each return to the reported level drops the edge waiting to settle
+        self.assertEqual(self.motion.statistics()["filtered"], 2)
+
+    def test_motion_is_reported_once_it_settles(self,):
+        self.edge(1, 100.0)
+        self.at(100.04)
+        self.assertFalse(self.motion.detected())
+        self.assertAlmostEqual(self.motion.next_deadline(), 0.01)
+        self.at(100.05)
+        self.assertEqual(self.motion.get_motions(),
+                         [motioncontroller.MotionEvent(100.0, PIR, 1)])
+
+    def test_end_of_motion_waits_for_the_hysteresis(self,):
+        self.edge(1, 100.0)
+        self.edge(0, 101.0)
+        # motion back within the hysteresis cancels the end
+        self.edge(1, 102.0)
+        self.edge(0, 105.0)
+        self.at(106.9)
+        self.assertEqual([event.state for event in self.motion.get_motions()], [1])
+        self.at(107.0)
+        self.assertEqual(self.motion.get_motions(),
+                         [motioncontroller.MotionEvent(105.0, PIR, 0)])
+
+    def test_settled_edge_is_reported_before_the_next_one(self,):
+        self.edge(1, 100.0)
+        self.edge(0, 100.1)
+        self.edge(1, 103.0)
+        self.at(104.0)
+        self.assertEqual([event.state for event in self.motion.get_motions()], [1, 0, 1])
+        self.assertEqual(self.motion.statistics()["filtered"], 0)
+
+    def test_full_buffer_drops_the_oldest(self,):
+        start = 100.0
+        for _ in range(3):
+            self.edge(1, start)
+            self.edge(0, start + 1.0)
+            start += 4.0
+        self.at(start)
+        events = self.motion.get_motions()
+        self.assertEqual(len(events), 4)
+        self.assertEqual(events[0].timestamp, 104.0)
+        self.assertEqual(self.motion.statistics()["dropped"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
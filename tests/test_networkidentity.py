@@ -0,0 +1,49 @@
+""" NetworkIdentity change detection with a scripted lookup """
+
+import unittest
+
+from pkg_classes.networkidentity import NetworkIdentity
+
+class NetworkIdentityTest(unittest.TestCase):
+    """ refresh() without the thread """
+
+    def setUp(self,):
+        self.answer = ('clock', ('192.0.2.10',))
+        self.identity = NetworkIdentity(lookup=lambda: self.answer)
+
+    def test_unresolved_until_the_first_refresh(self,):
+        self.assertEqual(self.identity.snapshot(), (0, None, ()))
+        self.assertFalse(self.identity.resolved.is_set())
+        self.assertTrue(self.identity.refresh())
+        self.assertTrue(self.identity.resolved.is_set())
+        self.assertEqual(self.identity.snapshot(), (1, 'clock', ('192.0.2.10',)))
+
+    def test_version_only_changes_with_the_identity(self,):
+        self.identity.refresh()
+        self.assertFalse(self.identity.refresh())
+        self.assertEqual(self.identity.version, 1)
+        self.answer = ('clock', ('192.0.2.10', '198.51.100.7'))
+        self.assertTrue(self.identity.refresh())
+        self.answer = ('kitchen', ('192.0.2.10', '198.51.100.7'))
+        self.assertTrue(self.identity.refresh())
+        self.assertEqual(self.identity.snapshot(),
+                         (3, 'kitchen', ('192.0.2.10', '198.51.100.7')))
+
+    def test_failed_lookup_keeps_the_last_identity(self,):
+        self.identity.refresh()
+
+        def failing():
+            raise OSError('network is down')
+        self.identity.lookup = failing
+        with self.assertLogs('pkg_classes.networkidentity', 'ERROR'):
+            self.assertFalse(self.identity.refresh())
+        self.assertEqual(self.identity.snapshot(), (1, 'clock', ('192.0.2.10',)))
+
+    def test_given_name_used_by_the_local_lookup(self,):
+        identity = NetworkIdentity(host_name='porch')
+        host_name, addresses = identity.local_identity()
+        self.assertEqual(host_name, 'porch')
+        self.assertNotIn('127.0.0.1', addresses)
+
+if __name__ == '__main__':
+    unittest.main()
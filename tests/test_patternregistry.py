@@ -0,0 +1,76 @@
+""" PatternRegistry lazy construction and idle release on VirtualTime """
+
+import unittest
+
+from pkg_classes.led8x8framebuffer import Led8x8Framebuffer
+from pkg_classes.patternregistry import PatternRegistry
+from pkg_classes.simulatedbackpack import SimulatedMatrix8x8
+from pkg_classes.timesource import VirtualTime
+
+class Pattern:
+    """ records how it was built """
+
+    def __init__(self, matrix8x8, *args, framebuffer=None, **kwargs):
+        self.matrix = matrix8x8
+        self.args = args
+        self.framebuffer = framebuffer
+        self.kwargs = kwargs
+
+class PatternRegistryTest(unittest.TestCase):
+    """ patterns registered by class and by name """
+
+    def setUp(self,):
+        self.time = VirtualTime(100.0)
+        self.matrix = SimulatedMatrix8x8()
+        self.framebuffer = Led8x8Framebuffer(self.matrix)
+        self.registry = PatternRegistry(self.matrix, self.framebuffer,
+                                        release_seconds=300.0, time_source=self.time)
+        self.registry.register('test', Pattern, 16, speed=2)
+
+    def test_constructed_once_on_first_use(self,):
+        self.assertFalse(self.registry.loaded('test'))
+        pattern = self.registry.get('test')
+        self.assertIs(self.registry.get('test'), pattern)
+        self.assertEqual(self.registry.constructed, 1)
+        self.assertIs(pattern.matrix, self.matrix)
+        self.assertIs(pattern.framebuffer, self.framebuffer)
+        self.assertEqual(pattern.args, (16,))
+        self.assertEqual(pattern.kwargs, {"speed": 2})
+
+    def test_module_target_imported_on_first_use(self,):
+        self.registry.register('idle', '.led8x8idle:Led8x8Idle')
+        self.assertEqual(self.registry.constructed, 0)
+        pattern = self.registry.get('idle')
+        self.assertEqual(type(pattern).__name__, 'Led8x8Idle')
+        self.assertIs(pattern.framebuffer, self.framebuffer)
+
+    def test_idle_patterns_released(self,):
+        first = self.registry.get('test')
+        self.time.advance(200.0)
+        self.registry.release_idle()
+        self.assertTrue(self.registry.loaded('test'))
+        self.time.advance(101.0)
+        self.registry.release_idle()
+        self.assertFalse(self.registry.loaded('test'))
+        self.assertIsNot(self.registry.get('test'), first)
+        self.assertEqual(self.registry.statistics(),
+                         {"registered": 1, "loaded": 1, "constructed": 2, "released": 1})
+
+    def test_kept_and_shown_patterns_stay(self,):
+        self.registry.register('kept', Pattern, keep=True)
+        self.registry.get('kept')
+        self.registry.get('test')
+        self.registry.release_idle(keep=('test',), now=self.time.monotonic() + 1000.0)
+        self.assertTrue(self.registry.loaded('kept'))
+        self.assertTrue(self.registry.loaded('test'))
+
+    def test_touch_restarts_the_idle_time(self,):
+        self.registry.get('test')
+        self.time.advance(250.0)
+        self.registry.touch('test')
+        self.time.advance(250.0)
+        self.registry.release_idle()
+        self.assertTrue(self.registry.loaded('test'))
+
+if __name__ == '__main__':
+    unittest.main()
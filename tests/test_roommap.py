@@ -0,0 +1,73 @@
+""" RoomMap topic rules and the TopicTrie wildcards """
+
+import unittest
+
+from pkg_classes.roommap import RoomMap, TopicTrie
+
+CONFIG = {
+    "areas": {
+        "front": {"size": 2, "row": 0, "column": 3},
+        "garage": {"size": 4, "row": 0, "column": 6},
+        "living": {"size": 4, "row": 3, "column": 6}
+    },
+    "topics": {
+        "diy/perimeter/front/motion": "front",
+        "diy/main/+/motion": ["living"],
+        "diy/perimeter/#": ["front", "garage"]
+    }
+}
+
+class TopicTrieTest(unittest.TestCase):
+    """ MQTT wildcard matching """
+
+    def setUp(self,):
+        self.trie = TopicTrie()
+
+    def test_single_level_matches_one_level(self,):
+        self.trie.insert('a/+/c', 1)
+        self.assertEqual(self.trie.match('a/b/c'), [1])
+        self.assertEqual(self.trie.match('a/b/b/c'), [])
+        self.assertEqual(self.trie.match('a/c'), [])
+
+    def test_multi_level_matches_the_rest_and_the_parent(self,):
+        self.trie.insert('a/#', 2)
+        self.assertEqual(self.trie.match('a/b/c'), [2])
+        self.assertEqual(self.trie.match('a'), [2])
+        self.assertEqual(self.trie.match('b/a'), [])
+
+    def test_multi_level_must_be_last(self,):
+        with self.assertRaises(ValueError):
+            self.trie.insert('a/#/c', 3)
+
+class RoomMapTest(unittest.TestCase):
+    """ exact and wildcard rules together """
+
+    def setUp(self,):
+        self.rooms = RoomMap(None)
+        self.rooms.configure(CONFIG)
+
+    def names(self, topic):
+        """ the area names lit by a topic """
+        return [area.name for area in self.rooms.lookup(topic)]
+
+    def test_exact_and_wildcard_areas_are_listed_once(self,):
+        self.assertEqual(self.names('diy/perimeter/front/motion'), ['front', 'garage'])
+        self.assertEqual(self.names('diy/main/kitchen/motion'), ['living'])
+        self.assertEqual(self.names('diy/upper/study/motion'), [])
+
+    def test_lookup_is_cached_until_a_rule_is_added(self,):
+        self.assertEqual(self.names('diy/upper/study/motion'), [])
+        self.rooms.add_rule('diy/upper/study/motion', 'garage')
+        self.assertEqual(self.names('diy/upper/study/motion'), ['garage'])
+
+    def test_unknown_area_is_an_error(self,):
+        with self.assertRaises(KeyError):
+            self.rooms.add_rule('diy/upper/study/motion', 'attic')
+
+    def test_default_room_map_loads(self,):
+        rooms = RoomMap()
+        self.assertEqual([area.name for area in rooms.lookup('diy/main/living/motion')],
+                         ['living'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+""" SegmentTable display RAM against the SevenSegment calls the clock made before """
+
+import time
+import unittest
+
+from pkg_classes.ledclock import TimeDisplay
+from pkg_classes.segmentencoder import (COLON, COLON_INDEX, DECIMAL_POINT,
+                                        clock_table, number_table, zero_table)
+from pkg_classes.simulatedbackpack import SimulatedSevenSegment
+from pkg_classes.timesource import VirtualTime
+
+SAMPLES = (0, 1, 7, 10, 59, 100, 907, 1000, 1234, 2359, 9999)
+
+def printed(value):
+    """ display RAM bytes 0 to 9 after print_number_str """
+    display = SimulatedSevenSegment()
+    display.print_number_str(value)
+    return bytes(display.buffer[0:10])
+
+def encoded(table, number):
+    """ display RAM bytes 0 to 9 after encode """
+    frame = bytearray(16)
+    table.encode(number, frame)
+    return bytes(frame[0:10])
+
+class SegmentTableTest(unittest.TestCase):
+    """ every table against the strings the clock printed """
+
+    def test_number_table_blanks_leading_zeros(self,):
+        for number in SAMPLES:
+            self.assertEqual(encoded(number_table(), number),
+                             printed('{0:d}'.format(number)), number)
+
+    def test_zero_table_keeps_leading_zeros(self,):
+        for number in SAMPLES:
+            self.assertEqual(encoded(zero_table(), number),
+                             printed('%04d' % number), number)
+
+    def test_clock_table_blanks_a_leading_hour_zero(self,):
+        for hour in range(24):
+            for minute in (0, 5, 59):
+                self.assertEqual(encoded(clock_table(), 100 * hour + minute),
+                                 printed('%2d%02d' % (hour, minute)),
+                                 (hour, minute))
+
+    def test_encode_clears_the_colon(self,):
+        frame = bytearray(16)
+        frame[COLON_INDEX] = COLON
+        number_table().encode(1234, frame)
+        self.assertEqual(frame[COLON_INDEX], 0x00)
+
+    def test_colon_and_decimal_point_bits(self,):
+        display = SimulatedSevenSegment()
+        display.set_colon(True)
+        self.assertEqual(display.buffer[COLON_INDEX], COLON)
+        display.set_decimal(3, True)
+        self.assertEqual(display.buffer[8], DECIMAL_POINT)
+
+class TimeDisplayTest(unittest.TestCase):
+    """ the clock face against print_number_str, set_decimal and set_colon """
+
+    def shown(self, hour, minute, second, time_format="%l%M", alarm=False):
+        """ display RAM of TimeDisplay at a local time """
+        epoch = time.mktime((2024, 6, 1, hour, minute, second, 0, 0, -1))
+        display = SimulatedSevenSegment()
+        time_display = TimeDisplay(display, time_source=VirtualTime(epoch))
+        time_display.set_format(time_format)
+        time_display.set_alarm(alarm)
+        time_display.display()
+        return bytes(display.buffer)
+
+    def baseline(self, hour, minute, second, time_format="%l%M", alarm=False):
+        """ display RAM the way the clock wrote it before the tables """
+        now = time.localtime(time.mktime((2024, 6, 1, hour, minute, second, 0, 0, -1)))
+        display = SimulatedSevenSegment()
+        display.print_number_str(time.strftime(time_format, now))
+        display.set_decimal(1, now.tm_hour > 11)
+        display.set_colon(now.tm_sec % 2 == 0)
+        display.set_decimal(3, alarm)
+        return bytes(display.buffer)
+
+    def test_formats_match_the_baseline(self,):
+        for time_format in ("%l%M", "%I%M", "%k%M", "%H%M"):
+            for hour, minute, second in ((0, 0, 0), (9, 7, 1), (12, 30, 2), (23, 59, 59)):
+                self.assertEqual(self.shown(hour, minute, second, time_format),
+                                 self.baseline(hour, minute, second, time_format),
+                                 (time_format, hour, minute, second))
+
+    def test_alarm_point(self,):
+        self.assertEqual(self.shown(13, 45, 10, alarm=True),
+                         self.baseline(13, 45, 10, alarm=True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+""" A LedClock stepped by the SimulatedRuntime instead of its threads """
+
+import unittest
+
+from pkg_classes.ledclock import LedClock, WHO_MODE
+from pkg_classes.simulatedbackpack import SimulatedSevenSegment
+from pkg_classes.simulatedruntime import SimulatedRuntime
+from pkg_classes.timesource import VirtualTime
+
+class SimulatedClockTest(unittest.TestCase):
+    """ who mode shows the simulated identity, not this machine's """
+
+    def setUp(self,):
+        self.time = VirtualTime(1000.0)
+        self.runtime = SimulatedRuntime(self.time)
+        self.display = SimulatedSevenSegment(0x71)
+        self.clock = LedClock(self.display, time_source=self.time)
+        self.runtime.add_clock(self.clock, addresses=('192.0.2.10',))
+
+    def shown(self, seconds):
+        """ the display each second """
+        pages = []
+        for _ in range(seconds):
+            self.runtime.run_for(1.0)
+            pages.append(self.display.render())
+        return pages
+
+    def test_identity_is_refreshed_without_a_thread(self,):
+        self.runtime.run_for(1.0)
+        self.assertIsNone(self.clock.identity.thread)
+        self.assertEqual(self.clock.identity.snapshot(), (1, 'simulated', ('192.0.2.10',)))
+
+    def test_who_mode_pages_the_simulated_address(self,):
+        self.clock.set_mode(WHO_MODE)
+        pages = self.shown(12)
+        for page in (' 1 92.', '    0.', '    2.', '   10'):
+            self.assertIn(page, pages)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+""" Sunrise and sunset against published almanac times """
+
+import datetime
+import unittest
+
+from pkg_classes.suntimes import sun_event_hours, sun_times
+
+NEW_YORK = (40.7128, -74.0060)
+
+GREENWICH = (51.4779, 0.0)
+
+SVALBARD = (78.2232, 15.6267)
+
+SOLSTICE = datetime.date(2026, 6, 21)
+
+WINTER = datetime.date(2026, 12, 21)
+
+# the equation is good to a minute or two
+TOLERANCE_HOURS = 2.0 / 60.0
+
+class SunTimesTest(unittest.TestCase):
+    """ UTC hours so the results do not depend on the local time zone """
+
+    def assert_hour(self, hours, expected):
+        """ compare UTC hours of the day within the tolerance """
+        self.assertIsNotNone(hours)
+        self.assertLess(abs((hours - expected + 12.0) % 24.0 - 12.0), TOLERANCE_HOURS)
+
+    def test_new_york_summer(self,):
+        # 05:25 and 20:31 EDT
+        self.assert_hour(sun_event_hours(SOLSTICE, *NEW_YORK, True), 9 + 25 / 60.0)
+        self.assert_hour(sun_event_hours(SOLSTICE, *NEW_YORK, False), 0 + 31 / 60.0)
+
+    def test_new_york_winter(self,):
+        # 07:17 and 16:32 EST
+        self.assert_hour(sun_event_hours(WINTER, *NEW_YORK, True), 12 + 17 / 60.0)
+        self.assert_hour(sun_event_hours(WINTER, *NEW_YORK, False), 21 + 32 / 60.0)
+
+    def test_greenwich_summer(self,):
+        self.assert_hour(sun_event_hours(SOLSTICE, *GREENWICH, True), 3 + 43 / 60.0)
+        self.assert_hour(sun_event_hours(SOLSTICE, *GREENWICH, False), 20 + 21 / 60.0)
+
+    def test_polar_day_and_night(self,):
+        self.assertIsNone(sun_event_hours(SOLSTICE, *SVALBARD, False))
+        self.assertIsNone(sun_event_hours(WINTER, *SVALBARD, True))
+        self.assertEqual(sun_times(WINTER, *SVALBARD), (None, None))
+
+    def test_local_times_fall_on_the_day_asked_for(self,):
+        sunrise, sunset = sun_times(SOLSTICE, *GREENWICH)
+        self.assertEqual(sunrise.date(), SOLSTICE)
+        self.assertEqual(sunset.date(), SOLSTICE)
+        self.assertLess(sunrise, sunset)
+
+if __name__ == '__main__':
+    unittest.main()
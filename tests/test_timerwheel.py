@@ -0,0 +1,64 @@
+""" TimerWheel expiry, cancellation and timers beyond one turn """
+
+import unittest
+
+from pkg_classes.timerwheel import TimerWheel
+from pkg_classes.timesource import VirtualTime
+
+class TimerWheelTest(unittest.TestCase):
+    """ a 1 s tick, 8 slot wheel on VirtualTime """
+
+    def setUp(self,):
+        self.time = VirtualTime(1000.0)
+        self.wheel = TimerWheel(tick=1.0, slots=8, time_source=self.time)
+        self.fired = []
+
+    def advance(self, seconds):
+        """ move time on and turn the wheel """
+        self.time.advance(seconds)
+        return self.wheel.advance()
+
+    def test_timer_fires_on_the_tick_after_its_delay(self,):
+        timer = self.wheel.schedule(2.5, self.fired.append, 'tea')
+        self.assertEqual(self.wheel.remaining(timer), 3.0)
+        self.assertEqual(self.advance(2.5), 0)
+        self.assertEqual(self.advance(0.5), 1)
+        self.assertEqual(self.fired, ['tea'])
+        self.assertIsNone(self.wheel.next_expiry())
+
+    def test_cancelled_timer_does_not_fire(self,):
+        timer = self.wheel.schedule(1.0, self.fired.append, 'eggs')
+        timer.cancel()
+        self.assertEqual(self.advance(5.0), 0)
+        self.assertEqual(self.fired, [])
+
+    def test_timers_beyond_one_turn_wait_for_their_turn(self,):
+        self.wheel.schedule(3.0, self.fired.append, 'near')
+        self.wheel.schedule(11.0, self.fired.append, 'far')
+        self.assertEqual(self.wheel.next_expiry(), 1003.0)
+        self.advance(3.0)
+        self.assertEqual(self.fired, ['near'])
+        self.advance(5.0)
+        self.assertEqual(self.fired, ['near'])
+        self.advance(3.0)
+        self.assertEqual(self.fired, ['near', 'far'])
+
+    def test_long_gap_fires_in_expiry_order(self,):
+        for delay in (30.0, 2.0, 9.0):
+            self.wheel.schedule(delay, self.fired.append, delay)
+        self.assertEqual(self.advance(60.0), 3)
+        self.assertEqual(self.fired, [2.0, 9.0, 30.0])
+
+    def test_callback_can_schedule_again(self,):
+        def again(count):
+            """ reschedule until three calls """
+            self.fired.append(count)
+            if count < 3:
+                self.wheel.schedule(1.0, again, count + 1)
+        self.wheel.schedule(1.0, again, 1)
+        for _ in range(5):
+            self.advance(1.0)
+        self.assertEqual(self.fired, [1, 2, 3])
+
+if __name__ == '__main__':
+    unittest.main()